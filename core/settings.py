@@ -49,11 +49,13 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'taskmanagement.middleware.InstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'taskmanagement.middleware.ActivityMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -93,6 +95,96 @@ DATABASES = {
     }
 }
 
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'boards': {
+        'BACKEND': os.getenv(
+            'BOARD_CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.getenv('BOARD_CACHE_LOCATION', 'board-snapshots'),
+        'TIMEOUT': None,
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.getenv('BOARD_CACHE_MAX_ENTRIES', 1000)),
+        },
+    },
+    # State every worker process must see the same way (access indexes).
+    # Use Redis or Memcached in production; `check --deploy` rejects locmem.
+    'shared': {
+        'BACKEND': os.getenv(
+            'SHARED_CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.getenv('SHARED_CACHE_LOCATION', 'shared'),
+    },
+}
+
+TASKMANAGEMENT_BOARD_CACHE = 'boards'
+
+TASKMANAGEMENT_BULK_MAX_ITEMS = int(os.getenv('BULK_MAX_ITEMS', 5000))
+
+TASKMANAGEMENT_EVENT_BROKER = os.getenv(
+    'EVENT_BROKER',
+    'taskmanagement.events.InMemoryBroker'
+)
+
+# Seconds of silence before the board event stream sends a keep-alive comment.
+TASKMANAGEMENT_EVENT_HEARTBEAT = 15
+
+# Instrumentation: log single queries slower than TASKMANAGEMENT_SLOW_QUERY_MS and
+# requests over TASKMANAGEMENT_QUERY_COUNT_THRESHOLD queries or TASKMANAGEMENT_SLOW_REQUEST_MS.
+TASKMANAGEMENT_SLOW_QUERY_MS = int(os.getenv('SLOW_QUERY_MS', 100))
+TASKMANAGEMENT_QUERY_COUNT_THRESHOLD = int(os.getenv('QUERY_COUNT_THRESHOLD', 50))
+TASKMANAGEMENT_SLOW_REQUEST_MS = int(os.getenv('SLOW_REQUEST_MS', 500))
+
+# Columns whose longest task rank exceeds this are rebalanced by `rebalance_ranks`.
+TASKMANAGEMENT_RANK_REBALANCE_LENGTH = int(os.getenv('RANK_REBALANCE_LENGTH', 24))
+
+# Boards and columns are deleted in chunks of this many rows per statement.
+# Boards with at least TASKMANAGEMENT_SOFT_DELETE_TASKS tasks are only hidden on
+# delete and removed later by `purge_boards`; 0 always deletes immediately.
+TASKMANAGEMENT_DELETE_CHUNK_SIZE = int(os.getenv('DELETE_CHUNK_SIZE', 1000))
+TASKMANAGEMENT_SOFT_DELETE_TASKS = int(os.getenv('SOFT_DELETE_TASKS', 5000))
+
+# Text search configuration of the task search vectors (PostgreSQL only).
+# Run `reindex_tasks` after changing it.
+TASKMANAGEMENT_SEARCH_CONFIG = os.getenv('SEARCH_CONFIG', 'english')
+
+# Cache holding every user's {board_id: role} access index, and its lifetime in
+# seconds; entries are also dropped whenever memberships or owned boards change.
+# It must be shared by every process, or revoked access survives on other workers.
+TASKMANAGEMENT_ACCESS_CACHE = 'shared'
+TASKMANAGEMENT_ACCESS_CACHE_TIMEOUT = int(os.getenv('ACCESS_CACHE_TIMEOUT', 300))
+
+# Activity log entries older than this many days are removed by `prune_activity`.
+TASKMANAGEMENT_ACTIVITY_RETENTION_DAYS = int(os.getenv('ACTIVITY_RETENTION_DAYS', 90))
+
+# Tasks untouched for TASKMANAGEMENT_ARCHIVE_AFTER_DAYS days, or for
+# TASKMANAGEMENT_ARCHIVE_DONE_AFTER_DAYS days in a column with one of the
+# TASKMANAGEMENT_ARCHIVE_DONE_COLUMNS names, are moved to the archive by `archive_tasks`.
+TASKMANAGEMENT_ARCHIVE_AFTER_DAYS = int(os.getenv('ARCHIVE_AFTER_DAYS', 365))
+TASKMANAGEMENT_ARCHIVE_DONE_AFTER_DAYS = int(os.getenv('ARCHIVE_DONE_AFTER_DAYS', 30))
+TASKMANAGEMENT_ARCHIVE_DONE_COLUMNS = [
+    name for name in os.getenv('ARCHIVE_DONE_COLUMNS', 'Done').split(',') if name
+]
+
+# Throttle buckets live in this cache, which must be shared by every process
+# (the deploy check rejects a local-memory one outside DEBUG). A process takes up to TASKMANAGEMENT_THROTTLE_LEASE tokens of a busy bucket at
+# once and spends them locally for at most TASKMANAGEMENT_THROTTLE_LEASE_SECONDS.
+TASKMANAGEMENT_THROTTLE_CACHE = 'shared'
+TASKMANAGEMENT_THROTTLE_LEASE = int(os.getenv('THROTTLE_LEASE', 10))
+TASKMANAGEMENT_THROTTLE_LEASE_SECONDS = float(os.getenv('THROTTLE_LEASE_SECONDS', 1))
+
+# Serve the dashboard of a user's boards from the BoardStats summary table,
+# refreshed for every board a request writes to. Run `refresh_board_stats`
+# after turning it on.
+TASKMANAGEMENT_BOARD_STATS_SUMMARY = bool(os.getenv('BOARD_STATS_SUMMARY'))
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -137,4 +229,20 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # Rest Framework
 REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS":"drf_spectacular.openapi.AutoSchema",
+    # orjson is optional; without it FastJSONRenderer falls back to the json module.
+    "DEFAULT_RENDERER_CLASSES":(
+        "taskmanagement.api.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    "EXCEPTION_HANDLER":"taskmanagement.api.exceptions.exception_handler",
+    # Token buckets per user: read and write requests, and heavy views (board
+    # detail, export, import, clone). An empty rate turns a scope off.
+    "DEFAULT_THROTTLE_CLASSES":(
+        "taskmanagement.api.throttling.TokenBucketThrottle",
+    ),
+    "DEFAULT_THROTTLE_RATES":{
+        "read":os.getenv("THROTTLE_READ_RATE", "1200/min"),
+        "write":os.getenv("THROTTLE_WRITE_RATE", "600/min"),
+        "heavy":os.getenv("THROTTLE_HEAVY_RATE", "240/min"),
+    },
 }
@@ -0,0 +1,91 @@
+"""
+Per-user index of the boards a user can open and their role on each.
+
+The index is a ``{board_id: role}`` dict kept in the cache, so checking
+access to any board, column, task or subtask is a dict lookup on the
+object's ``board_id``. It is rebuilt with two small queries on a miss and
+dropped whenever the user's memberships or owned boards change.
+"""
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+from .models import Board, BoardMembership
+
+
+OWNER = 'owner'
+ROLE_LEVELS = {
+    BoardMembership.VIEWER: 1,
+    BoardMembership.EDITOR: 2,
+    BoardMembership.ADMIN: 3,
+    OWNER: 4,
+}
+
+
+def _backend():
+    return caches[settings.TASKMANAGEMENT_ACCESS_CACHE]
+
+
+def _key(user_id):
+    return f'board-access:{user_id}'
+
+
+def _build(user_id):
+    roles = dict(
+        BoardMembership.objects.filter(user_id=user_id, board__deleted_at__isnull=True)
+        .values_list('board_id', 'role')
+    )
+    for board_id in Board.objects.filter(owner_id=user_id).values_list('pk', flat=True):
+        roles[board_id] = OWNER
+    return roles
+
+
+def board_roles(user_id):
+    roles = _backend().get(_key(user_id))
+    if roles is None:
+        roles = _build(user_id)
+        _backend().set(_key(user_id), roles, settings.TASKMANAGEMENT_ACCESS_CACHE_TIMEOUT)
+    return roles
+
+
+async def aboard_roles(user_id):
+    roles = await _backend().aget(_key(user_id))
+    if roles is None:
+        roles = await sync_to_async(_build)(user_id)
+        await _backend().aset(_key(user_id), roles, settings.TASKMANAGEMENT_ACCESS_CACHE_TIMEOUT)
+    return roles
+
+
+def role_allows(role, required):
+    return ROLE_LEVELS.get(role, 0) >= ROLE_LEVELS[required]
+
+
+def has_board_role(user_id, board_id, required=BoardMembership.VIEWER):
+    return role_allows(board_roles(user_id).get(board_id), required)
+
+
+def accessible_board_ids(user_id, required=BoardMembership.VIEWER):
+    return [
+        board_id for board_id, role in board_roles(user_id).items()
+        if role_allows(role, required)
+    ]
+
+
+def invalidate(user_ids):
+    """
+    Drop the cached index of ``user_ids`` now, and again on commit so a
+    request that rebuilt it from the old rows meanwhile does not win.
+    """
+    keys = [_key(user_id) for user_id in set(user_ids)]
+    _backend().delete_many(keys)
+    transaction.on_commit(lambda: _backend().delete_many(keys))
+
+
+def board_user_ids(board_id):
+    """The owner and every member of a board."""
+    user_ids = list(
+        BoardMembership.objects.filter(board=board_id).values_list('user_id', flat=True)
+    )
+    user_ids.extend(Board.all_objects.filter(pk=board_id).values_list('owner_id', flat=True))
+    return user_ids
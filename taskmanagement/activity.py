@@ -0,0 +1,114 @@
+"""
+Activity log: who changed what on a board, and when.
+
+Every change published through ``events.publish`` is recorded here. An
+entry is kept only once its transaction commits; during a request it is
+collected in the request's buffer and ``ActivityMiddleware`` writes the
+whole buffer with one ``bulk_create`` at the end, so writes never pay for
+an INSERT of their own. Outside a request the entries of each atomic block
+are batched and written by one on-commit hook, which Django discards with
+the block if it rolls back.
+Board summaries (``taskmanagement.stats``) are refreshed at the same time
+for the boards the entries belong to.
+"""
+from contextvars import ContextVar
+from weakref import WeakKeyDictionary
+
+from django.db import transaction
+
+from .models import Activity
+from .stats import refresh_summaries
+
+
+BATCH_SIZE = 500
+
+current_buffer = ContextVar('activity_buffer', default=None)
+
+# {connection: {savepoint ids: TransactionBatch}}
+_batches = WeakKeyDictionary()
+
+
+class ActivityBuffer:
+    def __init__(self, request=None):
+        self.request = request
+        self.entries = []
+        self.flushed = False
+
+    def actor_id(self):
+        user = getattr(self.request, 'user', None)
+        if user is None or not user.is_authenticated:
+            return None
+        return user.pk
+
+    def add(self, entry):
+        if self.flushed:
+            # Committed after the request finished (an outer transaction).
+            write([entry])
+        else:
+            self.entries.append(entry)
+
+    def flush(self):
+        self.flushed = True
+        if self.entries:
+            write(self.entries)
+            self.entries = []
+
+
+class TransactionBatch:
+    """The entries recorded outside a request in one atomic block."""
+
+    def __init__(self):
+        self.entries = []
+        # The connection's list of on-commit hooks once ours is added; a
+        # commit or a rollback replaces that list.
+        self.hooks = None
+
+    def write(self):
+        write(self.entries)
+
+
+def _transaction_batch():
+    connection = transaction.get_connection()
+    hooks = connection.run_on_commit
+    batches = _batches.setdefault(connection, {})
+    key = tuple(connection.savepoint_ids)
+    batch = batches.get(key)
+    if batch is None or batch.hooks is not hooks:
+        for stale in [name for name, other in batches.items() if other.hooks is not hooks]:
+            del batches[stale]
+        batch = batches[key] = TransactionBatch()
+        transaction.on_commit(batch.write)
+        batch.hooks = connection.run_on_commit
+    return batch
+
+
+def write(entries):
+    Activity.objects.bulk_create(entries, batch_size=BATCH_SIZE)
+    refresh_summaries(entry.board_id for entry in entries)
+
+
+def _task_ids(event_type, data):
+    if event_type.startswith('task.'):
+        return data.get('id'), None
+    if event_type.startswith('subtask.'):
+        return data.get('task'), data.get('id')
+    return None, None
+
+
+def record(board_id, event_type, data):
+    task_id, subtask_id = _task_ids(event_type, data)
+    buffer = current_buffer.get()
+    entry = Activity(
+        board_id=board_id,
+        actor_id=buffer.actor_id() if buffer is not None else None,
+        verb=event_type,
+        task_id=task_id,
+        subtask_id=subtask_id,
+        data=data
+    )
+    if buffer is not None:
+        transaction.on_commit(lambda: buffer.add(entry))
+    elif transaction.get_connection().in_atomic_block:
+        _transaction_batch().entries.append(entry)
+    else:
+        write([entry])
@@ -0,0 +1,180 @@
+"""
+Async versions of the read endpoints.
+
+They use the async ORM so a single ASGI worker can serve many slow clients
+without a thread per request. Authentication is session based, through
+``AuthenticationMiddleware``, and board access comes from the cached access
+index; serialization runs on fully prefetched objects
+so no query is issued from the event loop. Requests are throttled with the
+token buckets of the DRF views. A board requested with shaping parameters
+is built by the shaping steps of ``BoardDetailView``, in a thread.
+"""
+import math
+
+from asgiref.sync import sync_to_async
+from django.db.models import Count, Max
+from django.http import JsonResponse
+from django.views import View
+from rest_framework.exceptions import ValidationError
+
+from .conditional import (
+    board_etag, board_list_etag,
+    column_list_etag, task_etag,
+    not_modified
+)
+from .throttling import bucket, buckets, throttle_scope
+from .views import BoardDetailView
+from taskmanagement.access import aboard_roles
+from taskmanagement.cache import board_cache
+from taskmanagement.models import Board, Task
+from taskmanagement.serializers import (
+    BoardListSerializer, BoardDetailSerializer,
+    ColumnListSerializer, TaskDetailSerializer
+)
+
+
+def _authenticated_user_id(request):
+    user = request.user
+    return user.pk if user.is_authenticated else None
+
+
+class AsyncReadView(View):
+    http_method_names = ('get', 'head', 'options')
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.user_id = await sync_to_async(_authenticated_user_id)(request)
+        if self.user_id is None:
+            return JsonResponse(
+                {
+                    'error': 'Authentication credentials were not provided.'
+                },
+                status=403
+            )
+        limit = bucket(throttle_scope(request.method, self), self.user_id)
+        wait = await buckets.aconsume(*limit) if limit else 0
+        if wait:
+            return self.throttled(wait)
+        self.board_roles = await aboard_roles(self.user_id)
+        return await super().dispatch(request, *args, **kwargs)
+
+    def throttled(self, wait):
+        wait = math.ceil(wait)
+        return JsonResponse(
+            {
+                'error': f'Request was throttled. Expected available in {wait} seconds.'
+            },
+            status=429,
+            headers={'Retry-After': str(wait)}
+        )
+
+    def not_found(self, name):
+        return JsonResponse({'error': f'{name} not found.'}, status=404)
+
+    def forbidden(self):
+        return JsonResponse(
+            {
+                'error': 'You do not have permission to perform this action.'
+            },
+            status=403
+        )
+
+
+class AsyncBoardListView(AsyncReadView):
+    async def get(self, request):
+        boards = Board.objects.filter(pk__in=list(self.board_roles))
+        summary = await boards.aaggregate(
+            count=Count('pk'),
+            last_pk=Max('pk'),
+            last_updated_at=Max('updated_at')
+        )
+        etag = board_list_etag(self.user_id, **summary)
+        response = not_modified(request, etag)
+        if response:
+            return response
+
+        boards = [board async for board in boards.order_by('-updated_at')]
+        serializer = BoardListSerializer(boards, many=True)
+        return JsonResponse(serializer.data, safe=False, headers={'ETag': etag})
+
+
+class AsyncBoardDetailView(AsyncReadView):
+    throttle_scope = 'heavy'
+
+    async def get(self, request, pk):
+        try:
+            board = await Board.objects.aget(pk=pk)
+        except Board.DoesNotExist:
+            return self.not_found('Board')
+        if board.pk not in self.board_roles:
+            return self.forbidden()
+        if any(request.GET.get(name) for name in BoardDetailView.shaping_params):
+            return await self.get_shaped(request, board)
+
+        etag = board_etag(board.pk, board.version)
+        response = not_modified(request, etag)
+        if response:
+            return response
+
+        data = await board_cache.aget(board.pk, board.version)
+        if data is None:
+            board = await Board.objects.with_tree().aget(pk=board.pk)
+            data = BoardDetailSerializer(board).data
+            await board_cache.aset(board.pk, board.version, data)
+            etag = board_etag(board.pk, board.version)
+        return JsonResponse(data, headers={'ETag': etag})
+
+    async def get_shaped(self, request, board):
+        params = request.GET
+        try:
+            limit, task_filter = BoardDetailView.parse_shaping(params)
+        except ValueError as error:
+            return JsonResponse({'error': str(error)}, status=400)
+
+        etag = BoardDetailView.shaped_etag(board, params)
+        response = not_modified(request, etag)
+        if response:
+            return response
+        try:
+            data = await sync_to_async(BoardDetailView.shaped_data)(board, params, limit, task_filter)
+        except ValidationError as error:
+            return JsonResponse(error.detail, safe=False, status=400)
+        return JsonResponse(data, headers={'ETag': etag})
+
+
+class AsyncColumnListView(AsyncReadView):
+    async def get(self, request, board_pk):
+        try:
+            board = await Board.objects.aget(pk=board_pk)
+        except Board.DoesNotExist:
+            return self.not_found('Board')
+        if board.pk not in self.board_roles:
+            return self.forbidden()
+
+        etag = column_list_etag(board.pk, board.version)
+        response = not_modified(request, etag)
+        if response:
+            return response
+
+        columns = [column async for column in board.columns.order_by('id')]
+        serializer = ColumnListSerializer(columns, many=True)
+        return JsonResponse(serializer.data, safe=False, headers={'ETag': etag})
+
+
+class AsyncTaskDetailView(AsyncReadView):
+    async def get(self, request, pk):
+        tasks = Task.objects.with_etag_state()
+        try:
+            task = await tasks.aget(pk=pk)
+        except Task.DoesNotExist:
+            return self.not_found('Task')
+        if task.board_id not in self.board_roles:
+            return self.forbidden()
+
+        etag = task_etag(task)
+        response = not_modified(request, etag)
+        if response:
+            return response
+
+        task = await tasks.prefetch_related('subtasks').aget(pk=task.pk)
+        serializer = TaskDetailSerializer(task)
+        return JsonResponse(serializer.data, headers={'ETag': etag})
@@ -0,0 +1,96 @@
+from contextlib import contextmanager
+from hashlib import sha1
+
+from django.db import transaction
+from django.http import HttpResponseNotModified
+from django.utils.http import parse_etags, quote_etag
+from rest_framework.exceptions import NotFound
+from rest_framework.response import Response
+from rest_framework.status import HTTP_412_PRECONDITION_FAILED
+
+from taskmanagement.models import Board, Task
+
+
+def make_etag(*parts):
+    digest = sha1(':'.join(str(part) for part in parts).encode()).hexdigest()
+    return quote_etag(digest)
+
+
+def board_etag(board_pk, version, *variant):
+    return make_etag('board', board_pk, version, *variant)
+
+
+def board_list_etag(user_pk, count, last_pk, last_updated_at):
+    return make_etag('boards', user_pk, count, last_pk, last_updated_at)
+
+
+def column_list_etag(board_pk, version):
+    return make_etag('columns', board_pk, version)
+
+
+def task_etag(task, *variant):
+    """The ETag of a task fetched through ``Task.objects.with_etag_state()``."""
+    return make_etag(
+        'task', task.pk, task.sequence, task.subtask_version, task.subtask_total, *variant
+    )
+
+
+def current_task_etag(task_pk):
+    """The ``task_etag`` of the task as committed; call it under ``if_match``."""
+    try:
+        return task_etag(Task.objects.with_etag_state().get(pk=task_pk))
+    except Task.DoesNotExist:
+        raise NotFound('Task not found.')
+
+
+def _strip_weak(etag):
+    return etag[2:] if etag.startswith('W/') else etag
+
+
+def not_modified(request, etag):
+    """Return a 304 response if ``If-None-Match`` matches ``etag``."""
+    header = request.headers.get('If-None-Match')
+    if not header:
+        return None
+    etags = parse_etags(header)
+    if '*' in etags or etag in [_strip_weak(tag) for tag in etags]:
+        response = HttpResponseNotModified()
+        response['ETag'] = etag
+        return response
+    return None
+
+
+def precondition_failed(request, etag):
+    """Return a 412 response if ``If-Match`` is present and does not match ``etag``."""
+    header = request.headers.get('If-Match')
+    if not header:
+        return None
+    etags = parse_etags(header)
+    if '*' in etags or etag in etags:
+        return None
+    return Response(
+        {
+            'error': 'Resource has been modified.'
+        },
+        status=HTTP_412_PRECONDITION_FAILED,
+        headers={'ETag': etag}
+    )
+
+
+@contextmanager
+def if_match(request, board_pk, make_etag):
+    """
+    Yield the 412 response of ``precondition_failed`` against
+    ``make_etag(version)``, or None. With ``If-Match`` the block runs in a
+    transaction that read the board version with the board row locked;
+    every write to the board bumps the version through that row, so a
+    concurrent write carrying the same ETag waits, then fails the check
+    instead of overwriting this one. ``make_etag`` runs under the lock, so
+    it may instead re-read the rows a narrower ETag covers.
+    """
+    if not request.headers.get('If-Match'):
+        yield None
+        return
+    with transaction.atomic():
+        version = Board.all_objects.locked_version(board_pk)
+        yield precondition_failed(request, make_etag(version))
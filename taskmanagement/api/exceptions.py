@@ -0,0 +1,9 @@
+from rest_framework.views import exception_handler as drf_exception_handler
+
+
+def exception_handler(exc, context):
+    """Report DRF errors under ``error``, like the views do, instead of ``detail``."""
+    response = drf_exception_handler(exc, context)
+    if response is not None and isinstance(response.data, dict) and 'detail' in response.data:
+        response.data = {'error': response.data['detail']}
+    return response
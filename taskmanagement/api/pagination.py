@@ -0,0 +1,79 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+from functools import reduce
+from operator import or_
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+def _default(value):
+    # DjangoJSONEncoder truncates datetimes to milliseconds, which would
+    # break equality comparisons against the stored microseconds.
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    raise TypeError(f'{type(value).__name__} is not JSON serializable')
+
+
+def encode_cursor(values):
+    data = json.dumps(values, default=_default, separators=(',', ':'))
+    return urlsafe_b64encode(data.encode()).decode()
+
+
+def _to_python(model, field, value):
+    try:
+        return model._meta.get_field(field).to_python(value)
+    except FieldDoesNotExist:
+        # Annotations (e.g. a search score) are stored as plain JSON values.
+        if not isinstance(value, (int, float, str)):
+            raise InvalidCursor()
+        return value
+
+
+def decode_cursor(cursor, model, fields):
+    try:
+        values = json.loads(urlsafe_b64decode(cursor.encode()))
+        if len(values) != len(fields):
+            raise InvalidCursor()
+        return [_to_python(model, field, value) for field, value in zip(fields, values)]
+    except (BinasciiError, ValueError, TypeError, ValidationError):
+        raise InvalidCursor()
+
+
+def keyset_filter(fields, values, descending=True):
+    """
+    Build ``(f1 < v1) OR (f1 = v1 AND f2 < v2) OR ...`` for a descending keyset
+    (``>`` for an ascending one), which lets the database seek straight into
+    a composite index.
+    """
+    lookup = 'lt' if descending else 'gt'
+    conditions = []
+    for position, field in enumerate(fields):
+        equal = {prefix: value for prefix, value in zip(fields[:position], values)}
+        conditions.append(Q(**equal, **{f'{field}__{lookup}': values[position]}))
+    return reduce(or_, conditions)
+
+
+def paginate_keyset(queryset, cursor, limit, fields=('updated_at', 'id'), descending=True):
+    """
+    Return one page of ``queryset`` ordered by ``fields`` (descending by
+    default) and the cursor of the next page (``None`` on the last page).
+
+    ``queryset`` must yield dicts (``values()``) containing every key field.
+    """
+    if cursor:
+        values = decode_cursor(cursor, queryset.model, fields)
+        queryset = queryset.filter(keyset_filter(fields, values, descending))
+
+    queryset = queryset.order_by(*[f'-{field}' if descending else field for field in fields])
+    rows = list(queryset[:limit + 1])
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor([rows[-1][field] for field in fields])
+    return rows, next_cursor
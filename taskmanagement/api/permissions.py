@@ -1,18 +1,45 @@
-# from rest_framework.permissions import BasePermission
-from rest_framework.response import Response
-from rest_framework.status import HTTP_403_FORBIDDEN
+from rest_framework.exceptions import NotFound
+from rest_framework.permissions import SAFE_METHODS, BasePermission
 
+from taskmanagement.access import has_board_role
+from taskmanagement.models import Board, BoardMembership
 
-def is_owner(obj, request):
-    if obj.owner != request.user:
-        return Response(
-            {
-                'error': 'You do not have permission to perform this action'
-            },
-            status=HTTP_403_FORBIDDEN
-        )
 
+class HasBoardRole(BasePermission):
+    """
+    Check the user's role on the board an object belongs to against the
+    cached access index; columns, tasks and subtasks carry ``board_id``,
+    so no query is needed.
 
-# class IsOwner(BasePermission):
-#     def has_object_permission(self, request, view, obj):
-#         return obj and obj.owner == request.user
\ No newline at end of file
+    Views may set ``board_role`` to a role, or to a ``{method: role}``
+    dict; otherwise reads need a viewer and writes an editor.
+    """
+    message = 'You do not have permission to perform this action.'
+
+    def required_role(self, request, view):
+        role = getattr(view, 'board_role', None)
+        if isinstance(role, dict):
+            role = role.get(request.method)
+        if role is None:
+            role = BoardMembership.VIEWER if request.method in SAFE_METHODS else BoardMembership.EDITOR
+        return role
+
+    def has_object_permission(self, request, view, obj):
+        board_id = obj.pk if isinstance(obj, Board) else obj.board_id
+        return has_board_role(request.user.id, board_id, self.required_role(request, view))
+
+
+class BoardObjectMixin:
+    """
+    Fetch an object by primary key and run the view's object permissions
+    on it: 404 if it does not exist, 403 if the user's role is not enough.
+    Both outcomes cost exactly one query once the access index is cached.
+    """
+
+    def get_board_object(self, queryset, pk):
+        try:
+            obj = queryset.get(pk=pk)
+        except queryset.model.DoesNotExist:
+            raise NotFound(f'{queryset.model._meta.object_name} not found.')
+        self.check_object_permissions(self.request, obj)
+        return obj
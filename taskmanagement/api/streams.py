@@ -0,0 +1,64 @@
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import JsonResponse, StreamingHttpResponse
+
+from taskmanagement.access import aboard_roles
+from taskmanagement.events import get_broker
+
+
+def _authenticated_user_id(request):
+    user = request.user
+    return user.pk if user.is_authenticated else None
+
+
+def _last_event_id(request):
+    value = request.headers.get('Last-Event-ID') or request.GET.get('last_event_id')
+    try:
+        return int(value) if value else None
+    except ValueError:
+        return None
+
+
+def format_event(event):
+    data = json.dumps(event['data'], separators=(',', ':'))
+    return f'id: {event["id"]}\nevent: {event["type"]}\ndata: {data}\n\n'
+
+
+async def board_events(request, pk):
+    """
+    Server-sent events stream of changes to one board. Served best under
+    ASGI, where an idle connection does not hold a worker thread.
+    """
+    user_id = await sync_to_async(_authenticated_user_id)(request)
+    if user_id is None:
+        return JsonResponse(
+            {
+                'error': 'Authentication credentials were not provided.'
+            },
+            status=403
+        )
+    if pk not in await aboard_roles(user_id):
+        return JsonResponse(
+            {
+                'error': 'Board not found.'
+            },
+            status=404
+        )
+
+    events = get_broker().subscribe(
+        pk,
+        last_event_id=_last_event_id(request),
+        heartbeat=getattr(settings, 'TASKMANAGEMENT_EVENT_HEARTBEAT', 15)
+    )
+
+    async def stream():
+        yield 'retry: 3000\n\n'
+        async for event in events:
+            yield ': keep-alive\n\n' if event is None else format_event(event)
+
+    response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
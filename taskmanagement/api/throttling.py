@@ -0,0 +1,166 @@
+"""
+Token-bucket request throttling.
+
+Every user has a bucket per scope: ``read`` or ``write`` by request
+method, or the ``throttle_scope`` of a heavy view, filled at the rate of
+the scope in ``DEFAULT_THROTTLE_RATES``; ``'120/min'`` holds 120 tokens
+and refills them over a minute.
+
+Buckets live in the ``TASKMANAGEMENT_THROTTLE_CACHE`` cache, shared by
+every process, in the GCRA form: one integer per bucket, the time (in
+milliseconds) at which it will be full again. Taking tokens is a single
+atomic ``incr`` of that time (undone with ``decr`` if it would overdraw
+the bucket), and the key expires once the bucket is full, when ``add``
+recreates it. No read-modify-write happens, so concurrent requests on
+different processes cannot admit more than the bucket holds.
+
+To avoid a cache round trip on every request, a process that finds a
+bucket busy takes up to ``TASKMANAGEMENT_THROTTLE_LEASE`` tokens at once
+and spends them locally for ``TASKMANAGEMENT_THROTTLE_LEASE_SECONDS``,
+and it remembers a refusal until the bucket has refilled. Clients that are
+turned away therefore cost no cache access at all.
+"""
+import math
+from threading import Lock
+from time import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+LOCAL_MAX_ENTRIES = 10000
+
+
+def parse_rate(rate):
+    """``'120/min'`` -> ``(120, 60)``: the bucket size and the seconds a refill takes."""
+    if not rate:
+        return None
+    tokens, period = rate.split('/')
+    return int(tokens), PERIODS[period[0]]
+
+
+class Lease:
+    __slots__ = ('tokens', 'expires', 'refused')
+
+    def __init__(self, tokens, expires, refused=False):
+        self.tokens = tokens
+        self.expires = expires
+        self.refused = refused
+
+
+class TokenBucketStore:
+    def __init__(self):
+        self._lock = Lock()
+        self._leases = {}
+
+    @property
+    def backend(self):
+        return caches[settings.TASKMANAGEMENT_THROTTLE_CACHE]
+
+    def clear_local(self):
+        with self._lock:
+            self._leases.clear()
+
+    def _take_local(self, key, now):
+        """``(wait, busy)``: ``wait`` is 0 or the seconds left of a refusal, or None to ask the cache."""
+        with self._lock:
+            lease = self._leases.get(key)
+            if lease is None or now >= lease.expires:
+                return None, False
+            if lease.refused:
+                return lease.expires - now, False
+            if lease.tokens:
+                lease.tokens -= 1
+                return 0, False
+            # The last lease was spent before it expired.
+            return None, True
+
+    def _take_shared(self, key, count, capacity, duration, now):
+        """Take ``count`` tokens from the shared bucket; returns 0, or the seconds to wait."""
+        now = int(now * 1000)
+        full = duration * 1000
+        cost = math.ceil(count * full / capacity)
+        if self.backend.add(key, now + cost, math.ceil(cost / 1000)):
+            return 0
+        try:
+            full_at = self.backend.incr(key, cost)
+        except ValueError:
+            # The bucket filled up, and its key expired, since the add.
+            return self._take_shared(key, count, capacity, duration, now / 1000)
+        if full_at - now > full:
+            self.backend.decr(key, cost)
+            return (full_at - full - now) / 1000
+        self.backend.touch(key, math.ceil((full_at - now) / 1000))
+        return 0
+
+    def _remember(self, key, lease):
+        with self._lock:
+            if len(self._leases) >= LOCAL_MAX_ENTRIES:
+                now = time()
+                self._leases = {
+                    name: entry for name, entry in self._leases.items() if entry.expires > now
+                }
+            self._leases[key] = lease
+
+    def _consume_shared(self, key, capacity, duration, now, busy):
+        lease = min(settings.TASKMANAGEMENT_THROTTLE_LEASE, capacity) if busy else 1
+        wait = self._take_shared(key, lease, capacity, duration, now)
+        if wait and lease > 1:
+            lease = 1
+            wait = self._take_shared(key, lease, capacity, duration, now)
+        if wait:
+            self._remember(key, Lease(0, now + wait, refused=True))
+        else:
+            self._remember(key, Lease(lease - 1, now + settings.TASKMANAGEMENT_THROTTLE_LEASE_SECONDS))
+        return wait
+
+    def consume(self, key, capacity, duration):
+        """Take one token from bucket ``key``; returns 0, or the seconds until one is available."""
+        now = time()
+        wait, busy = self._take_local(key, now)
+        if wait is not None:
+            return wait
+        return self._consume_shared(key, capacity, duration, now, busy)
+
+    async def aconsume(self, key, capacity, duration):
+        now = time()
+        wait, busy = self._take_local(key, now)
+        if wait is not None:
+            return wait
+        return await sync_to_async(self._consume_shared)(key, capacity, duration, now, busy)
+
+
+buckets = TokenBucketStore()
+
+
+def throttle_scope(method, view=None):
+    return getattr(view, 'throttle_scope', None) or ('read' if method in SAFE_METHODS else 'write')
+
+
+def bucket(scope, ident):
+    """``(key, capacity, duration)`` of a bucket, or None if ``scope`` is not limited."""
+    rate = parse_rate(api_settings.DEFAULT_THROTTLE_RATES.get(scope))
+    if rate is None:
+        return None
+    return (f'throttle:{scope}:{ident}', *rate)
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """Throttle per user (or client address) and scope; DRF adds ``Retry-After`` to the 429."""
+
+    def allow_request(self, request, view):
+        if request.user and request.user.is_authenticated:
+            ident = request.user.pk
+        else:
+            ident = f'anon:{self.get_ident(request)}'
+        limit = bucket(throttle_scope(request.method, view), ident)
+        self.wait_seconds = buckets.consume(*limit) if limit else 0
+        return not self.wait_seconds
+
+    def wait(self):
+        return self.wait_seconds
@@ -1,4 +1,9 @@
 from django.urls import path
+from .async_views import (
+    AsyncBoardListView, AsyncBoardDetailView,
+    AsyncColumnListView, AsyncTaskDetailView
+)
+from .streams import board_events
 from .views import (
     BoardListView, BoardDetailView,
     BoardUpdateView, BoardDeleteView,
@@ -7,7 +12,17 @@ from .views import (
     TaskDetailView, TaskUpdateView,
     TaskDeleteView, BoardCreateView,
     SubtaskCreateView, SubtaskDeleteView,
-    SubtaskUpdateView
+    SubtaskUpdateView, TaskBulkCreateView,
+    TaskBulkDeleteView, SubtaskBulkUpdateView,
+    TaskListView, TaskMoveView,
+    BoardExportView, BoardImportView,
+    BoardCloneView,
+    BoardChangesView, BoardStatsView,
+    UserStatsView,
+    TaskSearchView, BoardMemberListView,
+    BoardMemberDetailView, BoardActivityView,
+    TaskActivityView, MetricsView,
+    ArchivedTaskListView, ArchivedTaskRestoreView
 )
 
 urlpatterns = [
@@ -17,17 +32,53 @@ urlpatterns = [
     path('boards/<int:pk>/', BoardDetailView.as_view(), name='board_detail'),
     path('boards/<int:pk>/update/', BoardUpdateView.as_view(), name='board_update'),
     path('boards/<int:pk>/delete/', BoardDeleteView.as_view(), name='board_delete'),
+    path('boards/<int:pk>/events/', board_events, name='board_events'),
+    path('boards/stats/', UserStatsView.as_view(), name='user_stats'),
+    path('boards/<int:pk>/stats/', BoardStatsView.as_view(), name='board_stats'),
+    path('boards/<int:pk>/changes/', BoardChangesView.as_view(), name='board_changes'),
+    path('boards/<int:pk>/export/', BoardExportView.as_view(), name='board_export'),
+    path('boards/import/', BoardImportView.as_view(), name='board_import'),
+    path('boards/<int:pk>/clone/', BoardCloneView.as_view(), name='board_clone'),
+    path('boards/<int:pk>/activity/', BoardActivityView.as_view(), name='board_activity'),
+    # membership
+    path('boards/<int:board_pk>/members/', BoardMemberListView.as_view(), name='board_member_list'),
+    path(
+        'boards/<int:board_pk>/members/<int:user_pk>/',
+        BoardMemberDetailView.as_view(),
+        name='board_member_detail'
+    ),
     # column
     path('boards/<int:board_pk>/columns/', ColumnListView.as_view(), name='column_list'),
     path('boards/<int:board_pk>/add_column/', ColumnCreateView.as_view(), name='column_create'),
     path('columns/<int:pk>/delete/', ColumnDeleteView.as_view(), name='column_delete'),
     # task
+    path('tasks/', TaskListView.as_view(), name='task_list'),
+    path('tasks/search/', TaskSearchView.as_view(), name='task_search'),
     path('boards/<int:board_pk>/add_task/', TaskCreateView.as_view(), name='task_create'),
     path('tasks/<int:pk>/', TaskDetailView.as_view(), name='task_detail'),
     path('tasks/<int:pk>/update/', TaskUpdateView.as_view(), name='task_update'),
     path('tasks/<int:pk>/delete/', TaskDeleteView.as_view(), name='task_delete'),
+    path('tasks/<int:pk>/move/', TaskMoveView.as_view(), name='task_move'),
+    path('tasks/<int:pk>/activity/', TaskActivityView.as_view(), name='task_activity'),
+    path('boards/<int:board_pk>/tasks/bulk/', TaskBulkCreateView.as_view(), name='task_bulk_create'),
+    path('tasks/bulk_delete/', TaskBulkDeleteView.as_view(), name='task_bulk_delete'),
     # subtask
     path('tasks/<int:task_pk>/add_subtask/', SubtaskCreateView.as_view(), name='subtask_create'),
     path('subtasks/<int:pk>/update/', SubtaskUpdateView.as_view(), name='subtask_update'),
-    path('subtasks/<int:pk>/delete/', SubtaskDeleteView.as_view(), name='subtask_delete')
+    path('subtasks/<int:pk>/delete/', SubtaskDeleteView.as_view(), name='subtask_delete'),
+    path('subtasks/bulk_update/', SubtaskBulkUpdateView.as_view(), name='subtask_bulk_update'),
+    # archive
+    path('boards/<int:pk>/archive/', ArchivedTaskListView.as_view(), name='archived_task_list'),
+    path(
+        'archive/tasks/<int:pk>/restore/',
+        ArchivedTaskRestoreView.as_view(),
+        name='archived_task_restore'
+    ),
+    # instrumentation
+    path('metrics/', MetricsView.as_view(), name='metrics'),
+    # async read path
+    path('async/boards/', AsyncBoardListView.as_view(), name='async_board_list'),
+    path('async/boards/<int:pk>/', AsyncBoardDetailView.as_view(), name='async_board_detail'),
+    path('async/boards/<int:board_pk>/columns/', AsyncColumnListView.as_view(), name='async_column_list'),
+    path('async/tasks/<int:pk>/', AsyncTaskDetailView.as_view(), name='async_task_detail')
 ]
\ No newline at end of file
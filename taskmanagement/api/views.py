@@ -1,17 +1,47 @@
+from django.conf import settings
+from django.db import NotSupportedError, transaction
+from django.db.models import Count, F, Max, Q, prefetch_related_objects
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 
-from .permissions import is_owner
+from .conditional import (
+    board_etag, board_list_etag,
+    column_list_etag, task_etag, current_task_etag,
+    not_modified, if_match
+)
+from .pagination import InvalidCursor, encode_cursor, paginate_keyset
+from .permissions import HasBoardRole, BoardObjectMixin
+from taskmanagement.bulk import (
+    bulk_create_tasks, bulk_delete_tasks,
+    bulk_update_subtasks, remove_tasks
+)
+from taskmanagement.archive import restore_task
+from taskmanagement.access import OWNER, accessible_board_ids, has_board_role
+from taskmanagement.cache import board_cache
+from taskmanagement.deletion import delete_column, delete_or_schedule_board
+from taskmanagement.instrumentation import registry
+from taskmanagement.search import search_tasks, search_terms
+from taskmanagement.stats import board_stats, user_stats
+from taskmanagement.sync import board_changes
 from taskmanagement.models import (
-    Board, Column,
-    Task, Subtask
+    Activity, ArchivedTask, Board, BoardMembership,
+    Column, Task, Subtask, tree_lookups
 )
+from taskmanagement.transfer import InvalidImport, clone_board, export_board, import_board
 from taskmanagement.serializers import (
     BoardListSerializer, BoardDetailSerializer,
+    BoardPageSerializer, BoardCloneSerializer,
     ColumnListSerializer, TaskDetailSerializer,
-    SubtaskSerializer
+    SubtaskSerializer, SubtaskPatchSerializer,
+    TaskBulkSerializer, TaskBulkDeleteSerializer,
+    TaskMoveSerializer, BoardMembershipSerializer,
+    parse_field_paths
 )
 
 
@@ -19,9 +49,19 @@ from taskmanagement.serializers import (
 class BoardListView(APIView):
     permission_classes=(IsAuthenticated, )
     def get(self, request):
-        boards = Board.objects.filter(owner=request.user)
-        serializer = BoardListSerializer(boards, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        boards = Board.objects.filter(pk__in=accessible_board_ids(request.user.pk))
+        summary = boards.aggregate(
+            count=Count('pk'),
+            last_pk=Max('pk'),
+            last_updated_at=Max('updated_at')
+        )
+        etag = board_list_etag(request.user.pk, **summary)
+        response = not_modified(request, etag)
+        if response:
+            return response
+
+        serializer = BoardListSerializer(boards.order_by('-updated_at'), many=True)
+        return Response(serializer.data, status=status.HTTP_200_OK, headers={'ETag': etag})
 
 
 class BoardCreateView(APIView):
@@ -39,103 +79,336 @@ class BoardCreateView(APIView):
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         
 
-class BoardDetailView(APIView):
-    permission_classes=(IsAuthenticated, )
+class BoardDetailView(BoardObjectMixin, APIView):
+    """
+    The board tree. ``?fields=`` keeps only the listed fields, with dotted
+    paths for nested ones (``id,columns.name,columns.tasks.title``);
+    ``?expand=columns.tasks.description`` or ``columns.tasks.subtasks``
+    adds what the tree leaves out by default. The filters of
+    ``task_filters`` narrow the tasks (``incomplete`` also drops selected
+    subtasks), and ``?limit=`` keeps the first tasks of every column, with
+    ``has_more`` and a ``next`` cursor for the task list in rank order.
+    Shaped responses are built from a query loading only what is shown
+    and are not cached.
+    """
+    permission_classes=(IsAuthenticated, HasBoardRole)
+    throttle_scope = 'heavy'
+    task_columns = {
+        'id': (),
+        'title': ('title', ),
+        'subtask_count': ('subtask_total', 'subtask_selected'),
+        'description': ('description', ),
+        'subtasks': (),
+    }
+    shaping_params = ('fields', 'expand', 'limit', 'title', 'updated_since', 'incomplete')
+    max_limit = 200
+
     def get(self, request, pk):
+        board = self.get_board_object(Board.objects, pk)
+
+        params = request.query_params
+        if any(params.get(name) for name in self.shaping_params):
+            return self.get_shaped(request, board)
+
+        etag = board_etag(board.pk, board.version)
+        response = not_modified(request, etag)
+        if response:
+            return response
+
+        data = board_cache.get(board.pk, board.version)
+        if data is None:
+            board = Board.objects.with_tree().get(pk=board.pk)
+            data = BoardDetailSerializer(board).data
+            board_cache.set(board.pk, board.version, data)
+            etag = board_etag(board.pk, board.version)
+        return Response(data, headers={'ETag': etag})
+
+    def get_shaped(self, request, board):
+        params = request.query_params
         try:
-            board = Board.objects.get(pk=pk)
-        except Board.DoesNotExist:
+            limit, task_filter = self.parse_shaping(params)
+        except ValueError as error:
             return Response(
                 {
-                    'error':'Board not found.'
+                    'error': str(error)
                 },
-                status=status.HTTP_404_NOT_FOUND
+                status=status.HTTP_400_BAD_REQUEST
             )
-        
-        is_owner(board, request)
-        
-        serializer = BoardDetailSerializer(board)
-        return Response(serializer.data)
-    
 
-class BoardUpdateView(APIView):
-    permission_classes=(IsAuthenticated, )
-    def put(self, request, pk):
+        etag = self.shaped_etag(board, params)
+        response = not_modified(request, etag)
+        if response:
+            return response
+        return Response(self.shaped_data(board, params, limit, task_filter), headers={'ETag': etag})
+
+    # The shaping steps are classmethods so the async board view shares them.
+    @classmethod
+    def parse_shaping(cls, params):
+        """``(limit, task_filter)``; raises ``ValueError`` with the message of the 400."""
         try:
-            board = Board.objects.get(pk=pk)
-        except Board.DoesNotExist:
-            return Response(
-                {
-                    'error':'Board not found.'
-                },
-                status=status.HTTP_404_NOT_FOUND
-            )
-        
-        is_owner(board, request)
+            limit = min(int(params['limit']), cls.max_limit) if params.get('limit') else None
+        except ValueError:
+            limit = 0
+        if limit is not None and limit < 1:
+            raise ValueError('limit must be a positive integer.')
+        try:
+            task_filter = task_filters(params)
+        except ValueError:
+            raise ValueError('updated_since must be an ISO 8601 datetime.')
+        return limit, task_filter
 
-        serializer = BoardDetailSerializer(instance=board, data=request.data)
+    @classmethod
+    def shaped_etag(cls, board, params):
+        return board_etag(board.pk, board.version, *(params.get(name, '') for name in cls.shaping_params))
 
-        if serializer.is_valid():
-            serializer.save()
-            return Response(serializer.data)
-        else:
-            return Response(status=status.HTTP_400_BAD_REQUEST)
+    @classmethod
+    def shaped_data(cls, board, params, limit, task_filter):
+        """Load only what the shaping params show of ``board`` and serialize it."""
+        fields = parse_field_paths(params.get('fields'))
+        expand = parse_field_paths(params.get('expand'))
+        paged = limit is not None and (not fields or 'columns' in fields)
+        if not fields or 'columns' in fields:
+            column_fields = fields.get('columns', {})
+            task_fields = column_fields.get('tasks', {})
+            task_expand = expand.get('columns', {}).get('tasks', {})
+            shown = set(task_fields or ('id', 'title', 'subtask_count', *task_expand))
+            prefetch_related_objects([board], *tree_lookups(
+                tasks=not column_fields or 'tasks' in column_fields,
+                task_fields=[
+                    column
+                    for field in shown & set(cls.task_columns)
+                    for column in cls.task_columns[field]
+                ] + (['rank'] if paged else []),
+                subtasks='subtasks' in shown and 'subtasks' in task_expand,
+                task_filter=task_filter,
+                per_column=limit + 1 if paged else None,
+                incomplete_subtasks=params.get('incomplete') in ('1', 'true'),
+                to_attr='task_page' if paged else None
+            ))
+        if paged:
+            for column in board.columns.all():
+                tasks = getattr(column, 'task_page', [])
+                column.has_more = len(tasks) > limit
+                column.task_page = tasks[:limit]
+                column.next = None
+                if column.has_more:
+                    last = column.task_page[-1]
+                    column.next = encode_cursor([last.rank, last.pk])
+
+        serializer_class = BoardPageSerializer if paged else BoardDetailSerializer
+        return serializer_class(board, context={'fields': fields, 'expand': expand}).data
+
+
+class BoardUpdateView(BoardObjectMixin, APIView):
+    permission_classes=(IsAuthenticated, HasBoardRole)
+    board_role = BoardMembership.ADMIN
+    def put(self, request, pk):
+        board = self.get_board_object(Board.objects, pk)
+
+        with if_match(request, board.pk, lambda version: board_etag(board.pk, version)) as response:
+            if response:
+                return response
+
+            serializer = BoardDetailSerializer(instance=board, data=request.data)
+
+            if serializer.is_valid():
+                serializer.save()
+                version = Board.objects.values_list('version', flat=True).get(pk=board.pk)
+                return Response(serializer.data, headers={'ETag': board_etag(board.pk, version)})
+            else:
+                return Response(status=status.HTTP_400_BAD_REQUEST)
         
 
-class BoardDeleteView(APIView):
+class BoardChangesView(BoardObjectMixin, APIView):
+    """
+    Columns, tasks and subtasks changed since the board version ``?since=``
+    (the ``version`` of the previous response), plus the ids deleted since.
+    Without ``since`` the whole board is returned.
+    """
+    permission_classes=(IsAuthenticated, HasBoardRole)
+    def get(self, request, pk):
+        board = self.get_board_object(Board.objects, pk)
+
+        since = request.query_params.get('since')
+        if since is not None:
+            try:
+                since = int(since)
+            except ValueError:
+                since = -1
+            if not 0 <= since <= board.version:
+                return Response(
+                    {
+                        'error': 'since must be a version returned by this endpoint.'
+                    },
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        return Response(board_changes(board, since))
+
+
+class BoardStatsView(BoardObjectMixin, APIView):
+    """Task counts and subtask completion per column, and the tasks updated last."""
+    permission_classes=(IsAuthenticated, HasBoardRole)
+    def get(self, request, pk):
+        board = self.get_board_object(Board.objects, pk)
+        return Response(board_stats(board))
+
+
+class UserStatsView(APIView):
+    """Totals of every board the user can open, and the tasks updated last across them."""
+    permission_classes = (IsAuthenticated, )
+    def get(self, request):
+        return Response(user_stats(accessible_board_ids(request.user.pk)))
+
+
+class BoardExportView(BoardObjectMixin, APIView):
+    permission_classes=(IsAuthenticated, HasBoardRole)
+    throttle_scope = 'heavy'
+    def get(self, request, pk):
+        board = self.get_board_object(Board.objects, pk)
+
+        return StreamingHttpResponse(
+            export_board(board),
+            content_type='application/x-ndjson',
+            headers={
+                'Content-Disposition': f'attachment; filename="board-{board.pk}.jsonl"'
+            }
+        )
+
+
+class BoardImportView(APIView):
+    """
+    Create a board from the JSON Lines export in the request body. The
+    body is read line by line instead of being parsed as a whole.
+    """
     permission_classes=(IsAuthenticated, )
-    def delete(self, request, pk):
+    throttle_scope = 'heavy'
+    def post(self, request):
         try:
-            board = Board.objects.get(pk=pk)
-        except Board.DoesNotExist:
+            board = import_board(
+                request.stream or (),
+                request.user,
+                name=request.query_params.get('name')
+            )
+        except InvalidImport as error:
             return Response(
                 {
-                    'error':'Board not found.'
+                    'error': str(error)
                 },
-                status=status.HTTP_404_NOT_FOUND
+                status=status.HTTP_400_BAD_REQUEST
             )
-        
-        is_owner(board, request)
-        
-        board.delete()
-        return Response(status=status.HTTP_204_NO_CONTENT)
 
+        serializer = BoardListSerializer(board)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+
+class BoardCloneView(BoardObjectMixin, APIView):
+    """
+    Copy a board, with its columns, tasks and subtasks, into a new board
+    of the requesting user; viewers may clone since the source is only
+    read. ``is_template`` marks the copy as a template, and cloning a
+    template creates a board from it.
+    """
+    permission_classes=(IsAuthenticated, HasBoardRole)
+    throttle_scope = 'heavy'
+    board_role = BoardMembership.VIEWER
+    def post(self, request, pk):
+        board = self.get_board_object(Board.objects, pk)
+
+        serializer = BoardCloneSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        clone = clone_board(board, request.user, **serializer.validated_data)
+        serializer = BoardListSerializer(clone)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+
+class BoardDeleteView(BoardObjectMixin, APIView):
+    permission_classes=(IsAuthenticated, HasBoardRole)
+    board_role = OWNER
+    def delete(self, request, pk):
+        board = self.get_board_object(Board.objects, pk)
+
+        with if_match(request, board.pk, lambda version: board_etag(board.pk, version)) as response:
+            if response:
+                return response
+
+            if delete_or_schedule_board(board):
+                return Response(status=status.HTTP_202_ACCEPTED)
+            return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class BoardMemberListView(BoardObjectMixin, APIView):
+    permission_classes=(IsAuthenticated, HasBoardRole)
+    board_role = {'POST': BoardMembership.ADMIN}
 
-class ColumnListView(APIView):
-    permission_classes=(IsAuthenticated, )
     def get(self, request, board_pk):
-        try:
-            board = Board.objects.get(pk=board_pk)
-            
-            is_owner(board, request)
-        
-        except Board.DoesNotExist:
+        board = self.get_board_object(Board.objects, board_pk)
+        memberships = board.memberships.select_related('user').order_by('id')
+        serializer = BoardMembershipSerializer(memberships, many=True)
+        return Response(serializer.data)
+
+    def post(self, request, board_pk):
+        board = self.get_board_object(Board.objects, board_pk)
+        serializer = BoardMembershipSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        user = serializer.validated_data['user']
+        if user.pk == board.owner_id or board.memberships.filter(user=user).exists():
             return Response(
                 {
-                    'error':'Board not found.'
+                    'error': 'User is already a member of this board.'
                 },
-                status=status.HTTP_404_NOT_FOUND
+                status=status.HTTP_400_BAD_REQUEST
             )
+        serializer.save(board=board)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
 
-        serializer = ColumnListSerializer(board.columns.all(), many=True)
-        return Response(serializer.data)
 
+class BoardMemberDetailView(BoardObjectMixin, APIView):
+    permission_classes=(IsAuthenticated, HasBoardRole)
+    board_role = BoardMembership.ADMIN
 
-class ColumnCreateView(APIView):
-    permission_classes=(IsAuthenticated, )
-    def post(self, request, board_pk):
+    def get_membership(self, board_pk, user_pk):
+        board = self.get_board_object(Board.objects, board_pk)
         try:
-            board = Board.objects.get(pk=board_pk)
-            
-            is_owner(board, request)
+            return board.memberships.select_related('user').get(user_id=user_pk)
+        except BoardMembership.DoesNotExist:
+            raise NotFound('Member not found.')
 
-        except Board.DoesNotExist:
-            return Response(
-                {
-                    'error':'Board not found.'
-                },
-                status=status.HTTP_404_NOT_FOUND
-            )
+    def put(self, request, board_pk, user_pk):
+        membership = self.get_membership(board_pk, user_pk)
+        serializer = BoardMembershipSerializer(membership, data=request.data, partial=True)
+        if serializer.is_valid():
+            serializer.save()
+            return Response(serializer.data)
+        else:
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    def delete(self, request, board_pk, user_pk):
+        self.get_membership(board_pk, user_pk).delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class ColumnListView(BoardObjectMixin, APIView):
+    permission_classes=(IsAuthenticated, HasBoardRole)
+    def get(self, request, board_pk):
+        board = self.get_board_object(Board.objects, board_pk)
+
+        etag = column_list_etag(board.pk, board.version)
+        response = not_modified(request, etag)
+        if response:
+            return response
+
+        serializer = ColumnListSerializer(board.columns.order_by('id'), many=True)
+        return Response(serializer.data, headers={'ETag': etag})
+
+
+class ColumnCreateView(BoardObjectMixin, APIView):
+    permission_classes=(IsAuthenticated, HasBoardRole)
+    def post(self, request, board_pk):
+        board = self.get_board_object(Board.objects, board_pk)
         
         serializer = ColumnListSerializer(data=request.data)
         if serializer.is_valid():
@@ -145,62 +418,282 @@ class ColumnCreateView(APIView):
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         
 
-class ColumnDeleteView(APIView):
-    permission_classes = (IsAuthenticated, )
+class ColumnDeleteView(BoardObjectMixin, APIView):
+    permission_classes = (IsAuthenticated, HasBoardRole)
     def delete(self, request, pk):
+        column = self.get_board_object(Column.objects, pk)
+
+        with if_match(
+            request, column.board_id, lambda version: board_etag(column.board_id, version)
+        ) as response:
+            if response:
+                return response
+
+            delete_column(column)
+            return Response(status=status.HTTP_204_NO_CONTENT)
+    
+
+class TaskDetailView(BoardObjectMixin, APIView):
+    """``?fields=id,title`` returns only those fields and loads only their columns."""
+    permission_classes = (IsAuthenticated, HasBoardRole)
+    model_fields = {
+        'id': (),
+        'title': ('title', ),
+        'description': ('description', ),
+        'status': ('status', ),
+        'subtasks': (),
+    }
+
+    def get(self, request, pk):
+        fields = parse_field_paths(request.query_params.get('fields'))
+        tasks = Task.objects.with_etag_state()
+        if fields:
+            tasks = tasks.only(
+                'id', 'board', 'sequence', 'subtask_total',
+                *[column for field in fields for column in self.model_fields.get(field, ())]
+            )
+        task = self.get_board_object(tasks, pk)
+
+        variant = (request.query_params['fields'], ) if fields else ()
+        etag = task_etag(task, *variant)
+        response = not_modified(request, etag)
+        if response:
+            return response
+        
+        serializer = TaskDetailSerializer(task, context={'fields': fields})
+        return Response(serializer.data, headers={'ETag': etag})
+
+
+def task_filters(params):
+    """
+    The ``?title=`` (prefix), ``?updated_since=`` (ISO 8601) and
+    ``?incomplete=true`` (some subtask not selected) task filters as a
+    ``Q``; raises ``ValueError`` on a malformed value.
+    """
+    conditions = Q()
+    if params.get('title'):
+        conditions &= Q(title__startswith=params['title'])
+    if params.get('updated_since'):
+        since = parse_datetime(params['updated_since'])
+        if since is None:
+            raise ValueError(params['updated_since'])
+        if timezone.is_naive(since):
+            since = timezone.make_aware(since)
+        conditions &= Q(updated_at__gte=since)
+    if params.get('incomplete') in ('1', 'true'):
+        conditions &= Q(subtask_selected__lt=F('subtask_total'))
+    return conditions
+
+
+class TaskListView(APIView):
+    """
+    Keyset-paginated task listing scoped to a board (``?board=``) or a
+    column (``?status=``), newest first, or in board order within a
+    column with ``?order=rank``. Accepts the filters of ``task_filters``.
+    """
+    permission_classes = (IsAuthenticated, )
+    default_limit = 50
+    max_limit = 200
+    fields = {
+        'id': ('id', ),
+        'title': ('title', ),
+        'description': ('description', ),
+        'status': ('status_id', ),
+        'owner': ('owner_id', ),
+        'created_at': ('created_at', ),
+        'updated_at': ('updated_at', ),
+        'subtask_count': ('subtask_total', 'subtask_selected'),
+    }
+    default_fields = ('id', 'title', 'status', 'updated_at', 'subtask_count')
+
+    def get(self, request):
+        params = request.query_params
         try:
-            column = Column.objects.get(pk=pk)
-        except Column.DoesNotExist:
+            board_pk = int(params['board']) if 'board' in params else None
+            column_pk = int(params['status']) if 'status' in params else None
+            owner_pk = int(params['owner']) if 'owner' in params else None
+            limit = min(int(params.get('limit', self.default_limit)), self.max_limit)
+        except ValueError:
             return Response(
                 {
-                    'error':'Column not found.'
+                    'error': 'board, status, owner and limit must be integers.'
                 },
-                status=status.HTTP_404_NOT_FOUND
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if board_pk is None and column_pk is None:
+            return Response(
+                {
+                    'error': 'Either board or status is required.'
+                },
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        by_rank = params.get('order') == 'rank'
+        if by_rank and column_pk is None:
+            return Response(
+                {
+                    'error': 'order=rank requires status.'
+                },
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            conditions = task_filters(params)
+        except ValueError:
+            return Response(
+                {
+                    'error': 'updated_since must be an ISO 8601 datetime.'
+                },
+                status=status.HTTP_400_BAD_REQUEST
             )
-        
-        is_owner(column, request)
-        
-        column.delete()
-        return Response(status=status.HTTP_204_NO_CONTENT)
-    
 
-class TaskDetailView(APIView):
-    permission_classes = (IsAuthenticated, )
-    def get(self, request, pk):
+        requested = params.get('fields')
+        requested = requested.split(',') if requested else self.default_fields
+        unknown = set(requested) - set(self.fields)
+        if unknown:
+            return Response(
+                {
+                    'error': f'Unknown fields: {", ".join(sorted(unknown))}.'
+                },
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        tasks = Task.objects.all()
+        if column_pk is not None:
+            board_id = Column.objects.filter(pk=column_pk).values_list('board_id', flat=True).first()
+            if board_id is None or not has_board_role(request.user.pk, board_id):
+                return Response(
+                    {
+                        'error':'Column not found.'
+                    },
+                    status=status.HTTP_404_NOT_FOUND
+                )
+            tasks = tasks.filter(status_id=column_pk)
+        if board_pk is not None:
+            if not has_board_role(request.user.pk, board_pk):
+                return Response(
+                    {
+                        'error':'Board not found.'
+                    },
+                    status=status.HTTP_404_NOT_FOUND
+                )
+            tasks = tasks.filter(board_id=board_pk)
+        if owner_pk is not None:
+            tasks = tasks.filter(owner_id=owner_pk)
+        tasks = tasks.filter(conditions)
+
+        keyset = ('rank', 'id') if by_rank else ('updated_at', 'id')
+        columns = set(keyset)
+        for field in requested:
+            columns.update(self.fields[field])
         try:
-            task = Task.objects.get(pk=pk)
-        except Task.DoesNotExist:
+            rows, next_cursor = paginate_keyset(
+                tasks.values(*columns),
+                params.get('cursor'),
+                max(limit, 1),
+                fields=keyset,
+                descending=not by_rank
+            )
+        except InvalidCursor:
             return Response(
                 {
-                    'error': 'Task not found.'
+                    'error': 'Invalid cursor.'
                 },
-                status=status.HTTP_404_NOT_FOUND
+                status=status.HTTP_400_BAD_REQUEST
             )
-        
-        is_owner(task, request)
-        
-        serializer = TaskDetailSerializer(task)
-        return Response(serializer.data)
+
+        results = []
+        for row in rows:
+            item = {}
+            for field in requested:
+                if field == 'subtask_count':
+                    item[field] = {
+                        'total': row['subtask_total'],
+                        'selected': row['subtask_selected']
+                    }
+                else:
+                    item[field] = row[self.fields[field][0]]
+            results.append(item)
+        return Response({'results': results, 'next': next_cursor})
 
 
-class TaskCreateView(APIView):
+class TaskSearchView(APIView):
+    """
+    Ranked full-text search over the tasks of the user's boards. Every word
+    of ``?q=`` must match the start of a word in the title, description or
+    a subtask title; ``?board=`` narrows the search to one board.
+    """
     permission_classes = (IsAuthenticated, )
-    def post(self, request, board_pk):
+    default_limit = 20
+    max_limit = 100
+
+    def get(self, request):
+        params = request.query_params
+        if not search_terms(params.get('q', '')):
+            return Response(
+                {
+                    'error': 'q must contain at least one word.'
+                },
+                status=status.HTTP_400_BAD_REQUEST
+            )
         try:
-            board = Board.objects.get(pk=board_pk)
-            is_owner(board, request)
-            
-        except Board.DoesNotExist:
+            board_pk = int(params['board']) if 'board' in params else None
+            limit = min(int(params.get('limit', self.default_limit)), self.max_limit)
+        except ValueError:
             return Response(
                 {
-                    'error':'Board not found.'
+                    'error': 'board and limit must be integers.'
                 },
-                status=status.HTTP_404_NOT_FOUND
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        board_ids = accessible_board_ids(request.user.pk)
+        if board_pk is not None:
+            board_ids = [board_pk] if board_pk in board_ids else []
+        tasks = Task.objects.filter(board_id__in=board_ids)
+        try:
+            rows, next_cursor = paginate_keyset(
+                search_tasks(tasks, params['q']).values(
+                    'id', 'title', 'status', 'board', 'score'
+                ),
+                params.get('cursor'),
+                max(limit, 1),
+                fields=('score', 'id')
             )
+        except InvalidCursor:
+            return Response(
+                {
+                    'error': 'Invalid cursor.'
+                },
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        except NotSupportedError as error:
+            return Response(
+                {
+                    'error': str(error)
+                },
+                status=status.HTTP_501_NOT_IMPLEMENTED
+            )
+
+        results = [
+            {
+                'id': row['id'],
+                'title': row['title'],
+                'status': row['status'],
+                'board': row['board'],
+                'score': row['score']
+            }
+            for row in rows
+        ]
+        return Response({'results': results, 'next': next_cursor})
+
+
+class TaskCreateView(BoardObjectMixin, APIView):
+    permission_classes = (IsAuthenticated, HasBoardRole)
+    def post(self, request, board_pk):
+        board = self.get_board_object(Board.objects, board_pk)
         
         serializer = TaskDetailSerializer(
             data=request.data,
-            context={'request':request}
+            context={'request':request, 'board':board}
         )
         if serializer.is_valid():
             serializer.save()
@@ -209,116 +702,387 @@ class TaskCreateView(APIView):
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         
 
-class TaskUpdateView(APIView):
-    permission_classes = (IsAuthenticated, )
+class TaskUpdateView(BoardObjectMixin, APIView):
+    permission_classes = (IsAuthenticated, HasBoardRole)
     def put(self, request, pk):
-        try:
-            task = Task.objects.get(pk=pk)
-        except Task.DoesNotExist:
+        task = self.get_board_object(Task.objects, pk)
+
+        with if_match(
+            request, task.board_id, lambda version: current_task_etag(task.pk)
+        ) as response:
+            if response:
+                return response
+
+            serializer = TaskDetailSerializer(instance=task, data=request.data)
+
+            if serializer.is_valid():
+                task = serializer.save()
+                return Response(serializer.data, headers={'ETag': current_task_etag(task.pk)})
+            else:
+                return Response(status=status.HTTP_400_BAD_REQUEST)
+        
+
+class TaskMoveView(BoardObjectMixin, APIView):
+    permission_classes = (IsAuthenticated, HasBoardRole)
+    def post(self, request, pk):
+        task = self.get_board_object(Task.objects, pk)
+
+        serializer = TaskMoveSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        data = serializer.validated_data
+
+        sibling = None
+        sibling_pk = data.get('before', data.get('after'))
+        if sibling_pk is not None:
+            try:
+                sibling = Task.objects.get(pk=sibling_pk, board=task.board_id)
+            except Task.DoesNotExist:
+                return Response(
+                    {
+                        'error': 'Sibling task not found.'
+                    },
+                    status=status.HTTP_404_NOT_FOUND
+                )
+
+        column_id = data.get('status', sibling.status_id if sibling else task.status_id)
+        if sibling is not None and sibling.status_id != column_id:
             return Response(
                 {
-                    'error':'Task not found.'
+                    'error': 'Sibling task is in another column.'
+                },
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if column_id != task.status_id and not Column.objects.filter(
+            pk=column_id, board=task.board_id
+        ).exists():
+            return Response(
+                {
+                    'error': 'Column not found.'
                 },
                 status=status.HTTP_404_NOT_FOUND
             )
-        
-        is_owner(task, request)
 
-        serializer = TaskDetailSerializer(instance=task, data=request.data)
+        with transaction.atomic():
+            task.move(
+                column_id,
+                before=sibling if 'before' in data else None,
+                after=sibling if 'after' in data else None
+            )
+        return Response({'id': task.pk, 'status': task.status_id, 'rank': task.rank})
 
-        if serializer.is_valid():
-            serializer.save()
-            return Response(serializer.data)
-        else:
-            return Response(status=status.HTTP_400_BAD_REQUEST)
-        
 
-class TaskDeleteView(APIView):
-    permission_classes = (IsAuthenticated, )
+class TaskDeleteView(BoardObjectMixin, APIView):
+    permission_classes = (IsAuthenticated, HasBoardRole)
     def delete(self, request, pk):
-        try:
-            task = Task.objects.get(pk=pk)
-        except Task.DoesNotExist:
+        task = self.get_board_object(Task.objects, pk)
+
+        with if_match(
+            request, task.board_id, lambda version: current_task_etag(task.pk)
+        ) as response:
+            if response:
+                return response
+
+            # Not task.delete(): the cascade would run the post_delete
+            # handlers of every subtask, each bumping the board version.
+            with transaction.atomic():
+                remove_tasks({task.pk: task.board_id})
+            return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class SubtaskCreateView(BoardObjectMixin, APIView):
+    permission_classes = (IsAuthenticated, HasBoardRole)
+    def post(self, request, task_pk):
+        task = self.get_board_object(Task.objects, task_pk)
+        
+        serializer = SubtaskSerializer(data=request.data)
+        if serializer.is_valid():
+            with transaction.atomic():
+                subtask = serializer.save(task=task, owner=request.user)
+                Task.objects.filter(pk=task.pk).adjust_subtask_counters(
+                    total=1,
+                    selected=int(subtask.is_selected)
+                )
+            return Response(serializer.data, status=status.HTTP_201_CREATED)
+        else:
             return Response(
                 {
-                    'error': 'Task not found.'
+                    'error': serializer.errors
                 },
-                status=status.HTTP_404_NOT_FOUND
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+
+class SubtaskDeleteView(BoardObjectMixin, APIView):
+    permission_classes = (IsAuthenticated, HasBoardRole)
+    def delete(self, request, pk):
+        subtask = self.get_board_object(Subtask.objects, pk)
+
+        with if_match(
+            request, subtask.board_id, lambda version: current_task_etag(subtask.task_id)
+        ) as response, transaction.atomic():
+            if response:
+                return response
+
+            subtask.delete()
+            Task.objects.filter(pk=subtask.task_id).adjust_subtask_counters(
+                total=-1,
+                selected=-int(subtask.is_selected)
             )
-        
-        is_owner(task, request)
-        
-        task.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
+    
+
+class SubtaskUpdateView(BoardObjectMixin, APIView):
+    permission_classes = (IsAuthenticated, HasBoardRole)
+    def put(self, request, pk):
+        subtask = self.get_board_object(Subtask.objects, pk)
+
+        with if_match(
+            request, subtask.board_id, lambda version: current_task_etag(subtask.task_id)
+        ) as response:
+            if response:
+                return response
+
+            serializer = SubtaskSerializer(data=request.data, instance=subtask)
+
+            if serializer.is_valid():
+                with transaction.atomic():
+                    # Read the current state under a row lock: concurrent
+                    # toggles would otherwise both apply the same delta.
+                    was_selected = Subtask.objects.select_for_update().filter(
+                        pk=subtask.pk
+                    ).values_list('is_selected', flat=True).first()
+                    if was_selected is None:
+                        raise NotFound('Subtask not found.')
+                    subtask.loaded_is_selected = was_selected
+                    subtask = serializer.save()
+                    if subtask.is_selected != was_selected:
+                        Task.objects.filter(pk=subtask.task_id).adjust_subtask_counters(
+                            selected=1 if subtask.is_selected else -1
+                        )
+                return Response(serializer.data)
+            else:
+                return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class TaskBulkCreateView(BoardObjectMixin, APIView):
+    permission_classes = (IsAuthenticated, HasBoardRole)
+    def post(self, request, board_pk):
+        board = self.get_board_object(Board.objects, board_pk)
+
+        serializer = TaskBulkSerializer(
+            data=request.data,
+            many=True,
+            max_length=settings.TASKMANAGEMENT_BULK_MAX_ITEMS,
+            context={
+                'request': request,
+                'column_ids': set(board.columns.values_list('pk', flat=True))
+            }
+        )
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+        tasks, subtasks = bulk_create_tasks(request.user, serializer.validated_data)
+        subtask_ids = {}
+        for subtask in subtasks:
+            subtask_ids.setdefault(subtask.task_id, []).append(subtask.pk)
+        results = [
+            {
+                'index': index,
+                'status': 'created',
+                'id': task.pk,
+                'subtasks': subtask_ids.get(task.pk, [])
+            }
+            for index, task in enumerate(tasks)
+        ]
+        return Response(results, status=status.HTTP_201_CREATED)
 
-class SubtaskCreateView(APIView):
+
+class TaskBulkDeleteView(APIView):
     permission_classes = (IsAuthenticated, )
-    def post(self, request, task_pk):
-        try:
-            task = Task.objects.get(pk=task_pk)
-            
-            is_owner(task, request)
+    def post(self, request):
+        serializer = TaskBulkDeleteSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-        except Task.DoesNotExist:
+        ids = serializer.validated_data['ids']
+        deleted = bulk_delete_tasks(request.user, ids)
+        results = [
+            {
+                'id': pk,
+                'status': 'deleted' if pk in deleted else 'not_found'
+            }
+            for pk in ids
+        ]
+        return Response(results)
+
+
+class SubtaskBulkUpdateView(APIView):
+    permission_classes = (IsAuthenticated, )
+    def patch(self, request):
+        serializer = SubtaskPatchSerializer(
+            data=request.data,
+            many=True,
+            max_length=settings.TASKMANAGEMENT_BULK_MAX_ITEMS
+        )
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        updated = bulk_update_subtasks(request.user, serializer.validated_data)
+        results = []
+        for patch in serializer.validated_data:
+            subtask = updated.get(patch['id'])
+            if subtask is None:
+                results.append({'id': patch['id'], 'status': 'not_found'})
+            else:
+                results.append({
+                    'id': subtask.pk,
+                    'status': 'updated',
+                    'data': SubtaskSerializer(subtask).data
+                })
+        return Response(results)
+
+
+class ActivityFeedView(BoardObjectMixin, APIView):
+    """Newest-first activity log, keyset-paginated on the entry id."""
+    permission_classes = (IsAuthenticated, HasBoardRole)
+    default_limit = 50
+    max_limit = 200
+
+    def feed(self, request, entries):
+        try:
+            limit = min(int(request.query_params.get('limit', self.default_limit)), self.max_limit)
+        except ValueError:
             return Response(
                 {
-                    'error': 'Task not found.'
+                    'error': 'limit must be an integer.'
                 },
-                status=status.HTTP_404_NOT_FOUND
+                status=status.HTTP_400_BAD_REQUEST
             )
-        
-        serializer = SubtaskSerializer(data=request.data)
-        if serializer.is_valid():
-            serializer.save(task=task, owner=request.user)
-            return Response(serializer.data, status=status.HTTP_201_CREATED)
-        else:
+        try:
+            rows, next_cursor = paginate_keyset(
+                entries.values(
+                    'id', 'verb', 'actor', 'task_id', 'subtask_id', 'data', 'created_at'
+                ),
+                request.query_params.get('cursor'),
+                max(limit, 1),
+                fields=('id', )
+            )
+        except InvalidCursor:
             return Response(
                 {
-                    'error': serializer.erorrs
+                    'error': 'Invalid cursor.'
                 },
                 status=status.HTTP_400_BAD_REQUEST
             )
 
+        results = [
+            {
+                'id': row['id'],
+                'verb': row['verb'],
+                'actor': row['actor'],
+                'task': row['task_id'],
+                'subtask': row['subtask_id'],
+                'data': row['data'],
+                'created_at': row['created_at']
+            }
+            for row in rows
+        ]
+        return Response({'results': results, 'next': next_cursor})
 
-class SubtaskDeleteView(APIView):
-    permission_classes = (IsAuthenticated, )
-    def delete(self, request, pk):
+
+class BoardActivityView(ActivityFeedView):
+    def get(self, request, pk):
+        board = self.get_board_object(Board.objects, pk)
+        return self.feed(request, Activity.objects.filter(board=board.pk))
+
+
+class TaskActivityView(ActivityFeedView):
+    def get(self, request, pk):
+        task = self.get_board_object(Task.objects.only('id', 'board'), pk)
+        return self.feed(request, Activity.objects.filter(task_id=task.pk))
+
+
+class ArchivedTaskListView(BoardObjectMixin, APIView):
+    """
+    The archived tasks of a board, most recently archived first,
+    keyset-paginated; ``?title=`` filters on a title prefix.
+    """
+    permission_classes = (IsAuthenticated, HasBoardRole)
+    default_limit = 50
+    max_limit = 200
+
+    def get(self, request, pk):
+        board = self.get_board_object(Board.objects, pk)
+
+        params = request.query_params
         try:
-            subtask = Subtask.objects.get(pk=pk)
-        except Subtask.DoesNotExist:
+            limit = min(int(params.get('limit', self.default_limit)), self.max_limit)
+        except ValueError:
             return Response(
                 {
-                    'error': 'Subtask not found.'
+                    'error': 'limit must be an integer.'
                 },
-                status=status.HTTP_404_NOT_FOUND
+                status=status.HTTP_400_BAD_REQUEST
             )
-        
-        is_owner(subtask, request)
-        
-        subtask.delete()
-        return Response(status=status.HTTP_204_NO_CONTENT)
-    
-
-class SubtaskUpdateView(APIView):
-    permission_classes = (IsAuthenticated, )
-    def put(self, request, pk):
+        tasks = ArchivedTask.objects.filter(board=board.pk)
+        if params.get('title'):
+            tasks = tasks.filter(title__startswith=params['title'])
         try:
-            subtask = Subtask.objects.get(pk=pk)
-        except:
+            rows, next_cursor = paginate_keyset(
+                tasks.values(
+                    'id', 'title', 'status', 'subtask_total', 'subtask_selected',
+                    'updated_at', 'archived_at'
+                ),
+                params.get('cursor'),
+                max(limit, 1),
+                fields=('archived_at', 'id')
+            )
+        except InvalidCursor:
             return Response(
                 {
-                    "error": "Subtask not found."
+                    'error': 'Invalid cursor.'
                 },
-                status=status.HTTP_404_NOT_FOUND
+                status=status.HTTP_400_BAD_REQUEST
             )
-        
-        is_owner(subtask, request)
 
-        serializer = SubtaskSerializer(data=request.data, instance=subtask)
+        results = [
+            {
+                'id': row['id'],
+                'title': row['title'],
+                'status': row['status'],
+                'subtask_count': {
+                    'total': row['subtask_total'],
+                    'selected': row['subtask_selected']
+                },
+                'updated_at': row['updated_at'],
+                'archived_at': row['archived_at']
+            }
+            for row in rows
+        ]
+        return Response({'results': results, 'next': next_cursor})
 
-        if serializer.is_valid():
-            serializer.save()
-            return Response(serializer.data)
-        else:
-            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
\ No newline at end of file
+
+class ArchivedTaskRestoreView(BoardObjectMixin, APIView):
+    """Move an archived task back to the end of its column."""
+    permission_classes = (IsAuthenticated, HasBoardRole)
+    def post(self, request, pk):
+        archived = self.get_board_object(ArchivedTask.objects, pk)
+
+        task = restore_task(archived)
+        serializer = TaskDetailSerializer(Task.objects.prefetch_related('subtasks').get(pk=task.pk))
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+
+class MetricsView(APIView):
+    permission_classes = (IsAdminUser, )
+    def get(self, request):
+        return Response({
+            'routes': registry.snapshot(),
+            'board_cache': board_cache.stats()
+        })
+
+    def delete(self, request):
+        registry.reset()
+        board_cache.reset_stats()
+        return Response(status=status.HTTP_204_NO_CONTENT)
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class TaskmanagementConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'taskmanagement'
+
+    def ready(self):
+        from . import checks, instrumentation, signals  # noqa: F401
@@ -0,0 +1,111 @@
+"""
+Archiving of old tasks into cold storage.
+
+Tasks untouched for ``TASKMANAGEMENT_ARCHIVE_AFTER_DAYS`` days, or for
+``TASKMANAGEMENT_ARCHIVE_DONE_AFTER_DAYS`` days in a column named in
+``TASKMANAGEMENT_ARCHIVE_DONE_COLUMNS``, are moved with their subtasks to
+``ArchivedTask`` and ``ArchivedSubtask`` in chunks, one transaction each.
+Board reads, listings, search and sync only ever see the hot tables; to
+clients an archived task looks deleted until it is restored.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .bulk import BATCH_SIZE, raw_delete, remove_tasks
+from .models import ArchivedSubtask, ArchivedTask, Subtask, Task
+from .ranking import rank_between
+from .search import index_tasks
+
+
+TASK_FIELDS = (
+    'id', 'title', 'description', 'status_id', 'board_id', 'owner_id',
+    'subtask_total', 'subtask_selected', 'created_at', 'updated_at'
+)
+SUBTASK_FIELDS = ('id', 'title', 'is_selected', 'task_id', 'owner_id', 'created_at', 'updated_at')
+
+
+def archivable(days=None, done_days=None, done_columns=None, now=None):
+    """The tasks the archiving policy selects, as a ``Task`` queryset."""
+    now = now or timezone.now()
+    days = settings.TASKMANAGEMENT_ARCHIVE_AFTER_DAYS if days is None else days
+    done_days = settings.TASKMANAGEMENT_ARCHIVE_DONE_AFTER_DAYS if done_days is None else done_days
+    if done_columns is None:
+        done_columns = settings.TASKMANAGEMENT_ARCHIVE_DONE_COLUMNS
+
+    conditions = Q(updated_at__lt=now - timedelta(days=days))
+    if done_columns:
+        conditions |= Q(
+            status__name__in=done_columns,
+            updated_at__lt=now - timedelta(days=done_days)
+        )
+    return Task.objects.filter(conditions)
+
+
+@transaction.atomic
+def archive_chunk(task_ids):
+    """Move the tasks in ``task_ids`` and their subtasks to the archive; returns the number moved."""
+    tasks = list(Task.objects.filter(pk__in=task_ids).values(*TASK_FIELDS))
+    ArchivedTask.objects.bulk_create(
+        [ArchivedTask(**task) for task in tasks],
+        batch_size=BATCH_SIZE
+    )
+    ArchivedSubtask.objects.bulk_create(
+        [
+            ArchivedSubtask(**subtask)
+            for subtask in Subtask.objects.filter(task__in=task_ids).values(*SUBTASK_FIELDS)
+        ],
+        batch_size=BATCH_SIZE
+    )
+    remove_tasks({task['id']: task['board_id'] for task in tasks}, 'task.archived')
+    return len(tasks)
+
+
+def archive_tasks(queryset, size=None):
+    """Archive every task of ``queryset`` in chunks of ``size``; returns the number archived."""
+    size = size or settings.TASKMANAGEMENT_DELETE_CHUNK_SIZE
+    archived = 0
+    while True:
+        task_ids = list(queryset.order_by().values_list('pk', flat=True)[:size])
+        if not task_ids:
+            return archived
+        archived += archive_chunk(task_ids)
+
+
+@transaction.atomic
+def restore_task(archived):
+    """
+    Move an archived task back, at the end of its column, with its
+    subtasks; returns the restored ``Task``.
+    """
+    task = Task(
+        id=archived.pk,
+        title=archived.title,
+        description=archived.description,
+        status_id=archived.status_id,
+        board_id=archived.board_id,
+        owner_id=archived.owner_id,
+        subtask_total=archived.subtask_total,
+        subtask_selected=archived.subtask_selected,
+        rank=rank_between(Task.objects.in_locked_column(archived.status_id).last_rank(), None)
+    )
+    # Saved like any new task: stamped with a board version, indexed and
+    # published as task.created.
+    task.save(force_insert=True)
+    Task.objects.filter(pk=task.pk).update(created_at=archived.created_at)
+    task.created_at = archived.created_at
+
+    Subtask.objects.bulk_create(
+        [
+            Subtask(board_id=task.board_id, sequence=task.sequence, **subtask)
+            for subtask in archived.subtasks.order_by('id').values(*SUBTASK_FIELDS)
+        ],
+        batch_size=BATCH_SIZE
+    )
+    index_tasks([task.pk])
+    raw_delete(ArchivedSubtask.objects.filter(task=archived.pk))
+    raw_delete(ArchivedTask.objects.filter(pk=archived.pk))
+    return task
@@ -0,0 +1,22 @@
+"""
+Helpers shared by the benchmark commands.
+"""
+from contextlib import contextmanager
+
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+
+@contextmanager
+def throwaway_database():
+    """
+    Run the block against a new test database of the configured backend,
+    destroyed afterwards, so benchmarks never seed or alter the real one.
+    """
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
@@ -0,0 +1,187 @@
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from .access import accessible_board_ids
+from .events import publish, subtask_event_data, task_event_data
+from .models import Board, BoardMembership, Column, Task, Subtask, Tombstone
+from .ranking import rank_between
+from .search import index_tasks, unindex_tasks
+
+
+BATCH_SIZE = 500
+
+
+def raw_delete(queryset):
+    """Delete rows with a single DELETE, skipping the cascade collector and signals."""
+    return queryset._raw_delete(queryset.db)
+
+
+def next_versions(board_ids):
+    """Bump every board once; returns ``{board_id: new version}``."""
+    return {board_id: Board.all_objects.next_version(board_id) for board_id in set(board_ids)}
+
+
+def bulk_create_columns(user, board, columns_data):
+    sequence = Board.all_objects.next_version(board.pk)
+    columns = Column.objects.bulk_create(
+        [
+            Column(owner=user, board=board, sequence=sequence, **column_data)
+            for column_data in columns_data
+        ],
+        batch_size=BATCH_SIZE
+    )
+    for column in columns:
+        publish(board.pk, 'column.added', {'id': column.pk, 'name': column.name})
+    return columns
+
+
+@transaction.atomic
+def bulk_create_tasks(user, tasks_data):
+    """
+    Insert tasks and their nested subtasks with two ``bulk_create`` calls.
+
+    ``tasks_data`` is validated data from ``TaskDetailSerializer``.
+    """
+    column_ids = {task_data['status_id'] for task_data in tasks_data}
+    # Locking the columns keeps concurrent appends from reading the same last ranks.
+    board_ids = dict(
+        Column.objects.select_for_update().filter(pk__in=column_ids)
+        .order_by('pk').values_list('pk', 'board_id')
+    )
+    versions = next_versions(board_ids.values())
+    last_ranks = dict(
+        Task.objects.filter(status__in=column_ids)
+        .values('status')
+        .annotate(last_rank=Max('rank'))
+        .values_list('status', 'last_rank')
+    )
+
+    tasks = []
+    subtasks_data = []
+    for task_data in tasks_data:
+        task_data = dict(task_data)
+        task_subtasks = task_data.pop('subtasks', [])
+        rank = rank_between(last_ranks.get(task_data['status_id']), None)
+        last_ranks[task_data['status_id']] = rank
+        board_id = board_ids[task_data['status_id']]
+        tasks.append(Task(
+            owner=user,
+            board_id=board_id,
+            sequence=versions[board_id],
+            rank=rank,
+            subtask_total=len(task_subtasks),
+            subtask_selected=sum(
+                subtask_data.get('is_selected', True) for subtask_data in task_subtasks
+            ),
+            **task_data
+        ))
+        subtasks_data.append(task_subtasks)
+
+    tasks = Task.objects.bulk_create(tasks, batch_size=BATCH_SIZE)
+    subtasks = Subtask.objects.bulk_create(
+        [
+            Subtask(
+                owner=user,
+                task=task,
+                board_id=task.board_id,
+                sequence=task.sequence,
+                **subtask_data
+            )
+            for task, task_subtasks in zip(tasks, subtasks_data)
+            for subtask_data in task_subtasks
+        ],
+        batch_size=BATCH_SIZE
+    )
+    index_tasks([task.pk for task in tasks])
+
+    for task in tasks:
+        publish(task.board_id, 'task.created', task_event_data(task))
+    return tasks, subtasks
+
+
+@transaction.atomic
+def bulk_update_subtasks(user, patches):
+    """
+    Apply ``{'id': ..., 'title': ..., 'is_selected': ...}`` patches with one
+    ``bulk_update`` and recount the counters of every touched task.
+
+    Returns the updated subtasks keyed by id.
+    """
+    subtasks = Subtask.objects.select_for_update().in_bulk(
+        [patch['id'] for patch in patches]
+    )
+    editable = set(accessible_board_ids(user.pk, BoardMembership.EDITOR))
+    subtasks = {
+        pk: subtask for pk, subtask in subtasks.items() if subtask.board_id in editable
+    }
+
+    versions = next_versions(subtask.board_id for subtask in subtasks.values())
+    now = timezone.now()
+    fields = {'updated_at', 'sequence'}
+    for patch in patches:
+        subtask = subtasks.get(patch['id'])
+        if subtask is None:
+            continue
+        for field, value in patch.items():
+            if field != 'id':
+                setattr(subtask, field, value)
+                fields.add(field)
+        subtask.updated_at = now
+        subtask.sequence = versions[subtask.board_id]
+
+    if subtasks:
+        Subtask.objects.bulk_update(subtasks.values(), fields, batch_size=BATCH_SIZE)
+        task_ids = {subtask.task_id for subtask in subtasks.values()}
+        Task.objects.filter(pk__in=task_ids).recount_subtasks()
+        if 'title' in fields:
+            index_tasks(task_ids)
+        for subtask in subtasks.values():
+            event_type = (
+                'subtask.toggled'
+                if subtask.is_selected != subtask.loaded_is_selected
+                else 'subtask.updated'
+            )
+            subtask.loaded_is_selected = subtask.is_selected
+            publish(subtask.board_id, event_type, subtask_event_data(subtask))
+    return subtasks
+
+
+@transaction.atomic
+def bulk_delete_tasks(user, task_ids):
+    """Delete tasks the user may edit, with their subtasks; returns the deleted ids."""
+    tasks = Task.objects.filter(
+        pk__in=task_ids,
+        board__in=accessible_board_ids(user.pk, BoardMembership.EDITOR)
+    )
+    board_ids = dict(tasks.values_list('pk', 'board_id'))
+    remove_tasks(board_ids)
+    return set(board_ids)
+
+
+def remove_tasks(board_ids, event_type='task.deleted'):
+    """
+    Delete the tasks of a ``{task_id: board_id}`` dict and their subtasks,
+    leaving a tombstone and publishing ``event_type`` for each task.
+    """
+    if not board_ids:
+        return
+    task_ids = list(board_ids)
+    versions = next_versions(board_ids.values())
+    Tombstone.objects.bulk_create(
+        [
+            Tombstone(
+                board_id=board_id,
+                kind=Tombstone.TASK,
+                object_id=pk,
+                sequence=versions[board_id]
+            )
+            for pk, board_id in board_ids.items()
+        ],
+        batch_size=BATCH_SIZE
+    )
+    for pk, board_id in board_ids.items():
+        publish(board_id, event_type, {'id': pk})
+    raw_delete(Subtask.objects.filter(task__in=task_ids))
+    raw_delete(Task.objects.filter(pk__in=task_ids))
+    unindex_tasks(task_ids)
@@ -0,0 +1,64 @@
+from threading import Lock
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+class BoardSnapshotCache:
+    """
+    Cache of serialized board payloads keyed by board version.
+
+    Any write to a board bumps its version, so stale snapshots are never
+    read again and simply age out of the size-bounded backend.
+    """
+
+    def __init__(self, alias=None):
+        self._alias = alias
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def backend(self):
+        alias = self._alias or getattr(settings, 'TASKMANAGEMENT_BOARD_CACHE', 'default')
+        return caches[alias]
+
+    def key(self, board_pk, version):
+        return f'board-snapshot:{board_pk}:{version}'
+
+    def get(self, board_pk, version):
+        return self._count(self.backend.get(self.key(board_pk, version)))
+
+    def set(self, board_pk, version, data):
+        self.backend.set(self.key(board_pk, version), data)
+
+    async def aget(self, board_pk, version):
+        return self._count(await self.backend.aget(self.key(board_pk, version)))
+
+    async def aset(self, board_pk, version, data):
+        await self.backend.aset(self.key(board_pk, version), data)
+
+    def _count(self, data):
+        with self._lock:
+            if data is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return data
+
+    def stats(self):
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / requests if requests else 0.0
+            }
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+
+board_cache = BoardSnapshotCache()
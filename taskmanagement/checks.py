@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+
+# Settings naming caches whose entries every worker process must share.
+SHARED_CACHE_SETTINGS = ('TASKMANAGEMENT_ACCESS_CACHE', 'TASKMANAGEMENT_THROTTLE_CACHE')
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_caches(app_configs, **kwargs):
+    if settings.DEBUG:
+        return []
+    errors = []
+    for name in SHARED_CACHE_SETTINGS:
+        alias = getattr(settings, name)
+        backend = settings.CACHES.get(alias, {}).get('BACKEND', '')
+        if backend.endswith('.LocMemCache'):
+            errors.append(Error(
+                f'{name} points at the local-memory cache {alias!r}, which is not '
+                f'shared between worker processes.',
+                hint='Configure a Redis or Memcached backend, e.g. through SHARED_CACHE_BACKEND.',
+                id='taskmanagement.E001',
+            ))
+    return errors
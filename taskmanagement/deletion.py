@@ -0,0 +1,81 @@
+"""
+Deletion of boards and columns in bounded memory.
+
+``Model.delete()`` runs Django's cascade collector, which loads every task
+and subtask (and sends a signal for each) before deleting anything. Here
+rows are removed bottom-up with chunked ``DELETE ... WHERE id IN (...)``
+statements instead, so memory stays constant however large the board is.
+"""
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .access import board_user_ids, invalidate
+from .bulk import raw_delete
+from .events import publish
+from .models import (
+    Activity, ArchivedSubtask, ArchivedTask, Board, BoardMembership,
+    BoardStats, Column, Task, Subtask, Tombstone
+)
+from .search import unindex_tasks
+
+
+def drain(queryset, size=None, on_delete=None):
+    """
+    Delete every row of ``queryset`` in chunks; returns the number deleted.
+    ``on_delete`` is called with the primary keys of every deleted chunk.
+    """
+    size = size or settings.TASKMANAGEMENT_DELETE_CHUNK_SIZE
+    model = queryset.model
+    deleted = 0
+    while True:
+        pks = list(queryset.order_by().values_list('pk', flat=True)[:size])
+        if not pks:
+            return deleted
+        deleted += raw_delete(model._base_manager.filter(pk__in=pks))
+        if on_delete is not None:
+            on_delete(pks)
+
+
+@transaction.atomic
+def delete_column(column):
+    drain(Subtask.objects.filter(task__status=column.pk))
+    drain(Task.objects.filter(status=column.pk), on_delete=unindex_tasks)
+    drain(ArchivedSubtask.objects.filter(task__status=column.pk))
+    drain(ArchivedTask.objects.filter(status=column.pk))
+    raw_delete(Column.objects.filter(pk=column.pk))
+    Tombstone.record(column.board_id, Tombstone.COLUMN, column.pk)
+    publish(column.board_id, 'column.removed', {'id': column.pk})
+
+
+@transaction.atomic
+def delete_board(board_pk):
+    invalidate(board_user_ids(board_pk))
+    drain(Subtask.objects.filter(board=board_pk))
+    drain(Task.objects.filter(board=board_pk), on_delete=unindex_tasks)
+    drain(ArchivedSubtask.objects.filter(task__board=board_pk))
+    drain(ArchivedTask.objects.filter(board=board_pk))
+    drain(Column.objects.filter(board=board_pk))
+    drain(BoardMembership.objects.filter(board=board_pk))
+    drain(Activity.objects.filter(board=board_pk))
+    drain(Tombstone.objects.filter(board=board_pk))
+    raw_delete(BoardStats.objects.filter(board=board_pk))
+    return raw_delete(Board.all_objects.filter(pk=board_pk))
+
+
+def delete_or_schedule_board(board):
+    """
+    Delete the board now, or only hide it when it has at least
+    ``TASKMANAGEMENT_SOFT_DELETE_TASKS`` tasks and leave the rows to the
+    ``purge_boards`` command. Returns True if the delete was deferred.
+    """
+    threshold = settings.TASKMANAGEMENT_SOFT_DELETE_TASKS
+    tasks = Task.objects.filter(board=board.pk)
+    deferred = bool(threshold) and tasks[threshold - 1:threshold].exists()
+    if deferred:
+        Board.objects.filter(pk=board.pk).update(deleted_at=timezone.now())
+        invalidate(board_user_ids(board.pk))
+    else:
+        delete_board(board.pk)
+    publish(board.pk, 'board.deleted', {'id': board.pk})
+    return deferred
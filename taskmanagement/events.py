@@ -0,0 +1,105 @@
+"""
+In-process publish/subscribe of board change events.
+
+Writers publish from synchronous code (views, signals); subscribers are
+async generators running on an event loop, so delivery goes through
+``loop.call_soon_threadsafe``. Every board keeps a bounded history of
+recent events so reconnecting clients can resume from ``Last-Event-ID``.
+The broker class is pluggable through ``TASKMANAGEMENT_EVENT_BROKER``.
+"""
+import asyncio
+from collections import defaultdict, deque
+from threading import Lock
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+from . import activity
+
+
+class InMemoryBroker:
+    def __init__(self, history=1000):
+        self._lock = Lock()
+        self._sequence = defaultdict(int)
+        self._history = defaultdict(lambda: deque(maxlen=history))
+        self._subscribers = defaultdict(set)
+
+    def publish(self, board_id, event_type, data):
+        with self._lock:
+            self._sequence[board_id] += 1
+            event = {'id': self._sequence[board_id], 'type': event_type, 'data': data}
+            self._history[board_id].append(event)
+            subscribers = list(self._subscribers[board_id])
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, event)
+            except RuntimeError:
+                # The subscriber's loop has closed; its generator cleans up.
+                pass
+        return event
+
+    async def subscribe(self, board_id, last_event_id=None, heartbeat=None):
+        """
+        Yield events for ``board_id``, first replaying history newer than
+        ``last_event_id``. Yields ``None`` every ``heartbeat`` seconds of
+        silence so callers can keep the connection alive.
+        """
+        queue = asyncio.Queue()
+        subscriber = (asyncio.get_running_loop(), queue)
+        with self._lock:
+            if last_event_id is not None:
+                for event in self._history[board_id]:
+                    if event['id'] > last_event_id:
+                        queue.put_nowait(event)
+            self._subscribers[board_id].add(subscriber)
+        try:
+            while True:
+                try:
+                    yield await asyncio.wait_for(queue.get(), heartbeat)
+                except asyncio.TimeoutError:
+                    yield None
+        finally:
+            with self._lock:
+                self._subscribers[board_id].discard(subscriber)
+
+
+_broker = None
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        path = getattr(
+            settings,
+            'TASKMANAGEMENT_EVENT_BROKER',
+            'taskmanagement.events.InMemoryBroker'
+        )
+        _broker = import_string(path)()
+    return _broker
+
+
+def publish(board_id, event_type, data):
+    """Publish, and record in the activity log, once the surrounding transaction commits."""
+    if board_id is None:
+        return
+    activity.record(board_id, event_type, data)
+    transaction.on_commit(lambda: get_broker().publish(board_id, event_type, data))
+
+
+def task_event_data(task):
+    return {
+        'id': task.pk,
+        'title': task.title,
+        'status': task.status_id,
+        'rank': task.rank
+    }
+
+
+def subtask_event_data(subtask):
+    return {
+        'id': subtask.pk,
+        'task': subtask.task_id,
+        'title': subtask.title,
+        'is_selected': subtask.is_selected
+    }
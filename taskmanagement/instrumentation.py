@@ -0,0 +1,163 @@
+"""
+Per-route request metrics: SQL query count, DB time, serialization time
+and total time, plus a latency histogram for every URL name.
+
+Queries are counted by an execute wrapper installed on every database
+connection; it records into the metrics of the current request, held in a
+context variable so it follows requests into ``sync_to_async`` threads.
+Serialization covers both the outermost ``to_representation`` call of the
+app's serializers (``TimedSerializerMixin``), minus the queries it runs,
+and the rendering of the response.
+"""
+import logging
+from bisect import bisect_left
+from collections import Counter
+from contextvars import ContextVar
+from threading import Lock
+from time import perf_counter
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open.
+BUCKETS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+current_metrics = ContextVar('current_metrics', default=None)
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.started = perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.serialize_time = 0.0
+        self.statements = Counter()
+        self.serializing = False
+        self._render_started = None
+
+    def record_query(self, sql, duration):
+        self.queries += 1
+        self.db_time += duration
+        self.statements[sql] += 1
+        threshold = getattr(settings, 'TASKMANAGEMENT_SLOW_QUERY_MS', 100)
+        if duration * 1000 >= threshold:
+            logger.warning('Slow query (%.1f ms): %s', duration * 1000, sql[:1000])
+
+    def start_render(self):
+        self._render_started = perf_counter()
+
+    def stop_render(self):
+        if self._render_started is not None:
+            self.serialize_time += perf_counter() - self._render_started
+            self._render_started = None
+
+    @property
+    def total_time(self):
+        return perf_counter() - self.started
+
+
+class RouteStats:
+    def __init__(self):
+        self.count = 0
+        self.queries = 0
+        self.max_queries = 0
+        self.db_ms = 0.0
+        self.serialize_ms = 0.0
+        self.total_ms = 0.0
+        self.max_total_ms = 0.0
+        self.histogram = [0] * (len(BUCKETS) + 1)
+
+    def add(self, queries, db_ms, serialize_ms, total_ms):
+        self.count += 1
+        self.queries += queries
+        self.max_queries = max(self.max_queries, queries)
+        self.db_ms += db_ms
+        self.serialize_ms += serialize_ms
+        self.total_ms += total_ms
+        self.max_total_ms = max(self.max_total_ms, total_ms)
+        self.histogram[bisect_left(BUCKETS, total_ms)] += 1
+
+    def as_dict(self):
+        count = self.count or 1
+        labels = [f'le_{bound}' for bound in BUCKETS] + ['inf']
+        return {
+            'count': self.count,
+            'avg_queries': self.queries / count,
+            'max_queries': self.max_queries,
+            'avg_db_ms': self.db_ms / count,
+            'avg_serialize_ms': self.serialize_ms / count,
+            'avg_total_ms': self.total_ms / count,
+            'max_total_ms': self.max_total_ms,
+            'histogram_ms': dict(zip(labels, self.histogram)),
+        }
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = Lock()
+        self._routes = {}
+
+    def record(self, route, metrics):
+        total_ms = metrics.total_time * 1000
+        with self._lock:
+            stats = self._routes.setdefault(route, RouteStats())
+            stats.add(
+                metrics.queries,
+                metrics.db_time * 1000,
+                metrics.serialize_time * 1000,
+                total_ms
+            )
+
+    def snapshot(self):
+        with self._lock:
+            return {route: stats.as_dict() for route, stats in sorted(self._routes.items())}
+
+    def reset(self):
+        with self._lock:
+            self._routes.clear()
+
+
+registry = MetricsRegistry()
+
+
+def record_query(execute, sql, params, many, context):
+    metrics = current_metrics.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    start = perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.record_query(sql, perf_counter() - start)
+
+
+@receiver(connection_created)
+def install_query_recorder(sender, connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+
+class TimedSerializerMixin:
+    """
+    Add the outermost ``to_representation`` call of a request, minus the
+    queries it runs, to the request's serialize time. Mixed into the app's
+    serializers only; nested ones are not counted twice.
+    """
+
+    def to_representation(self, instance):
+        metrics = current_metrics.get()
+        if metrics is None or metrics.serializing:
+            return super().to_representation(instance)
+        metrics.serializing = True
+        db_time = metrics.db_time
+        start = perf_counter()
+        try:
+            return super().to_representation(instance)
+        finally:
+            metrics.serialize_time += perf_counter() - start - (metrics.db_time - db_time)
+            metrics.serializing = False
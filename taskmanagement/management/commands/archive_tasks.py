@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from taskmanagement.archive import archivable, archive_tasks
+
+
+class Command(BaseCommand):
+    help = 'Move tasks selected by the archiving policy, with their subtasks, to the archive tables.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, help='Archive tasks untouched for this many days.')
+        parser.add_argument(
+            '--done-days', type=int,
+            help='Archive tasks in done columns untouched for this many days.'
+        )
+        parser.add_argument(
+            '--done-column', action='append', dest='done_columns',
+            help='Name of a done column; may be repeated.'
+        )
+        parser.add_argument('--chunk-size', type=int, help='Tasks moved per transaction.')
+
+    def handle(self, *args, **options):
+        tasks = archivable(
+            days=options['days'],
+            done_days=options['done_days'],
+            done_columns=options['done_columns']
+        )
+        archived = archive_tasks(tasks, size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f'Archived {archived} tasks.'))
@@ -0,0 +1,230 @@
+import json
+import platform
+from pathlib import Path
+from statistics import median
+from time import perf_counter
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from taskmanagement.benchmarking import throwaway_database
+from taskmanagement.cache import board_cache
+from taskmanagement.models import Board, Column, Task, Subtask
+from taskmanagement.seeding import seed
+
+
+DEFAULT_BASELINE = Path(__file__).resolve().parents[2] / 'benchmarks' / 'baseline.json'
+
+
+class Command(BaseCommand):
+    help = (
+        'Time every API endpoint with the test client against a throwaway test '
+        'database of the configured backend (SQLite or PostgreSQL), write the '
+        'results as JSON and fail when query counts regress past the stored '
+        'baseline. Timings depend on the host, so medians are only compared, '
+        'as ratios, with an earlier --output of this command on the same host '
+        '(--compare-to).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--boards', type=int, default=5)
+        parser.add_argument('--columns', type=int, default=4)
+        parser.add_argument('--tasks', type=int, default=200, help='Tasks per board.')
+        parser.add_argument('--subtasks', type=int, default=3)
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--output', help='Write results to this JSON file.')
+        parser.add_argument('--baseline', default=str(DEFAULT_BASELINE))
+        parser.add_argument('--update-baseline', action='store_true')
+        parser.add_argument(
+            '--compare-to',
+            help='Fail when medians regress past this --output of a run on the same host.'
+        )
+        parser.add_argument(
+            '--tolerance', type=float, default=0.5,
+            help='Allowed relative slowdown of a median before failing.'
+        )
+        parser.add_argument(
+            '--min-slowdown-ms', type=float, default=2.0,
+            help='Ignore median slowdowns smaller than this, to absorb jitter.'
+        )
+
+    def handle(self, *args, **options):
+        if options['columns'] < 1:
+            raise CommandError('--columns must be at least 1.')
+
+        with throwaway_database():
+            results = self.run_benchmarks(options)
+
+        report = {
+            'vendor': connection.vendor,
+            'python': platform.python_version(),
+            'dataset': {
+                key: options[key] for key in ('boards', 'columns', 'tasks', 'subtasks')
+            },
+            'endpoints': results
+        }
+        for name, result in results.items():
+            self.stdout.write(
+                f'{name:<20} median {result["median_ms"]:8.2f} ms  queries {result["queries"]}'
+            )
+        if options['output']:
+            Path(options['output']).write_text(json.dumps(report, indent=2))
+
+        baseline_path = Path(options['baseline'])
+        baseline = json.loads(baseline_path.read_text()) if baseline_path.exists() else {}
+        if options['update_baseline']:
+            baseline[connection.vendor] = {
+                'dataset': report['dataset'],
+                'queries': {name: result['queries'] for name, result in results.items()}
+            }
+            baseline_path.parent.mkdir(parents=True, exist_ok=True)
+            baseline_path.write_text(json.dumps(baseline, indent=2) + '\n')
+            self.stdout.write(self.style.SUCCESS(f'Baseline updated: {baseline_path}'))
+            return
+
+        regressions = []
+        if connection.vendor in baseline:
+            self.check_dataset(baseline[connection.vendor], report, baseline_path)
+            regressions += self.compare_queries(baseline[connection.vendor]['queries'], results)
+        else:
+            self.stdout.write(self.style.WARNING(
+                f'No {connection.vendor} baseline in {baseline_path}; query counts not compared.'
+            ))
+        if options['compare_to']:
+            earlier = json.loads(Path(options['compare_to']).read_text())
+            self.check_dataset(earlier, report, options['compare_to'])
+            regressions += self.compare_medians(earlier['endpoints'], results, options)
+        if regressions:
+            raise CommandError('Performance regressions:\n' + '\n'.join(regressions))
+        self.stdout.write(self.style.SUCCESS('No regressions.'))
+
+    def check_dataset(self, earlier, report, source):
+        if earlier['dataset'] != report['dataset']:
+            self.stdout.write(self.style.WARNING(
+                f'{source} was recorded with a different dataset; results may not be comparable.'
+            ))
+
+    def compare_queries(self, baseline, results):
+        return [
+            f'{name}: {result["queries"]} queries (baseline {baseline[name]})'
+            for name, result in results.items()
+            if name in baseline and result['queries'] > baseline[name]
+        ]
+
+    def compare_medians(self, earlier, results, options):
+        regressions = []
+        for name, result in results.items():
+            if name not in earlier:
+                continue
+            before = earlier[name]['median_ms']
+            slowdown = result['median_ms'] - before
+            ratio = result['median_ms'] / before if before else 1
+            if ratio > 1 + options['tolerance'] and slowdown > options['min_slowdown_ms']:
+                regressions.append(
+                    f'{name}: median {result["median_ms"]:.2f} ms, {ratio:.2f}x the '
+                    f'earlier run ({before:.2f} ms)'
+                )
+        return regressions
+
+    def run_benchmarks(self, options):
+        user, = seed(
+            users=1,
+            boards=options['boards'],
+            columns=options['columns'],
+            tasks=options['tasks'],
+            subtasks=options['subtasks'],
+            prefix='benchmark'
+        )
+        client = Client()
+        client.force_login(user)
+        board = Board.objects.filter(owner=user).order_by('pk').first()
+        column = board.columns.order_by('pk').first()
+        task = Task.objects.filter(status=column).order_by('pk').first()
+        subtask = task.subtasks.order_by('pk').first()
+
+        def new_board():
+            return Board.objects.create(name='Scratch', owner=user)
+
+        def new_column():
+            return Column.objects.create(name='Scratch', board=board, owner=user)
+
+        def new_task():
+            return Task.objects.create(
+                title='Scratch', description='d', status=column, owner=user, rank='zzzzzz'
+            )
+
+        def new_subtask():
+            return Subtask.objects.create(title='Scratch', task=task, owner=user)
+
+        def cold_board_detail():
+            board_cache.backend.clear()
+            return 'get', reverse('board_detail', args=(board.pk, )), None
+
+        task_payload = {
+            'title': 'Benchmark', 'description': 'd', 'status': column.pk, 'subtasks': []
+        }
+        scenarios = {
+            'board_list': lambda: ('get', reverse('board_list'), None),
+            'board_detail': cold_board_detail,
+            'board_detail_cached': lambda: ('get', reverse('board_detail', args=(board.pk, )), None),
+            'column_list': lambda: ('get', reverse('column_list', args=(board.pk, )), None),
+            'task_detail': lambda: ('get', reverse('task_detail', args=(task.pk, )), None),
+            'task_list': lambda: ('get', reverse('task_list') + f'?board={board.pk}', None),
+            'board_create': lambda: (
+                'post', reverse('board_create'), {'name': 'Benchmark', 'columns': [{'name': 'A'}]}
+            ),
+            'board_update': lambda: (
+                'put', reverse('board_update', args=(board.pk, )), {'name': 'Renamed', 'columns': []}
+            ),
+            'column_create': lambda: (
+                'post', reverse('column_create', args=(board.pk, )), {'name': 'Benchmark'}
+            ),
+            'task_create': lambda: (
+                'post', reverse('task_create', args=(board.pk, )), task_payload
+            ),
+            'task_update': lambda: (
+                'put', reverse('task_update', args=(task.pk, )), task_payload
+            ),
+            'task_move': lambda: (
+                'post', reverse('task_move', args=(task.pk, )), {'status': column.pk}
+            ),
+            'subtask_create': lambda: (
+                'post', reverse('subtask_create', args=(task.pk, )), {'title': 'Benchmark'}
+            ),
+            'subtask_update': lambda: (
+                'put', reverse('subtask_update', args=(subtask.pk, )), {'title': 'Benchmark', 'is_selected': False}
+            ),
+            'subtask_delete': lambda: (
+                'delete', reverse('subtask_delete', args=(new_subtask().pk, )), None
+            ),
+            'task_delete': lambda: (
+                'delete', reverse('task_delete', args=(new_task().pk, )), None
+            ),
+            'column_delete': lambda: (
+                'delete', reverse('column_delete', args=(new_column().pk, )), None
+            ),
+            'board_delete': lambda: (
+                'delete', reverse('board_delete', args=(new_board().pk, )), None
+            ),
+        }
+
+        results = {}
+        for name, scenario in scenarios.items():
+            timings = []
+            queries = 0
+            for _ in range(options['repeat']):
+                method, path, payload = scenario()
+                with CaptureQueriesContext(connection) as captured:
+                    start = perf_counter()
+                    response = getattr(client, method)(
+                        path, payload, content_type='application/json'
+                    )
+                    timings.append((perf_counter() - start) * 1000)
+                if response.status_code >= 400:
+                    raise CommandError(f'{name} returned {response.status_code}: {response.content[:200]}')
+                queries = len(captured)
+            results[name] = {'median_ms': round(median(timings), 3), 'queries': queries}
+        return results
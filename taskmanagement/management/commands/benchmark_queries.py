@@ -0,0 +1,109 @@
+from contextlib import contextmanager
+from statistics import median
+from time import perf_counter
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from taskmanagement.benchmarking import throwaway_database
+from taskmanagement.models import Board, Column, Task, Subtask
+from taskmanagement.seeding import seed
+
+
+# Added by migration 0007_owner_scoped_indexes.
+OWNER_SCOPED_INDEXES = (
+    'board_owner_updated_idx',
+    'column_board_id_idx',
+    'subtask_selected_task_idx',
+    'task_status_id_idx',
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Report query plans and timings for the owner-scoped access patterns. '
+        'With --compare a throwaway test database is seeded and the plans are '
+        'measured with the owner-scoped indexes dropped and recreated.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', action='store_true', help='Seed a dataset first.')
+        parser.add_argument('--users', type=int, default=10)
+        parser.add_argument('--boards', type=int, default=10)
+        parser.add_argument('--columns', type=int, default=5)
+        parser.add_argument('--tasks', type=int, default=500)
+        parser.add_argument('--subtasks', type=int, default=4)
+        parser.add_argument('--repeat', type=int, default=50)
+        parser.add_argument('--compare', action='store_true')
+
+    def handle(self, *args, **options):
+        if options['columns'] < 1:
+            raise CommandError('--columns must be at least 1.')
+
+        if options['compare']:
+            with throwaway_database():
+                self.seed(options)
+                task = self.sample_task()
+                with self.without_indexes():
+                    self.report('without indexes', task, options['repeat'])
+                self.report('with indexes', task, options['repeat'])
+            return
+
+        if options['seed']:
+            self.seed(options)
+        self.report('with indexes', self.sample_task(), options['repeat'])
+
+    def seed(self, options):
+        seed(
+            users=options['users'],
+            boards=options['boards'],
+            columns=options['columns'],
+            tasks=options['tasks'],
+            subtasks=options['subtasks'],
+            prefix='bench'
+        )
+
+    def sample_task(self):
+        task = Task.objects.select_related('status__board__owner').order_by('-id').first()
+        if task is None:
+            raise CommandError('No data to benchmark; run with --seed.')
+        return task
+
+    @contextmanager
+    def without_indexes(self):
+        indexes = [
+            (model, index)
+            for model in (Board, Column, Task, Subtask)
+            for index in model._meta.indexes
+            if index.name in OWNER_SCOPED_INDEXES
+        ]
+        with connection.schema_editor() as editor:
+            for model, index in indexes:
+                editor.remove_index(model, index)
+        try:
+            yield
+        finally:
+            with connection.schema_editor() as editor:
+                for model, index in indexes:
+                    editor.add_index(model, index)
+
+    def queries(self, task):
+        column = task.status
+        board = column.board
+        return {
+            'board_list': Board.objects.filter(owner=board.owner).order_by('-updated_at'),
+            'column_list': Column.objects.filter(board=board).order_by('id'),
+            'column_tasks': Task.objects.filter(status=column).order_by('id'),
+            'selected_subtasks': Subtask.objects.filter(task=task, is_selected=True),
+        }
+
+    def report(self, label, task, repeat):
+        self.stdout.write(self.style.MIGRATE_HEADING(f'== {label}'))
+        for name, queryset in self.queries(task).items():
+            timings = []
+            for _ in range(repeat):
+                start = perf_counter()
+                list(queryset.all())
+                timings.append((perf_counter() - start) * 1000)
+            self.stdout.write(self.style.SUCCESS(f'{name}: median {median(timings):.3f} ms'))
+            self.stdout.write(queryset.explain())
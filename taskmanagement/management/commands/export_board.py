@@ -0,0 +1,29 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from taskmanagement.models import Board
+from taskmanagement.transfer import CHUNK_SIZE, export_board
+
+
+class Command(BaseCommand):
+    help = 'Write a board with its columns, tasks and subtasks as JSON Lines.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('board_id', type=int)
+        parser.add_argument('--output', help='Write to this file instead of stdout.')
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            board = Board.objects.get(pk=options['board_id'])
+        except Board.DoesNotExist:
+            raise CommandError(f'Board {options["board_id"]} does not exist.')
+
+        output = open(options['output'], 'w') if options['output'] else sys.stdout
+        try:
+            for chunk in export_board(board, chunk_size=options['chunk_size']):
+                output.write(chunk)
+        finally:
+            if output is not sys.stdout:
+                output.close()
@@ -0,0 +1,32 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from taskmanagement.transfer import CHUNK_SIZE, InvalidImport, import_board
+
+
+class Command(BaseCommand):
+    help = 'Create a board from a JSON Lines file written by export_board.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--owner', required=True, help='Username of the new owner.')
+        parser.add_argument('--name', help='Override the board name.')
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            owner = User.objects.get(username=options['owner'])
+        except User.DoesNotExist:
+            raise CommandError(f'User {options["owner"]!r} does not exist.')
+
+        with open(options['path'], 'rb') as lines:
+            try:
+                board = import_board(
+                    lines, owner,
+                    name=options['name'],
+                    chunk_size=options['chunk_size']
+                )
+            except InvalidImport as error:
+                raise CommandError(str(error))
+
+        self.stdout.write(self.style.SUCCESS(f'Imported board {board.pk} ({board.name}).'))
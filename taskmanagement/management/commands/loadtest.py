@@ -0,0 +1,108 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+from http.client import HTTPConnection, HTTPSConnection
+from statistics import median
+from threading import local
+from time import perf_counter
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+from django.contrib.auth.models import User
+from django.contrib.sessions.backends.db import SessionStore
+from django.core.management.base import BaseCommand, CommandError
+
+from taskmanagement.models import Task
+
+
+class Command(BaseCommand):
+    help = (
+        'Hammer the read endpoints of a running server and report throughput '
+        'and latency percentiles. Run it once against a WSGI server (e.g. '
+        'gunicorn core.wsgi) and once against an ASGI server (e.g. uvicorn '
+        'core.asgi:application) with --json to compare the two. Start the '
+        'server with empty THROTTLE_READ_RATE and THROTTLE_HEAVY_RATE, or '
+        'most requests are throttled.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('base_url', help='e.g. http://127.0.0.1:8000')
+        parser.add_argument('--username', required=True, help='User to authenticate as.')
+        parser.add_argument('--async', dest='use_async', action='store_true',
+                            help='Target the async/ variants of the endpoints.')
+        parser.add_argument('--concurrency', type=int, default=50)
+        parser.add_argument('--requests', type=int, default=2000)
+        parser.add_argument('--label', default='')
+        parser.add_argument('--json', dest='json_path')
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f'User {options["username"]!r} does not exist.')
+        task = Task.objects.filter(owner=user).select_related('status').first()
+        if task is None:
+            raise CommandError('The user has no tasks; seed some data first.')
+
+        prefix = '/api/async' if options['use_async'] else '/api'
+        board_pk = task.status.board_id
+        paths = [
+            f'{prefix}/boards/',
+            f'{prefix}/boards/{board_pk}/',
+            f'{prefix}/boards/{board_pk}/columns/',
+            f'{prefix}/tasks/{task.pk}/',
+        ]
+        cookie = f'{settings.SESSION_COOKIE_NAME}={self.create_session(user)}'
+        target = urlsplit(options['base_url'])
+        connections = local()
+
+        def fetch(index):
+            path = paths[index % len(paths)]
+            if not hasattr(connections, 'conn'):
+                connection_class = HTTPSConnection if target.scheme == 'https' else HTTPConnection
+                connections.conn = connection_class(target.netloc, timeout=30)
+            start = perf_counter()
+            connections.conn.request('GET', path, headers={'Cookie': cookie})
+            response = connections.conn.getresponse()
+            response.read()
+            return path, response.status, (perf_counter() - start) * 1000
+
+        started = perf_counter()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as executor:
+            samples = list(executor.map(fetch, range(options['requests'])))
+        elapsed = perf_counter() - started
+
+        report = {
+            'label': options['label'],
+            'concurrency': options['concurrency'],
+            'requests': len(samples),
+            'throughput': len(samples) / elapsed,
+            'errors': sum(1 for _, code, _ in samples if code >= 400),
+            'endpoints': {}
+        }
+        for path in paths:
+            timings = sorted(ms for sample_path, _, ms in samples if sample_path == path)
+            report['endpoints'][path] = {
+                'median_ms': median(timings),
+                'p99_ms': timings[min(len(timings) - 1, int(len(timings) * 0.99))],
+            }
+
+        self.stdout.write(
+            f'{report["label"] or options["base_url"]}: '
+            f'{report["throughput"]:.1f} req/s, {report["errors"]} error(s)'
+        )
+        for path, stats in report['endpoints'].items():
+            self.stdout.write(
+                f'  {path}: median {stats["median_ms"]:.1f} ms, p99 {stats["p99_ms"]:.1f} ms'
+            )
+        if options['json_path']:
+            with open(options['json_path'], 'w') as output:
+                json.dump(report, output, indent=2)
+
+    def create_session(self, user):
+        session = SessionStore()
+        session[SESSION_KEY] = str(user.pk)
+        session[BACKEND_SESSION_KEY] = 'django.contrib.auth.backends.ModelBackend'
+        session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+        session.create()
+        return session.session_key
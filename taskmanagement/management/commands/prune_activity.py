@@ -0,0 +1,27 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from taskmanagement.deletion import drain
+from taskmanagement.models import Activity
+
+
+class Command(BaseCommand):
+    help = 'Delete activity log entries older than the retention period, in chunks.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=settings.TASKMANAGEMENT_ACTIVITY_RETENTION_DAYS,
+            help='Keep entries from the last this many days.'
+        )
+        parser.add_argument('--chunk-size', type=int, help='Rows per DELETE statement.')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        deleted = drain(
+            Activity.objects.filter(created_at__lt=cutoff),
+            size=options['chunk_size']
+        )
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} activity entries.'))
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from taskmanagement.deletion import delete_board
+from taskmanagement.models import Board
+
+
+class Command(BaseCommand):
+    help = 'Permanently delete soft-deleted boards, oldest first, in batches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=10, help='Boards per batch.')
+        parser.add_argument('--limit', type=int, help='Stop after purging this many boards.')
+
+    def handle(self, *args, **options):
+        pending = Board.all_objects.filter(deleted_at__isnull=False).order_by('deleted_at', 'pk')
+        purged = 0
+        while options['limit'] is None or purged < options['limit']:
+            size = options['batch_size']
+            if options['limit'] is not None:
+                size = min(size, options['limit'] - purged)
+            board_ids = list(pending.values_list('pk', flat=True)[:size])
+            if not board_ids:
+                break
+            for board_id in board_ids:
+                delete_board(board_id)
+            purged += len(board_ids)
+            self.stdout.write(f'Purged {purged} board(s)...')
+
+        self.stdout.write(self.style.SUCCESS(f'Purged {purged} board(s).'))
@@ -0,0 +1,34 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max
+from django.db.models.functions import Length
+
+from taskmanagement.models import Task
+
+
+class Command(BaseCommand):
+    help = 'Rebalance task rank keys in columns where they have grown too long.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--max-length',
+            type=int,
+            default=settings.TASKMANAGEMENT_RANK_REBALANCE_LENGTH
+        )
+
+    def handle(self, *args, **options):
+        column_ids = (
+            Task.objects.values('status')
+            .annotate(longest=Max(Length('rank')))
+            .filter(longest__gt=options['max_length'])
+            .values_list('status', flat=True)
+        )
+
+        rebalanced = 0
+        for column_id in list(column_ids):
+            with transaction.atomic():
+                Task.objects.in_locked_column(column_id).rebalance()
+            rebalanced += 1
+
+        self.stdout.write(self.style.SUCCESS(f'Rebalanced {rebalanced} column(s).'))
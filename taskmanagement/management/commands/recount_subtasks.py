@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F
+
+from taskmanagement.models import Task
+
+
+class Command(BaseCommand):
+    help = 'Recompute drifted subtask counters on tasks in batches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        last_pk = 0
+        repaired = 0
+
+        while True:
+            pks = list(
+                Task.objects.filter(pk__gt=last_pk)
+                .order_by('pk')
+                .values_list('pk', flat=True)[:batch_size]
+            )
+            if not pks:
+                break
+            last_pk = pks[-1]
+
+            drifted = (
+                Task.objects.filter(pk__in=pks)
+                .with_subtask_count()
+                .exclude(
+                    subtask_total=F('total_subtasks'),
+                    subtask_selected=F('selected_subtasks')
+                )
+                .values_list('pk', flat=True)
+            )
+            with transaction.atomic():
+                repaired += Task.objects.filter(pk__in=list(drifted)).recount_subtasks()
+
+        self.stdout.write(self.style.SUCCESS(f'Repaired {repaired} task(s).'))
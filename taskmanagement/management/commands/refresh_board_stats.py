@@ -0,0 +1,30 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from taskmanagement.models import Board
+from taskmanagement.stats import refresh_summaries
+
+
+class Command(BaseCommand):
+    help = 'Recompute the BoardStats summary of every board, in batches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Boards per batch.')
+
+    def handle(self, *args, **options):
+        if not settings.TASKMANAGEMENT_BOARD_STATS_SUMMARY:
+            raise CommandError('TASKMANAGEMENT_BOARD_STATS_SUMMARY is off.')
+
+        boards = Board.objects.order_by('pk').values_list('pk', flat=True)
+        last_pk = 0
+        refreshed = 0
+        while True:
+            board_ids = list(boards.filter(pk__gt=last_pk)[:options['batch_size']])
+            if not board_ids:
+                break
+            refresh_summaries(board_ids)
+            refreshed += len(board_ids)
+            last_pk = board_ids[-1]
+            self.stdout.write(f'Refreshed {refreshed} board(s)...')
+
+        self.stdout.write(self.style.SUCCESS(f'Refreshed {refreshed} board(s).'))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from taskmanagement.search import index_tasks
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search documents of every task.'
+
+    def handle(self, *args, **options):
+        index_tasks()
+        self.stdout.write(self.style.SUCCESS('Rebuilt the task search index.'))
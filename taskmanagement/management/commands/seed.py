@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from taskmanagement.seeding import seed
+
+
+class Command(BaseCommand):
+    help = 'Bulk insert synthetic users, boards, columns, tasks and subtasks.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1)
+        parser.add_argument('--boards', type=int, default=5, help='Boards per user.')
+        parser.add_argument('--columns', type=int, default=4, help='Columns per board.')
+        parser.add_argument('--tasks', type=int, default=100, help='Tasks per board.')
+        parser.add_argument('--subtasks', type=int, default=3, help='Subtasks per task.')
+        parser.add_argument('--prefix', default='seed', help='Username prefix.')
+
+    def handle(self, *args, **options):
+        if options['columns'] < 1:
+            raise CommandError('--columns must be at least 1.')
+        users = seed(
+            users=options['users'],
+            boards=options['boards'],
+            columns=options['columns'],
+            tasks=options['tasks'],
+            subtasks=options['subtasks'],
+            prefix=options['prefix']
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Seeded {len(users)} user(s): {", ".join(user.username for user in users)}.'
+        ))
@@ -0,0 +1,111 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+
+from .activity import ActivityBuffer, current_buffer
+from .instrumentation import RequestMetrics, current_metrics, logger, registry
+
+
+class InstrumentationMiddleware:
+    """
+    Record query count, DB time, serialization time and total time per URL
+    name and expose them in a ``Server-Timing`` header.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        metrics = RequestMetrics()
+        token = current_metrics.set(metrics)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+        return self.finish(request, response, metrics)
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        token = current_metrics.set(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+        return self.finish(request, response, metrics)
+
+    def process_template_response(self, request, response):
+        metrics = current_metrics.get()
+        if metrics is not None:
+            metrics.start_render()
+            response.add_post_render_callback(lambda rendered: metrics.stop_render())
+        return response
+
+    def finish(self, request, response, metrics):
+        match = request.resolver_match
+        route = (match.url_name or match.view_name) if match else 'unresolved'
+        registry.record(route, metrics)
+
+        total_ms = metrics.total_time * 1000
+        db_ms = metrics.db_time * 1000
+        serialize_ms = metrics.serialize_time * 1000
+        response['Server-Timing'] = ', '.join((
+            f'db;dur={db_ms:.2f};desc="{metrics.queries} queries"',
+            f'serialize;dur={serialize_ms:.2f}',
+            f'app;dur={max(total_ms - db_ms - serialize_ms, 0):.2f}',
+            f'total;dur={total_ms:.2f}',
+        ))
+
+        max_queries = getattr(settings, 'TASKMANAGEMENT_QUERY_COUNT_THRESHOLD', 50)
+        slow_ms = getattr(settings, 'TASKMANAGEMENT_SLOW_REQUEST_MS', 500)
+        if metrics.queries > max_queries or total_ms > slow_ms:
+            statement, repeats = metrics.statements.most_common(1)[0] if metrics.statements else ('', 0)
+            logger.warning(
+                '%s %s (%s): %d queries, %.1f ms total; most repeated (%dx): %s',
+                request.method, request.path, route, metrics.queries, total_ms,
+                repeats, statement[:500]
+            )
+        return response
+
+
+class ActivityMiddleware:
+    """
+    Collect the activity entries committed during a request and write them
+    with one ``bulk_create`` once the response is ready.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        buffer = ActivityBuffer(request)
+        token = current_buffer.set(buffer)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_buffer.reset(token)
+            buffer.flush()
+        return response
+
+    async def __acall__(self, request):
+        buffer = ActivityBuffer(request)
+        token = current_buffer.set(buffer)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_buffer.reset(token)
+            if buffer.entries:
+                await sync_to_async(buffer.flush)()
+            else:
+                buffer.flushed = True
+        return response
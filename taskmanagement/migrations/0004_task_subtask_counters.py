@@ -0,0 +1,38 @@
+# Generated by Django 4.2.3 on 2026-10-18 18:16
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def populate_subtask_counters(apps, schema_editor):
+    Task = apps.get_model('taskmanagement', 'Task')
+    Subtask = apps.get_model('taskmanagement', 'Subtask')
+    subtasks = Subtask.objects.filter(task=OuterRef('pk')).order_by().values('task')
+    total = subtasks.annotate(count=Count('pk')).values('count')
+    selected = subtasks.filter(is_selected=True).annotate(count=Count('pk')).values('count')
+    Task.objects.update(
+        subtask_total=Coalesce(Subquery(total), 0),
+        subtask_selected=Coalesce(Subquery(selected), 0),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('taskmanagement', '0003_rename_supertask_subtask_task'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='subtask_selected',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='subtask_total',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(populate_subtask_counters, migrations.RunPython.noop),
+    ]
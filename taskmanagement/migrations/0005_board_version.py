@@ -0,0 +1,18 @@
+# Generated by Django 4.2.3 on 2026-10-18 18:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('taskmanagement', '0004_task_subtask_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='board',
+            name='version',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.3 on 2026-10-18 18:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('taskmanagement', '0006_task_listing_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='board',
+            index=models.Index(fields=['owner', '-updated_at'], name='board_owner_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='column',
+            index=models.Index(fields=['board', 'id'], name='column_board_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='subtask',
+            index=models.Index(condition=models.Q(('is_selected', True)), fields=['task'], name='subtask_selected_task_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['status', 'id'], name='task_status_id_idx'),
+        ),
+    ]
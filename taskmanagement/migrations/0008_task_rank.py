@@ -0,0 +1,56 @@
+# Generated by Django 4.2.3 on 2026-10-18 18:22
+
+from django.db import migrations, models
+
+
+# A frozen copy of taskmanagement.ranking.rank_sequence, so the migration
+# keeps producing the same keys if the ranking module changes.
+ALPHABET = 'abcdefghijklmnopqrstuvwxyz'
+BASE = len(ALPHABET)
+KEY_LENGTH = 6
+
+
+def rank_sequence(count):
+    length = KEY_LENGTH
+    while BASE ** length <= count + 1:
+        length += 1
+    step = BASE ** length // (count + 1)
+    keys = []
+    for index in range(count):
+        value, chars = step * (index + 1), []
+        for _ in range(length):
+            value, digit = divmod(value, BASE)
+            chars.append(ALPHABET[digit])
+        keys.append(''.join(reversed(chars)))
+    return keys
+
+
+def populate_ranks(apps, schema_editor):
+    Task = apps.get_model('taskmanagement', 'Task')
+    column_ids = Task.objects.values_list('status_id', flat=True).distinct()
+    for column_id in column_ids.iterator():
+        pks = list(
+            Task.objects.filter(status_id=column_id).order_by('id').values_list('pk', flat=True)
+        )
+        tasks = [Task(pk=pk, rank=rank) for pk, rank in zip(pks, rank_sequence(len(pks)))]
+        Task.objects.bulk_update(tasks, ['rank'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('taskmanagement', '0007_owner_scoped_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='rank',
+            field=models.CharField(default='', editable=False, max_length=255, verbose_name='Rank'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['status', 'rank'], name='task_status_rank_idx'),
+        ),
+        migrations.RunPython(populate_ranks, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.3 on 2026-10-18 18:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('taskmanagement', '0008_task_rank'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='board',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, db_index=True, editable=False, null=True),
+        ),
+    ]
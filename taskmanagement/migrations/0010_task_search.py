@@ -0,0 +1,70 @@
+# Generated by Django 4.2.3 on 2026-10-18 18:33
+
+import django.contrib.postgres.search
+from django.conf import settings
+from django.db import migrations
+
+
+# The GIN index (PostgreSQL) and the FTS5 table (SQLite) cannot be declared
+# portably in Meta.indexes, so they are created per vendor here, with the
+# SQL of taskmanagement.search as it stood when this migration was written.
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute(
+            'CREATE INDEX task_search_vector_idx ON taskmanagement_task USING gin (search_vector)'
+        )
+        config = settings.TASKMANAGEMENT_SEARCH_CONFIG
+        schema_editor.execute(
+            """
+            UPDATE taskmanagement_task AS task SET search_vector =
+                setweight(to_tsvector(%s::regconfig, task.title), 'A') ||
+                setweight(to_tsvector(%s::regconfig, task.description), 'B') ||
+                setweight(to_tsvector(%s::regconfig, COALESCE((
+                    SELECT string_agg(subtask.title, ' ')
+                    FROM taskmanagement_subtask AS subtask
+                    WHERE subtask.task_id = task.id
+                ), '')), 'C')
+            """,
+            (config, config, config)
+        )
+    elif vendor == 'sqlite':
+        schema_editor.execute(
+            'CREATE VIRTUAL TABLE taskmanagement_task_fts USING fts5('
+            "title, description, subtasks, tokenize='unicode61 remove_diacritics 2')"
+        )
+        schema_editor.execute(
+            """
+            INSERT INTO taskmanagement_task_fts (rowid, title, description, subtasks)
+            SELECT task.id, task.title, task.description, COALESCE((
+                SELECT group_concat(subtask.title, ' ')
+                FROM taskmanagement_subtask AS subtask
+                WHERE subtask.task_id = task.id
+            ), '')
+            FROM taskmanagement_task AS task
+            """
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS task_search_vector_idx')
+    elif vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE IF EXISTS taskmanagement_task_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('taskmanagement', '0009_board_deleted_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
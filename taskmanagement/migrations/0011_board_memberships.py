@@ -0,0 +1,62 @@
+# Generated by Django 4.2.3 on 2026-10-18 18:36
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import OuterRef, Subquery
+
+
+def populate_boards(apps, schema_editor):
+    Column = apps.get_model('taskmanagement', 'Column')
+    Task = apps.get_model('taskmanagement', 'Task')
+    Subtask = apps.get_model('taskmanagement', 'Subtask')
+    Task.objects.update(board_id=Subquery(
+        Column.objects.filter(pk=OuterRef('status_id')).values('board_id')
+    ))
+    Subtask.objects.update(board_id=Subquery(
+        Task.objects.filter(pk=OuterRef('task_id')).values('board_id')
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('taskmanagement', '0010_task_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BoardMembership',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('role', models.CharField(choices=[('viewer', 'Viewer'), ('editor', 'Editor'), ('admin', 'Admin')], default='viewer', max_length=16, verbose_name='Role')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='subtask',
+            name='board',
+            field=models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='taskmanagement.board'),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='board',
+            field=models.ForeignKey(db_index=False, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='taskmanagement.board'),
+        ),
+        migrations.RunPython(populate_boards, migrations.RunPython.noop),
+        migrations.AddField(
+            model_name='boardmembership',
+            name='board',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='memberships', to='taskmanagement.board'),
+        ),
+        migrations.AddField(
+            model_name='boardmembership',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='board_memberships', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddConstraint(
+            model_name='boardmembership',
+            constraint=models.UniqueConstraint(fields=('board', 'user'), name='membership_board_user_uniq'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.3 on 2026-10-18 18:37
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+# Separate from 0011 so the NOT NULL change does not run in the same
+# PostgreSQL transaction as the data migration's deferred FK checks.
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('taskmanagement', '0011_board_memberships'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='subtask',
+            name='board',
+            field=models.ForeignKey(editable=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='taskmanagement.board'),
+        ),
+        migrations.AlterField(
+            model_name='task',
+            name='board',
+            field=models.ForeignKey(db_index=False, editable=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='taskmanagement.board'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['board', 'updated_at', 'id'], name='task_board_updated_idx'),
+        ),
+    ]
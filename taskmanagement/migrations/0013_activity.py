@@ -0,0 +1,34 @@
+# Generated by Django 4.2.3 on 2026-10-18 18:41
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('taskmanagement', '0012_task_board_not_null'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Activity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('verb', models.CharField(max_length=32, verbose_name='Verb')),
+                ('task_id', models.PositiveBigIntegerField(null=True)),
+                ('subtask_id', models.PositiveBigIntegerField(null=True)),
+                ('data', models.JSONField(default=dict)),
+                ('created_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+                ('actor', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('board', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='taskmanagement.board')),
+            ],
+            options={
+                'verbose_name_plural': 'activities',
+                'indexes': [models.Index(fields=['board', '-id'], name='activity_board_id_idx'), models.Index(fields=['task_id', '-id'], name='activity_task_id_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 4.2.3 on 2026-10-18 18:44
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('taskmanagement', '0013_activity'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('column', 'Column'), ('task', 'Task'), ('subtask', 'Subtask')], max_length=16, verbose_name='Kind')),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('sequence', models.PositiveBigIntegerField()),
+            ],
+        ),
+        migrations.AddField(
+            model_name='column',
+            name='sequence',
+            field=models.PositiveBigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='subtask',
+            name='sequence',
+            field=models.PositiveBigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='sequence',
+            field=models.PositiveBigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='column',
+            index=models.Index(fields=['board', 'sequence'], name='column_board_sequence_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='subtask',
+            index=models.Index(fields=['board', 'sequence'], name='subtask_board_sequence_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['board', 'sequence'], name='task_board_sequence_idx'),
+        ),
+        migrations.AddField(
+            model_name='tombstone',
+            name='board',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='taskmanagement.board'),
+        ),
+        migrations.AddIndex(
+            model_name='tombstone',
+            index=models.Index(fields=['board', 'sequence'], name='tombstone_board_sequence_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.3 on 2026-10-18 18:51
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('taskmanagement', '0014_board_sync'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BoardStats',
+            fields=[
+                ('board', models.OneToOneField(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='stats', serialize=False, to='taskmanagement.board')),
+                ('tasks', models.PositiveIntegerField(default=0)),
+                ('subtask_total', models.PositiveIntegerField(default=0)),
+                ('subtask_selected', models.PositiveIntegerField(default=0)),
+                ('last_updated_at', models.DateTimeField(null=True)),
+                ('refreshed_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'board stats',
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.3 on 2026-10-18 18:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('taskmanagement', '0015_board_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='board',
+            name='is_template',
+            field=models.BooleanField(default=False, verbose_name='Template'),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 4.2.3 on 2026-10-18 18:57
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('taskmanagement', '0016_board_is_template'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedTask',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('title', models.CharField(max_length=128, verbose_name='Title')),
+                ('description', models.TextField(verbose_name='Description')),
+                ('subtask_total', models.PositiveIntegerField(default=0)),
+                ('subtask_selected', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('board', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='taskmanagement.board')),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('status', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_tasks', to='taskmanagement.column', verbose_name='Status')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ArchivedSubtask',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('title', models.CharField(max_length=128, verbose_name='Title')),
+                ('is_selected', models.BooleanField(default=True, verbose_name='Is selected')),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('task', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='subtasks', to='taskmanagement.archivedtask')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='archivedtask',
+            index=models.Index(fields=['board', 'archived_at', 'id'], name='archived_task_board_idx'),
+        ),
+    ]
@@ -1,6 +1,12 @@
-from django.db import models
+from django.db import connections, models, transaction
+from django.db.models import Count, F, Max, OuterRef, Prefetch, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from django.contrib.auth.models import User
+from django.contrib.postgres.search import SearchVectorField
+
+from .ranking import rank_between, rank_sequence
 
 
 class BaseModel(models.Model):
@@ -12,14 +18,139 @@ class BaseModel(models.Model):
         abstract = True
 
 
+def tree_lookups(tasks=True, task_fields=None, subtasks=False,
+                 task_filter=None, per_column=None, incomplete_subtasks=False, to_attr=None):
+    """
+    Prefetch lookups of a board's columns and tasks. Sparse responses can
+    skip tasks, load only ``task_fields`` of them, or add their subtasks.
+    ``task_filter`` (a ``Q``) narrows the tasks and ``per_column`` caps them
+    per column; Django applies a sliced prefetch with a ROW_NUMBER() window
+    partitioned by column, so a single query still loads every column.
+    ``to_attr`` stores each column's tasks in a list attribute instead.
+    """
+    lookups = [Prefetch('columns', queryset=Column.objects.order_by('id'))]
+    if tasks:
+        if task_fields is None:
+            task_queryset = Task.objects.defer('search_vector')
+        else:
+            task_queryset = Task.objects.only('id', 'status', *task_fields)
+        if task_filter is not None:
+            task_queryset = task_queryset.filter(task_filter)
+        task_queryset = task_queryset.order_by('rank', 'id')
+        if per_column is not None:
+            task_queryset = task_queryset[:per_column]
+        lookups.append(Prefetch('columns__tasks', queryset=task_queryset, to_attr=to_attr))
+        if subtasks:
+            subtask_queryset = Subtask.objects.only('id', 'task', 'title', 'is_selected')
+            if incomplete_subtasks:
+                subtask_queryset = subtask_queryset.filter(is_selected=False)
+            lookups.append(Prefetch(
+                f'columns__{to_attr or "tasks"}__subtasks',
+                queryset=subtask_queryset.order_by('id')
+            ))
+    return lookups
+
+
+class BoardQuerySet(models.QuerySet):
+    def with_tree(self, **options):
+        """Prefetch columns and tasks in a fixed number of queries."""
+        return self.prefetch_related(*tree_lookups(**options))
+
+    def bump_version(self):
+        return self.update(version=F('version') + 1)
+
+    def locked_version(self, board_pk):
+        """Read the version of one board and lock its row until the transaction ends."""
+        return self.select_for_update().values_list('version', flat=True).get(pk=board_pk)
+
+    def next_version(self, board_pk):
+        """
+        Bump the version of one board and return the new value in a single
+        statement. The row stays locked until the transaction ends, so
+        versions are handed out in commit order.
+        """
+        with connections[self.db].cursor() as cursor:
+            cursor.execute(
+                f'UPDATE {Board._meta.db_table} SET version = version + 1 '
+                f'WHERE id = %s RETURNING version',
+                (board_pk, )
+            )
+            row = cursor.fetchone()
+        return row[0] if row else 0
+
+
+class BoardManager(models.Manager.from_queryset(BoardQuerySet)):
+    """Hides boards that were soft-deleted and are waiting to be purged."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at__isnull=True)
+
+
 class Board(BaseModel):
     name = models.CharField(_("Name"), max_length=128)
+    version = models.PositiveIntegerField(default=0, editable=False)
+    is_template = models.BooleanField(_("Template"), default=False)
+    deleted_at = models.DateTimeField(null=True, blank=True, editable=False, db_index=True)
+
+    objects = BoardManager()
+    all_objects = BoardQuerySet.as_manager()
+
+    class Meta:
+        indexes = (
+            models.Index(
+                fields=('owner', '-updated_at'),
+                name='board_owner_updated_idx'
+            ),
+        )
     
     def __str__(self):
         return self.name
+
+
+class BoardRecord(BaseModel):
+    """
+    A row inside a board's tree. ``sequence`` is the board version of the
+    row's last change, which lets clients fetch only what changed since a
+    version they already have (see ``taskmanagement.sync``).
+    """
+    sequence = models.PositiveBigIntegerField(default=0, editable=False)
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic(savepoint=False):
+            self.sequence = Board.all_objects.next_version(self.board_id)
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'sequence'}
+            super().save(*args, **kwargs)
+
+
+class BoardMembership(models.Model):
+    VIEWER = 'viewer'
+    EDITOR = 'editor'
+    ADMIN = 'admin'
+    ROLE_CHOICES = (
+        (VIEWER, _('Viewer')),
+        (EDITOR, _('Editor')),
+        (ADMIN, _('Admin')),
+    )
+
+    board = models.ForeignKey(Board, related_name='memberships', on_delete=models.CASCADE)
+    user = models.ForeignKey(User, related_name='board_memberships', on_delete=models.CASCADE)
+    role = models.CharField(_('Role'), max_length=16, choices=ROLE_CHOICES, default=VIEWER)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = (
+            models.UniqueConstraint(fields=('board', 'user'), name='membership_board_user_uniq'),
+        )
+
+    def __str__(self):
+        return f'{self.user_id} on {self.board_id} ({self.role})'
     
 
-class Column(BaseModel):
+class Column(BoardRecord):
     name = models.CharField(_("Name"), max_length=32)
     board = models.ForeignKey(
         Board,
@@ -27,11 +158,80 @@ class Column(BaseModel):
         on_delete=models.CASCADE
     )
 
+    class Meta:
+        indexes = (
+            models.Index(fields=('board', 'id'), name='column_board_id_idx'),
+            models.Index(fields=('board', 'sequence'), name='column_board_sequence_idx'),
+        )
+
     def __str__(self):
         return self.name
 
 
-class Task(BaseModel):
+class TaskQuerySet(models.QuerySet):
+    def with_subtask_count(self):
+        return self.annotate(
+            total_subtasks=Count('subtasks'),
+            selected_subtasks=Count('subtasks', filter=Q(subtasks__is_selected=True)),
+        )
+
+    def with_etag_state(self):
+        """
+        Annotate ``subtask_version``, the latest board version among each
+        task's subtasks; with ``sequence`` and ``subtask_total`` it changes
+        whenever the task or one of its subtasks does.
+        """
+        return self.annotate(subtask_version=Max('subtasks__sequence'))
+
+    def adjust_subtask_counters(self, total=0, selected=0):
+        return self.update(
+            subtask_total=F('subtask_total') + total,
+            subtask_selected=F('subtask_selected') + selected,
+        )
+
+    def recount_subtasks(self):
+        """Recompute the denormalized subtask counters from the subtask rows."""
+        subtasks = Subtask.objects.filter(task=OuterRef('pk')).order_by().values('task')
+        total = subtasks.annotate(count=Count('pk')).values('count')
+        selected = subtasks.filter(is_selected=True).annotate(count=Count('pk')).values('count')
+        return self.update(
+            subtask_total=Coalesce(Subquery(total), 0),
+            subtask_selected=Coalesce(Subquery(selected), 0),
+        )
+
+    def in_locked_column(self, column_id):
+        """
+        The tasks of column ``column_id``, with the column row locked until
+        the transaction ends: writers placing tasks in the same column read
+        the neighbouring ranks one after the other instead of picking the
+        same key.
+        """
+        list(Column.objects.select_for_update().filter(pk=column_id).values_list('pk', flat=True))
+        return self.filter(status_id=column_id)
+
+    def last_rank(self):
+        """The highest rank of these tasks; use on ``in_locked_column`` before appending."""
+        return self.aggregate(last_rank=Max('rank'))['last_rank']
+
+    def rebalance(self):
+        """
+        Rewrite the rank keys of these tasks as short, evenly spaced keys,
+        stamped with a new board version so synced clients reorder them.
+        """
+        rows = list(self.order_by('rank', 'id').values_list('pk', 'board_id'))
+        versions = {
+            board_id: Board.all_objects.next_version(board_id)
+            for board_id in {board_id for _, board_id in rows}
+        }
+        tasks = [
+            Task(pk=pk, rank=rank, sequence=versions[board_id])
+            for (pk, board_id), rank in zip(rows, rank_sequence(len(rows)))
+        ]
+        Task.objects.bulk_update(tasks, ('rank', 'sequence'), batch_size=1000)
+        return len(tasks)
+
+
+class Task(BoardRecord):
     title = models.CharField(_('Title'), max_length=128)
     description = models.TextField(_('Description'))
     status = models.ForeignKey(
@@ -40,12 +240,79 @@ class Task(BaseModel):
         related_name='tasks',
         verbose_name=_("Status"), 
     )
+    # Copy of status.board, so authorization needs no join up the tree.
+    # Indexed by task_board_updated_idx.
+    board = models.ForeignKey(
+        Board,
+        related_name='+',
+        on_delete=models.CASCADE,
+        editable=False,
+        db_index=False
+    )
+    subtask_total = models.PositiveIntegerField(default=0, editable=False)
+    subtask_selected = models.PositiveIntegerField(default=0, editable=False)
+    rank = models.CharField(_('Rank'), max_length=255, default='', editable=False)
+    # Maintained by taskmanagement.search; only populated on PostgreSQL.
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = TaskQuerySet.as_manager()
+
+    class Meta:
+        indexes = (
+            models.Index(
+                fields=('status', 'updated_at', 'id'),
+                name='task_status_updated_idx'
+            ),
+            models.Index(
+                fields=('owner', 'updated_at'),
+                name='task_owner_updated_idx'
+            ),
+            models.Index(fields=('status', 'id'), name='task_status_id_idx'),
+            models.Index(fields=('status', 'rank'), name='task_status_rank_idx'),
+            models.Index(
+                fields=('board', 'updated_at', 'id'),
+                name='task_board_updated_idx'
+            ),
+            models.Index(fields=('board', 'sequence'), name='task_board_sequence_idx'),
+        )
 
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        if self.board_id is None:
+            self.board_id = self.status.board_id
+        super().save(*args, **kwargs)
+
+    def move(self, column_id, before=None, after=None):
+        """
+        Place the task in ``column_id`` right before ``before`` or right after
+        ``after`` (or at the end) by writing a single new rank key.
+        """
+        siblings = Task.objects.in_locked_column(column_id).exclude(pk=self.pk)
+        for sibling in (before, after):
+            if sibling is not None:
+                sibling.refresh_from_db(fields=('rank', ))
+        if after is not None:
+            low = after.rank
+            high = siblings.filter(rank__gt=low).order_by('rank').values_list('rank', flat=True).first()
+        elif before is not None:
+            high = before.rank
+            low = siblings.filter(rank__lt=high).order_by('-rank').values_list('rank', flat=True).first()
+        else:
+            low, high = siblings.last_rank(), None
 
-class Subtask(BaseModel):
+        rank = rank_between(low, high)
+        if len(rank) > self._meta.get_field('rank').max_length:
+            siblings.rebalance()
+            return self.move(column_id, before=before, after=after)
+
+        self.status_id = column_id
+        self.rank = rank
+        self.save(update_fields=('status', 'rank', 'updated_at'))
+
+
+class Subtask(BoardRecord):
     title = models.CharField(_('Title'), max_length=128)
     is_selected = models.BooleanField(_('Is selected'), default=True)
     task = models.ForeignKey(
@@ -53,6 +320,178 @@ class Subtask(BaseModel):
         related_name='subtasks',
         on_delete=models.CASCADE
     )
+    # Copy of task.board, so authorization needs no join up the tree.
+    board = models.ForeignKey(Board, related_name='+', on_delete=models.CASCADE, editable=False)
+
+    class Meta:
+        indexes = (
+            models.Index(
+                fields=('task', ),
+                condition=Q(is_selected=True),
+                name='subtask_selected_task_idx'
+            ),
+            models.Index(fields=('board', 'sequence'), name='subtask_board_sequence_idx'),
+        )
+
+    # Stored value of is_selected, so saves can tell a toggle from an edit.
+    loaded_is_selected = None
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.loaded_is_selected = instance.__dict__.get('is_selected')
+        return instance
+
+    def save(self, *args, **kwargs):
+        if self.board_id is None:
+            self.board_id = self.task.board_id
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return self.title
+
+
+class ArchivedTask(models.Model):
+    """
+    A task moved out of the hot tables by ``taskmanagement.archive``. It
+    keeps its primary key and timestamps, so a restored task comes back
+    under the same id.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    title = models.CharField(_('Title'), max_length=128)
+    description = models.TextField(_('Description'))
+    status = models.ForeignKey(
+        Column,
+        on_delete=models.CASCADE,
+        related_name='archived_tasks',
+        verbose_name=_("Status")
+    )
+    board = models.ForeignKey(Board, related_name='+', on_delete=models.CASCADE, db_index=False)
+    owner = models.ForeignKey(User, related_name='+', on_delete=models.CASCADE)
+    subtask_total = models.PositiveIntegerField(default=0)
+    subtask_selected = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = (
+            models.Index(fields=('board', 'archived_at', 'id'), name='archived_task_board_idx'),
+        )
+
+    def __str__(self):
+        return self.title
+
+
+class ArchivedSubtask(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    title = models.CharField(_('Title'), max_length=128)
+    is_selected = models.BooleanField(_('Is selected'), default=True)
+    task = models.ForeignKey(ArchivedTask, related_name='subtasks', on_delete=models.CASCADE)
+    owner = models.ForeignKey(User, related_name='+', on_delete=models.CASCADE)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+
+    def __str__(self):
+        return self.title
+
+
+class Activity(models.Model):
+    """
+    One entry of a board's activity log, written by ``taskmanagement.activity``.
+
+    Task and subtask ids are plain integers so the history of deleted rows
+    survives them. The board is not enforced either: rows are removed with
+    their board, except the final ``board.deleted`` entry, which stays until
+    ``prune_activity`` ages it out.
+    """
+    board = models.ForeignKey(
+        Board,
+        related_name='+',
+        on_delete=models.DO_NOTHING,
+        db_constraint=False
+    )
+    actor = models.ForeignKey(User, related_name='+', null=True, on_delete=models.SET_NULL)
+    verb = models.CharField(_('Verb'), max_length=32)
+    task_id = models.PositiveBigIntegerField(null=True)
+    subtask_id = models.PositiveBigIntegerField(null=True)
+    data = models.JSONField(default=dict)
+    created_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        verbose_name_plural = 'activities'
+        indexes = (
+            models.Index(fields=('board', '-id'), name='activity_board_id_idx'),
+            models.Index(fields=('task_id', '-id'), name='activity_task_id_idx'),
+        )
+
+    def __str__(self):
+        return f'{self.verb} on {self.board_id}'
+
+
+class Tombstone(models.Model):
+    """Marks a deleted column, task or subtask for incremental sync."""
+    COLUMN = 'column'
+    TASK = 'task'
+    SUBTASK = 'subtask'
+    KIND_CHOICES = (
+        (COLUMN, _('Column')),
+        (TASK, _('Task')),
+        (SUBTASK, _('Subtask')),
+    )
+
+    # Not enforced, like Activity.board: deletes cascading from a board may
+    # still add tombstones. delete_board removes them.
+    board = models.ForeignKey(
+        Board,
+        related_name='+',
+        on_delete=models.DO_NOTHING,
+        db_constraint=False
+    )
+    kind = models.CharField(_('Kind'), max_length=16, choices=KIND_CHOICES)
+    object_id = models.PositiveBigIntegerField()
+    sequence = models.PositiveBigIntegerField()
+
+    class Meta:
+        indexes = (
+            models.Index(fields=('board', 'sequence'), name='tombstone_board_sequence_idx'),
+        )
+
+    def __str__(self):
+        return f'{self.kind} {self.object_id} at {self.sequence}'
+
+    @classmethod
+    def record(cls, board_id, kind, object_id):
+        """Bump the board version and mark the row deleted at that version."""
+        return cls.objects.create(
+            board_id=board_id,
+            kind=kind,
+            object_id=object_id,
+            sequence=Board.all_objects.next_version(board_id)
+        )
+
+
+class BoardStats(models.Model):
+    """
+    Optional per-board summary behind the dashboard of a user's boards,
+    kept up to date by ``taskmanagement.stats`` when
+    ``TASKMANAGEMENT_BOARD_STATS_SUMMARY`` is on.
+    """
+    board = models.OneToOneField(
+        Board,
+        primary_key=True,
+        related_name='stats',
+        on_delete=models.DO_NOTHING,
+        db_constraint=False
+    )
+    tasks = models.PositiveIntegerField(default=0)
+    subtask_total = models.PositiveIntegerField(default=0)
+    subtask_selected = models.PositiveIntegerField(default=0)
+    last_updated_at = models.DateTimeField(null=True)
+    refreshed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = 'board stats'
 
     def __str__(self):
-        return self.title
\ No newline at end of file
+        return f'Stats of {self.board_id}'
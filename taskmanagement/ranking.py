@@ -0,0 +1,98 @@
+"""
+Lexicographic rank keys for ordering tasks within a column.
+
+Keys are strings over ``a``-``z`` read as base-26 fractions, so a key can
+always be generated between two neighbours and moving a task rewrites one
+row. Only lowercase letters are used so that byte order and the usual
+database collations agree. No key ever consists solely of ``a`` characters,
+which keeps room below every key.
+"""
+
+ALPHABET = 'abcdefghijklmnopqrstuvwxyz'
+BASE = len(ALPHABET)
+DIGITS = {char: index for index, char in enumerate(ALPHABET)}
+
+# Length of freshly generated keys; appends and prepends stay at this
+# length for BASE ** KEY_LENGTH / 2 operations before growing.
+KEY_LENGTH = 6
+
+
+def _encode(value, length):
+    chars = []
+    for _ in range(length):
+        value, digit = divmod(value, BASE)
+        chars.append(ALPHABET[digit])
+    return ''.join(reversed(chars))
+
+
+def _decode(key):
+    value = 0
+    for char in key:
+        value = value * BASE + DIGITS[char]
+    return value
+
+
+def initial_rank():
+    return ALPHABET[BASE // 2] + ALPHABET[0] * (KEY_LENGTH - 1)
+
+
+def is_rank(key):
+    """Whether ``key`` is a valid rank key: letters of the alphabet, not all ``a``."""
+    return isinstance(key, str) and set(key) <= DIGITS.keys() and bool(key.rstrip(ALPHABET[0]))
+
+
+def rank_between(low, high):
+    """Return a key strictly between ``low`` and ``high``; either may be empty/None."""
+    if not high:
+        return rank_after(low) if low else initial_rank()
+    if not low:
+        return rank_before(high)
+    if low >= high:
+        raise ValueError(f'{low!r} must sort before {high!r}')
+    return _midpoint(low, high)
+
+
+def rank_after(key):
+    """Return a key greater than ``key``, incrementing instead of halving."""
+    key = key.ljust(KEY_LENGTH, ALPHABET[0])
+    value = _decode(key) + 1
+    if value < BASE ** len(key):
+        return _encode(value, len(key))
+    return key + ALPHABET[BASE // 2]
+
+
+def rank_before(key):
+    """Return a key smaller than ``key``, decrementing instead of halving."""
+    padded = key.ljust(KEY_LENGTH, ALPHABET[0])
+    value = _decode(padded) - 1
+    if value > 0:
+        return _encode(value, len(padded))
+    return _midpoint('', key)
+
+
+def rank_sequence(count):
+    """Return ``count`` ascending, evenly spaced keys of equal length."""
+    length = KEY_LENGTH
+    while BASE ** length <= count + 1:
+        length += 1
+    step = BASE ** length // (count + 1)
+    return [_encode(step * (index + 1), length) for index in range(count)]
+
+
+def _midpoint(low, high):
+    result = []
+    bounded = True
+    position = 0
+    while True:
+        lo = DIGITS[low[position]] if position < len(low) else 0
+        if bounded:
+            hi = DIGITS[high[position]] if position < len(high) else 0
+        else:
+            hi = BASE
+        if hi - lo > 1:
+            result.append(ALPHABET[(lo + hi) // 2])
+            return ''.join(result)
+        result.append(ALPHABET[lo])
+        if lo < hi:
+            bounded = False
+        position += 1
@@ -0,0 +1,145 @@
+"""
+Full-text search over task titles, descriptions and subtask titles.
+
+On PostgreSQL every task carries a ``search_vector`` (title weighted A,
+description B, subtask titles C) backed by a GIN index. SQLite uses an FTS5
+table keyed by task id instead. Either is refreshed with ``index_tasks`` and
+``unindex_tasks`` whenever tasks or subtasks are written, including the
+bulk paths that bypass signals. The index and the table themselves are
+created by migration 0010.
+"""
+import re
+
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import NotSupportedError, connection
+from django.db.models import F, FloatField
+from django.db.models.expressions import RawSQL
+
+from .models import Task, Subtask
+
+
+FTS_TABLE = 'taskmanagement_task_fts'
+CHUNK_SIZE = 500
+MAX_TERMS = 16
+
+_TERM = re.compile(r'\w+')
+
+
+def search_terms(text):
+    return _TERM.findall(text)[:MAX_TERMS]
+
+
+def _chunks(ids):
+    ids = list(ids)
+    for start in range(0, len(ids), CHUNK_SIZE):
+        yield ids[start:start + CHUNK_SIZE]
+
+
+class SearchBackend:
+    """Backends without full-text support: writes are ignored."""
+
+    def index(self, task_ids=None):
+        pass
+
+    def unindex(self, task_ids):
+        pass
+
+    def search(self, queryset, terms):
+        raise NotSupportedError(f'Task search is not supported on {connection.vendor}.')
+
+
+class PostgresSearchBackend(SearchBackend):
+    def index(self, task_ids=None):
+        sql = f"""
+            UPDATE {Task._meta.db_table} AS task SET search_vector =
+                setweight(to_tsvector(%s::regconfig, task.title), 'A') ||
+                setweight(to_tsvector(%s::regconfig, task.description), 'B') ||
+                setweight(to_tsvector(%s::regconfig, COALESCE((
+                    SELECT string_agg(subtask.title, ' ')
+                    FROM {Subtask._meta.db_table} AS subtask
+                    WHERE subtask.task_id = task.id
+                ), '')), 'C')
+        """
+        config = (settings.TASKMANAGEMENT_SEARCH_CONFIG, ) * 3
+        with connection.cursor() as cursor:
+            if task_ids is None:
+                cursor.execute(sql, config)
+                return
+            for chunk in _chunks(task_ids):
+                cursor.execute(sql + ' WHERE task.id = ANY(%s)', (*config, chunk))
+
+    def search(self, queryset, terms):
+        # Every term is matched as a prefix: 'deplo' finds 'deployment'.
+        query = SearchQuery(
+            ' & '.join(f"'{term}':*" for term in terms),
+            search_type='raw',
+            config=settings.TASKMANAGEMENT_SEARCH_CONFIG
+        )
+        return queryset.filter(search_vector=query).annotate(
+            score=SearchRank(F('search_vector'), query)
+        )
+
+
+class SQLiteSearchBackend(SearchBackend):
+    def index(self, task_ids=None):
+        sql = f"""
+            INSERT INTO {FTS_TABLE} (rowid, title, description, subtasks)
+            SELECT task.id, task.title, task.description, COALESCE((
+                SELECT group_concat(subtask.title, ' ')
+                FROM {Subtask._meta.db_table} AS subtask
+                WHERE subtask.task_id = task.id
+            ), '')
+            FROM {Task._meta.db_table} AS task
+        """
+        with connection.cursor() as cursor:
+            if task_ids is None:
+                cursor.execute(f'DELETE FROM {FTS_TABLE}')
+                cursor.execute(sql)
+                return
+            for chunk in _chunks(task_ids):
+                placeholders = ', '.join(['%s'] * len(chunk))
+                cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})', chunk)
+                cursor.execute(sql + f' WHERE task.id IN ({placeholders})', chunk)
+
+    def unindex(self, task_ids):
+        with connection.cursor() as cursor:
+            for chunk in _chunks(task_ids):
+                placeholders = ', '.join(['%s'] * len(chunk))
+                cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})', chunk)
+
+    def search(self, queryset, terms):
+        match = ' '.join(f'"{term}"*' for term in terms)
+        # bm25() is lower-is-better; negate it so scores sort like ts_rank.
+        score = RawSQL(
+            f'SELECT -bm25({FTS_TABLE}, 10.0, 4.0, 2.0) FROM {FTS_TABLE} '
+            f'WHERE {FTS_TABLE} MATCH %s AND rowid = {Task._meta.db_table}.id',
+            (match, ),
+            output_field=FloatField()
+        )
+        matches = RawSQL(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', (match, ))
+        return queryset.filter(pk__in=matches).annotate(score=score)
+
+
+BACKENDS = {
+    'postgresql': PostgresSearchBackend(),
+    'sqlite': SQLiteSearchBackend(),
+}
+
+
+def get_backend(vendor=None):
+    return BACKENDS.get(vendor or connection.vendor, SearchBackend())
+
+
+def index_tasks(task_ids=None):
+    """Rebuild the search document of ``task_ids`` (every task if ``None``)."""
+    get_backend().index(task_ids)
+
+
+def unindex_tasks(task_ids):
+    get_backend().unindex(task_ids)
+
+
+def search_tasks(queryset, text):
+    """Filter ``queryset`` to tasks matching every term of ``text``, annotated with ``score``."""
+    return get_backend().search(queryset, search_terms(text))
@@ -0,0 +1,74 @@
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+
+from .models import Board, Column, Task, Subtask
+from .ranking import rank_sequence
+from .search import index_tasks
+
+
+BATCH_SIZE = 1000
+
+
+@transaction.atomic
+def seed(users=1, boards=1, columns=3, tasks=30, subtasks=3, prefix='seed'):
+    """
+    Bulk insert a synthetic dataset and return the created users.
+
+    Every user gets ``boards`` boards with ``columns`` columns each;
+    ``tasks`` tasks are spread across the columns of a board and every task
+    gets ``subtasks`` subtasks, half of them selected.
+    """
+    offset = User.objects.filter(username__startswith=f'{prefix}-').count()
+    password = make_password(None)
+    created_users = User.objects.bulk_create([
+        User(username=f'{prefix}-{offset + i}', password=password)
+        for i in range(users)
+    ])
+
+    selected = (subtasks + 1) // 2
+    ranks = rank_sequence(tasks)
+    for user in created_users:
+        user_boards = Board.objects.bulk_create([
+            Board(name=f'Board {i}', owner=user) for i in range(boards)
+        ])
+        user_columns = Column.objects.bulk_create([
+            Column(name=f'Column {i}', board=board, owner=user)
+            for board in user_boards
+            for i in range(columns)
+        ], batch_size=BATCH_SIZE)
+
+        for board_columns in _chunks(user_columns, columns):
+            board_tasks = Task.objects.bulk_create([
+                Task(
+                    title=f'Task {i}',
+                    description=f'Description of task {i}',
+                    status=board_columns[i % len(board_columns)],
+                    board_id=board_columns[0].board_id,
+                    owner=user,
+                    rank=ranks[i],
+                    subtask_total=subtasks,
+                    subtask_selected=selected
+                )
+                for i in range(tasks)
+            ], batch_size=BATCH_SIZE)
+
+            for task_chunk in _chunks(board_tasks, BATCH_SIZE):
+                Subtask.objects.bulk_create([
+                    Subtask(
+                        title=f'Subtask {i}',
+                        is_selected=i < selected,
+                        task=task,
+                        board_id=task.board_id,
+                        owner=user
+                    )
+                    for task in task_chunk
+                    for i in range(subtasks)
+                ], batch_size=BATCH_SIZE)
+            index_tasks([task.pk for task in board_tasks])
+    return created_users
+
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
@@ -1,7 +1,70 @@
+from django.contrib.auth.models import User
+from django.db import transaction
 from rest_framework import serializers
-from .models import Board, Column, Task, Subtask
+from .bulk import bulk_create_columns
+from .events import publish, subtask_event_data
+from .instrumentation import TimedSerializerMixin
+from .models import Board, BoardMembership, Column, Task, Subtask
+from .ranking import rank_between
+from .search import index_tasks
 
-class SubtaskSerializer(serializers.ModelSerializer):
+
+def parse_field_paths(value):
+    """
+    Parse ``'id,columns.name,columns.tasks'`` into the nested dict
+    ``{'id': {}, 'columns': {'name': {}, 'tasks': {}}}``. An empty branch
+    means every field of that level.
+    """
+    tree = {}
+    for path in filter(None, (value or '').split(',')):
+        branch = tree
+        for name in path.strip().split('.'):
+            branch = branch.setdefault(name, {})
+    return tree
+
+
+class SparseFieldsMixin:
+    """
+    Limit the serializer, and any nested sparse serializers, to the field
+    tree in ``context['fields']``, and add the fields of
+    ``expandable_fields`` named in ``context['expand']``. Both trees come
+    from ``parse_field_paths``; each nested serializer reads its own
+    branch, found from the names of its parents.
+    """
+    expandable_fields = {}
+
+    def branch(self, tree):
+        path = []
+        node = self
+        while node.parent is not None:
+            if node.field_name:
+                path.append(node.field_name)
+            node = node.parent
+        for name in reversed(path):
+            tree = tree.get(name)
+            if tree is None:
+                return {}
+        return tree
+
+    def get_fields(self):
+        fields = super().get_fields()
+        expand = self.branch(self.context.get('expand', {}))
+        for name in expand:
+            if name in self.expandable_fields:
+                fields[name] = self.expandable_fields[name]()
+
+        selected = self.branch(self.context.get('fields', {}))
+        unknown = (set(selected) | set(expand)) - set(fields)
+        if unknown:
+            raise serializers.ValidationError(
+                f'Unknown fields: {", ".join(sorted(unknown))}.'
+            )
+        if selected:
+            fields = {name: field for name, field in fields.items() if name in selected}
+        return fields
+
+
+class SubtaskSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Subtask
         fields = (
@@ -11,8 +74,29 @@ class SubtaskSerializer(serializers.ModelSerializer):
         )
 
 
-class TaskListSerializer(serializers.ModelSerializer):
+class SubtaskPatchSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    id = serializers.IntegerField()
+
+    class Meta:
+        model = Subtask
+        fields = (
+            'id',
+            'title',
+            'is_selected'
+        )
+        extra_kwargs = {
+            'title': {'required': False},
+            'is_selected': {'required': False},
+        }
+
+
+class TaskListSerializer(TimedSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer):
     subtask_count = serializers.SerializerMethodField()
+    expandable_fields = {
+        'description': serializers.CharField,
+        'subtasks': lambda: SubtaskSerializer(many=True, read_only=True),
+    }
+
     class Meta:
         model = Task
         fields = (
@@ -22,15 +106,13 @@ class TaskListSerializer(serializers.ModelSerializer):
         )
 
     def get_subtask_count(self, obj):
-        subtasks = obj.subtasks.prefetch_related()
-        selected = subtasks.filter(is_selected=True)
         return {
-            'total': subtasks.count(),
-            'selected': selected.count()
+            'total': obj.subtask_total,
+            'selected': obj.subtask_selected
         }
 
 
-class TaskDetailSerializer(serializers.ModelSerializer):
+class TaskDetailSerializer(TimedSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer):
     subtasks = SubtaskSerializer(many=True)
     class Meta:
         model = Task
@@ -42,13 +124,45 @@ class TaskDetailSerializer(serializers.ModelSerializer):
             'status',
         )
 
+    @transaction.atomic
     def create(self, validated_data):
         user = self.context['request'].user
         subtasks_data = validated_data.pop('subtasks')
-        task = Task.objects.create(owner=user, **validated_data)
-        for subtask_data in subtasks_data:
-            Subtask.objects.create(owner=user, task=task, **subtask_data)
+        task = Task.objects.create(
+            owner=user,
+            rank=rank_between(
+                Task.objects.in_locked_column(validated_data['status'].pk).last_rank(),
+                None
+            ),
+            subtask_total=len(subtasks_data),
+            subtask_selected=sum(
+                subtask_data.get('is_selected', True) for subtask_data in subtasks_data
+            ),
+            **validated_data
+        )
+        subtasks = Subtask.objects.bulk_create([
+            Subtask(
+                owner=user,
+                task=task,
+                board_id=task.board_id,
+                sequence=task.sequence,
+                **subtask_data
+            )
+            for subtask_data in subtasks_data
+        ])
+        # bulk_create sends no signals: the task was indexed by its own save,
+        # before its subtasks existed.
+        if subtasks:
+            index_tasks([task.pk])
+        for subtask in subtasks:
+            publish(task.board_id, 'subtask.created', subtask_event_data(subtask))
         return task
+
+    def validate_status(self, value):
+        board = self.context.get('board')
+        if board is not None and value.board_id != board.pk:
+            raise serializers.ValidationError('Column does not belong to this board.')
+        return value
     
     def update(self, instance, validated_data):
         subtasks_data = validated_data.pop('subtasks')
@@ -58,7 +172,40 @@ class TaskDetailSerializer(serializers.ModelSerializer):
         return instance    
 
 
-class ColumnListSerializer(serializers.ModelSerializer):
+class TaskBulkSerializer(TaskDetailSerializer):
+    """
+    Validates one item of a bulk task import against the board's column ids
+    from context, so the whole batch is checked without per-item queries.
+    """
+    status = serializers.IntegerField(source='status_id')
+
+    def validate_status(self, value):
+        if value not in self.context['column_ids']:
+            raise serializers.ValidationError('Column does not belong to this board.')
+        return value
+
+
+class TaskMoveSerializer(serializers.Serializer):
+    status = serializers.IntegerField(required=False)
+    before = serializers.IntegerField(required=False)
+    after = serializers.IntegerField(required=False)
+
+    def validate(self, attrs):
+        if 'before' in attrs and 'after' in attrs:
+            raise serializers.ValidationError('Pass either before or after, not both.')
+        return attrs
+
+
+class TaskBulkDeleteSerializer(serializers.Serializer):
+    ids = serializers.ListField(child=serializers.IntegerField(), allow_empty=False)
+
+
+class BoardCloneSerializer(serializers.Serializer):
+    name = serializers.CharField(max_length=128, required=False)
+    is_template = serializers.BooleanField(default=False)
+
+
+class ColumnListSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Column
         fields = (
@@ -67,7 +214,7 @@ class ColumnListSerializer(serializers.ModelSerializer):
         )
 
 
-class ColumnDetailSerializer(serializers.ModelSerializer):
+class ColumnDetailSerializer(TimedSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer):
     tasks = TaskListSerializer(many=True, read_only=True)
 
     class Meta:
@@ -79,16 +226,27 @@ class ColumnDetailSerializer(serializers.ModelSerializer):
         )
 
 
-class BoardListSerializer(serializers.ModelSerializer):
+class ColumnPageSerializer(ColumnDetailSerializer):
+    """A column whose tasks the view cut to one page (``task_page``)."""
+    tasks = TaskListSerializer(source='task_page', many=True, read_only=True)
+    has_more = serializers.BooleanField(read_only=True)
+    next = serializers.CharField(read_only=True, allow_null=True)
+
+    class Meta(ColumnDetailSerializer.Meta):
+        fields = ColumnDetailSerializer.Meta.fields + ('has_more', 'next')
+
+
+class BoardListSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Board
         fields = (
             'id',
             'name',
+            'is_template',
         )
 
 
-class BoardDetailSerializer(serializers.ModelSerializer):
+class BoardDetailSerializer(TimedSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer):
     columns = ColumnDetailSerializer(many=True)
 
     class Meta:
@@ -99,12 +257,12 @@ class BoardDetailSerializer(serializers.ModelSerializer):
             'columns',
         )
 
+    @transaction.atomic
     def create(self, validated_data):
         user = self.context['request'].user
         columns_data = validated_data.pop('columns')
         board = Board.objects.create(**validated_data, owner=user)
-        for column_data in columns_data:
-            Column.objects.create(owner=user, board=board, **column_data)
+        bulk_create_columns(user, board, columns_data)
         return board
     
 
@@ -112,4 +270,23 @@ class BoardDetailSerializer(serializers.ModelSerializer):
         columns_data = validated_data.pop('columns')
         instance.name = validated_data.get('name', instance.name)
         instance.save()
-        return instance
\ No newline at end of file
+        return instance
+
+
+class BoardPageSerializer(BoardDetailSerializer):
+    columns = ColumnPageSerializer(many=True, read_only=True)
+
+
+class BoardMembershipSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    user = serializers.SlugRelatedField(slug_field='username', queryset=User.objects.all())
+
+    class Meta:
+        model = BoardMembership
+        fields = (
+            'user',
+            'role',
+        )
+
+    def update(self, instance, validated_data):
+        validated_data.pop('user', None)
+        return super().update(instance, validated_data)
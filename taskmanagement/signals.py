@@ -0,0 +1,81 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .access import invalidate
+from .events import publish, subtask_event_data, task_event_data
+from .models import Board, BoardMembership, Column, Task, Subtask, Tombstone
+from .search import index_tasks, unindex_tasks
+
+
+@receiver(post_save, sender=Board)
+def board_saved(sender, instance, created, **kwargs):
+    if created:
+        invalidate([instance.owner_id])
+    else:
+        Board.objects.filter(pk=instance.pk).bump_version()
+        publish(instance.pk, 'board.updated', {'id': instance.pk, 'name': instance.name})
+
+
+# Saves of columns, tasks and subtasks bump the board version themselves
+# (BoardRecord.save), to stamp the row with it.
+@receiver(post_save, sender=Column)
+def column_saved(sender, instance, created, **kwargs):
+    publish(
+        instance.board_id,
+        'column.added' if created else 'column.updated',
+        {'id': instance.pk, 'name': instance.name}
+    )
+
+
+@receiver(post_delete, sender=Column)
+def column_deleted(sender, instance, **kwargs):
+    Tombstone.record(instance.board_id, Tombstone.COLUMN, instance.pk)
+    publish(instance.board_id, 'column.removed', {'id': instance.pk})
+
+
+@receiver(post_save, sender=Task)
+def task_saved(sender, instance, created, update_fields=None, **kwargs):
+    board_id = instance.board_id
+    if created:
+        event_type = 'task.created'
+    elif update_fields and 'rank' in update_fields:
+        event_type = 'task.moved'
+    else:
+        event_type = 'task.updated'
+    publish(board_id, event_type, task_event_data(instance))
+    if update_fields is None or {'title', 'description'} & set(update_fields):
+        index_tasks([instance.pk])
+
+
+@receiver(post_delete, sender=Task)
+def task_deleted(sender, instance, **kwargs):
+    unindex_tasks([instance.pk])
+    Tombstone.record(instance.board_id, Tombstone.TASK, instance.pk)
+    publish(instance.board_id, 'task.deleted', {'id': instance.pk})
+
+
+@receiver(post_save, sender=Subtask)
+def subtask_saved(sender, instance, created, **kwargs):
+    board_id = instance.board_id
+    if created:
+        event_type = 'subtask.created'
+    elif instance.loaded_is_selected not in (None, instance.is_selected):
+        event_type = 'subtask.toggled'
+    else:
+        event_type = 'subtask.updated'
+    instance.loaded_is_selected = instance.is_selected
+    publish(board_id, event_type, subtask_event_data(instance))
+    index_tasks([instance.task_id])
+
+
+@receiver(post_delete, sender=Subtask)
+def subtask_deleted(sender, instance, **kwargs):
+    Tombstone.record(instance.board_id, Tombstone.SUBTASK, instance.pk)
+    publish(instance.board_id, 'subtask.deleted', {'id': instance.pk, 'task': instance.task_id})
+    index_tasks([instance.task_id])
+
+
+@receiver(post_save, sender=BoardMembership)
+@receiver(post_delete, sender=BoardMembership)
+def membership_changed(sender, instance, **kwargs):
+    invalidate([instance.user_id])
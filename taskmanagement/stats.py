@@ -0,0 +1,142 @@
+"""
+Dashboard aggregates computed in SQL.
+
+Per-column task counts and subtask completion come from one grouped query
+over the denormalized subtask counters, so no subtask row is read. The
+dashboard of all of a user's boards is one grouped query as well, or, with
+``TASKMANAGEMENT_BOARD_STATS_SUMMARY`` on, a read of the ``BoardStats``
+summary, refreshed for every board touched by a request once it commits.
+"""
+from django.conf import settings
+from django.db.models import Count, Max, Sum
+from django.db.models.functions import Coalesce
+
+from .models import Board, BoardStats, Column, Task
+
+
+RECENT_LIMIT = 10
+
+
+def _subtasks(total, selected):
+    return {
+        'total': total,
+        'selected': selected,
+        'ratio': round(selected / total, 4) if total else None
+    }
+
+
+def _recent(tasks):
+    return list(
+        tasks.order_by('-updated_at', '-id')
+        .values('id', 'title', 'status', 'board', 'updated_at')[:RECENT_LIMIT]
+    )
+
+
+def board_stats(board):
+    columns = (
+        Column.objects.filter(board=board.pk)
+        .order_by('id')
+        .values('id', 'name')
+        .annotate(
+            task_count=Count('tasks'),
+            subtask_total=Coalesce(Sum('tasks__subtask_total'), 0),
+            subtask_selected=Coalesce(Sum('tasks__subtask_selected'), 0)
+        )
+    )
+    columns = [
+        {
+            'id': column['id'],
+            'name': column['name'],
+            'tasks': column['task_count'],
+            'subtasks': _subtasks(column['subtask_total'], column['subtask_selected'])
+        }
+        for column in columns
+    ]
+    return {
+        'id': board.pk,
+        'name': board.name,
+        'tasks': sum(column['tasks'] for column in columns),
+        'subtasks': _subtasks(
+            sum(column['subtasks']['total'] for column in columns),
+            sum(column['subtasks']['selected'] for column in columns)
+        ),
+        'columns': columns,
+        'recent': _recent(Task.objects.filter(board=board.pk)),
+    }
+
+
+def _aggregate(board_ids):
+    """One grouped query: ``(board_id, name, tasks, total, selected, last_updated_at)`` rows."""
+    return (
+        Board.objects.filter(pk__in=board_ids)
+        .order_by('id')
+        .values_list('id', 'name')
+        .annotate(
+            task_count=Count('columns__tasks'),
+            subtask_total=Coalesce(Sum('columns__tasks__subtask_total'), 0),
+            subtask_selected=Coalesce(Sum('columns__tasks__subtask_selected'), 0),
+            last_updated_at=Max('columns__tasks__updated_at')
+        )
+    )
+
+
+def refresh_summaries(board_ids):
+    """Recompute the ``BoardStats`` rows of ``board_ids`` with one grouped query and one upsert."""
+    board_ids = set(board_ids)
+    if not board_ids or not settings.TASKMANAGEMENT_BOARD_STATS_SUMMARY:
+        return []
+    return BoardStats.objects.bulk_create(
+        [
+            BoardStats(
+                board_id=board_id,
+                tasks=tasks,
+                subtask_total=total,
+                subtask_selected=selected,
+                last_updated_at=last_updated_at
+            )
+            for board_id, _, tasks, total, selected, last_updated_at in _aggregate(board_ids)
+        ],
+        update_conflicts=True,
+        unique_fields=('board', ),
+        update_fields=(
+            'tasks', 'subtask_total', 'subtask_selected', 'last_updated_at', 'refreshed_at'
+        )
+    )
+
+
+def _summary_rows(board_ids):
+    rows = list(
+        BoardStats.objects.filter(board__in=board_ids, board__deleted_at__isnull=True)
+        .order_by('board')
+        .values_list(
+            'board', 'board__name', 'tasks', 'subtask_total', 'subtask_selected', 'last_updated_at'
+        )
+    )
+    missing = set(board_ids) - {row[0] for row in rows}
+    if missing:
+        # Boards written before the summary was enabled, or imported.
+        refresh_summaries(missing)
+        rows.extend(_aggregate(missing))
+        rows.sort()
+    return rows
+
+
+def user_stats(board_ids):
+    """Totals of every board in ``board_ids`` and the tasks updated last across them."""
+    if settings.TASKMANAGEMENT_BOARD_STATS_SUMMARY:
+        rows = _summary_rows(board_ids)
+    else:
+        rows = _aggregate(board_ids)
+    return {
+        'boards': [
+            {
+                'id': board_id,
+                'name': name,
+                'tasks': tasks,
+                'subtasks': _subtasks(total, selected),
+                'last_updated_at': last_updated_at
+            }
+            for board_id, name, tasks, total, selected, last_updated_at in rows
+        ],
+        'recent': _recent(Task.objects.filter(board__in=board_ids)),
+    }
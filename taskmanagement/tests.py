@@ -1,3 +1,1344 @@
-from django.test import TestCase
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from datetime import timedelta
+from io import StringIO
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.checks import Tags, run_checks
+from django.core.management import CommandError, call_command
+from django.db import connection, transaction
+from django.test import (
+    RequestFactory, TestCase as DjangoTestCase, TransactionTestCase, override_settings
+)
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from .api.streams import board_events
+from .api.permissions import BoardObjectMixin
+from .api.throttling import TokenBucketStore, buckets
+from .api.views import TaskDetailView
+from .bulk import remove_tasks
+from .access import board_roles
+from .deletion import delete_board
+from .cache import board_cache
+from .events import InMemoryBroker
+from .instrumentation import RequestMetrics, current_metrics, registry
+from .models import (
+    Activity, ArchivedSubtask, ArchivedTask, Board, BoardMembership,
+    BoardStats, Column, Task, Subtask, Tombstone
+)
+from .search import search_tasks
+from .serializers import TaskDetailSerializer
+from .transfer import export_board, import_board
+
+
+
+class TestCase(DjangoTestCase):
+    def setUp(self):
+        # Primary keys are reused once a test rolls back, so cached board
+        # snapshots, access indexes and throttle buckets must not leak
+        # between tests.
+        board_cache.backend.clear()
+        caches[settings.TASKMANAGEMENT_ACCESS_CACHE].clear()
+        caches[settings.TASKMANAGEMENT_THROTTLE_CACHE].clear()
+        buckets.clear_local()
+
+
+class BoardDetailViewTest(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user('owner', password='password')
+        self.board = Board.objects.create(name='Board', owner=self.user)
+        self.columns = [
+            Column.objects.create(name=name, board=self.board, owner=self.user)
+            for name in ('Todo', 'Doing', 'Done')
+        ]
+        self.client.force_login(self.user)
+
+    def add_tasks(self, count):
+        for i in range(count):
+            task = Task.objects.create(
+                title=f'Task {i}',
+                description='',
+                status=self.columns[i % len(self.columns)],
+                owner=self.user
+            )
+            Subtask.objects.create(title='a', task=task, owner=self.user)
+            Subtask.objects.create(title='b', task=task, owner=self.user, is_selected=False)
+        Task.objects.filter(board=self.board).recount_subtasks()
+
+    def count_queries(self):
+        url = reverse('board_detail', args=(self.board.pk, ))
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(context), response.json()
+
+    def test_query_count_does_not_grow_with_tasks(self):
+        board_roles(self.user.pk)
+        self.add_tasks(1)
+        small, _ = self.count_queries()
+        self.add_tasks(30)
+        large, data = self.count_queries()
+
+        self.assertEqual(small, large)
+        tasks = [task for column in data['columns'] for task in column['tasks']]
+        self.assertEqual(len(tasks), 31)
+        self.assertEqual(tasks[0]['subtask_count'], {'total': 2, 'selected': 1})
+
+    def test_async_view_matches_sync_view(self):
+        self.add_tasks(5)
+        _, data = self.count_queries()
+        board_cache.backend.clear()
+        response = self.client.get(reverse('async_board_detail', args=(self.board.pk, )))
+        self.assertEqual(response.json(), data)
+
+        task = Task.objects.first()
+        sync = self.client.get(reverse('task_detail', args=(task.pk, )))
+        response = self.client.get(
+            reverse('async_task_detail', args=(task.pk, )), HTTP_IF_NONE_MATCH=sync['ETag']
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_async_view_shapes_like_sync_view(self):
+        self.add_tasks(5)
+        params = {'fields': 'id,columns.tasks.title', 'limit': 1, 'title': 'Task'}
+        sync = self.client.get(reverse('board_detail', args=(self.board.pk, )), params)
+        response = self.client.get(reverse('async_board_detail', args=(self.board.pk, )), params)
+        self.assertEqual(response.json(), sync.json())
+        self.assertEqual(response['ETag'], sync['ETag'])
+
+        for params in ({'limit': 0}, {'updated_since': 'soon'}, {'fields': 'nope'}):
+            with self.subTest(params=params):
+                response = self.client.get(reverse('async_board_detail', args=(self.board.pk, )), params)
+                self.assertEqual(response.status_code, 400)
+
+    def test_snapshot_is_served_until_board_changes(self):
+        self.add_tasks(3)
+        board_cache.reset_stats()
+        self.count_queries()
+        cached, _ = self.count_queries()
+        self.assertEqual(board_cache.stats()['hits'], 1)
+
+        task = Task.objects.first()
+        task.title = 'Renamed'
+        task.save()
+        uncached, data = self.count_queries()
+
+        self.assertLess(cached, uncached)
+        self.assertEqual(board_cache.stats()['misses'], 2)
+        titles = [task['title'] for column in data['columns'] for task in column['tasks']]
+        self.assertIn('Renamed', titles)
+
+
+class ConditionalRequestTest(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user('owner', password='password')
+        self.board = Board.objects.create(name='Board', owner=self.user)
+        self.column = Column.objects.create(name='Todo', board=self.board, owner=self.user)
+        self.task = Task.objects.create(
+            title='Task',
+            description='',
+            status=self.column,
+            owner=self.user
+        )
+        self.client.force_login(self.user)
+
+    def test_board_detail_returns_304_until_modified(self):
+        url = reverse('board_detail', args=(self.board.pk, ))
+        etag = self.client.get(url)['ETag']
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        Subtask.objects.create(title='New', task=self.task, owner=self.user)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_task_update_with_stale_if_match_is_rejected(self):
+        detail_url = reverse('task_detail', args=(self.task.pk, ))
+        update_url = reverse('task_update', args=(self.task.pk, ))
+        etag = self.client.get(detail_url)['ETag']
+        data = {
+            'title': 'Renamed',
+            'description': 'Description',
+            'subtasks': [],
+            'status': self.column.pk
+        }
+
+        response = self.client.put(
+            update_url, data, content_type='application/json', HTTP_IF_MATCH=etag
+        )
+        self.assertEqual(response.status_code, 200)
+
+        response = self.client.put(
+            update_url, data, content_type='application/json', HTTP_IF_MATCH=etag
+        )
+        self.assertEqual(response.status_code, 412)
+
+    def test_write_landing_after_the_fetch_fails_the_precondition(self):
+        detail_url = reverse('task_detail', args=(self.task.pk, ))
+        etag = self.client.get(detail_url)['ETag']
+        fetch = BoardObjectMixin.get_board_object
+
+        def fetch_then_concurrent_write(view, queryset, pk):
+            obj = fetch(view, queryset, pk)
+            Task.objects.get(pk=self.task.pk).save()
+            return obj
+
+        with mock.patch.object(BoardObjectMixin, 'get_board_object', fetch_then_concurrent_write):
+            response = self.client.put(
+                reverse('task_update', args=(self.task.pk, )),
+                {'title': 'Lost', 'description': 'd', 'subtasks': [], 'status': self.column.pk},
+                content_type='application/json',
+                HTTP_IF_MATCH=etag
+            )
+        self.assertEqual(response.status_code, 412)
+        self.assertEqual(Task.objects.get(pk=self.task.pk).title, 'Task')
+
+    def test_writes_to_other_tasks_keep_the_task_etag(self):
+        detail_url = reverse('task_detail', args=(self.task.pk, ))
+        etag = self.client.get(detail_url)['ETag']
+
+        Task.objects.create(title='Other', description='', status=self.column, owner=self.user)
+        self.assertEqual(self.client.get(detail_url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        response = self.client.put(
+            reverse('task_update', args=(self.task.pk, )),
+            {'title': 'Renamed', 'description': 'd', 'subtasks': [], 'status': self.column.pk},
+            content_type='application/json',
+            HTTP_IF_MATCH=etag
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.get(detail_url)['ETag'], response['ETag'])
+
+    def test_subtask_writes_change_the_task_etag(self):
+        detail_url = reverse('task_detail', args=(self.task.pk, ))
+        subtask = Subtask.objects.create(title='New', task=self.task, owner=self.user)
+        Task.objects.filter(pk=self.task.pk).recount_subtasks()
+        etag = self.client.get(detail_url)['ETag']
+
+        response = self.client.put(
+            reverse('subtask_update', args=(subtask.pk, )),
+            {'title': 'New', 'is_selected': True},
+            content_type='application/json',
+            HTTP_IF_MATCH=etag
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.get(detail_url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+        response = self.client.delete(
+            reverse('subtask_delete', args=(subtask.pk, )), HTTP_IF_MATCH=etag
+        )
+        self.assertEqual(response.status_code, 412)
+
+
+class BulkEndpointTest(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user('owner', password='password')
+        self.board = Board.objects.create(name='Board', owner=self.user)
+        board_roles(self.user.pk)
+        self.column = Column.objects.create(name='Todo', board=self.board, owner=self.user)
+        self.client.force_login(self.user)
+
+    def test_bulk_create_then_patch_subtasks(self):
+        url = reverse('task_bulk_create', args=(self.board.pk, ))
+        payload = [
+            {
+                'title': f'Task {i}',
+                'description': 'Imported',
+                'status': self.column.pk,
+                'subtasks': [
+                    {'title': 'a', 'is_selected': False},
+                    {'title': 'b', 'is_selected': False},
+                ]
+            }
+            for i in range(20)
+        ]
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post(url, payload, content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        self.assertLess(len(context), 15)
+        self.assertEqual(Subtask.objects.count(), 40)
+
+        first = response.json()[0]
+        patches = [{'id': pk, 'is_selected': True} for pk in first['subtasks']]
+        patches.append({'id': 0, 'title': 'missing'})
+        response = self.client.patch(
+            reverse('subtask_bulk_update'), patches, content_type='application/json'
+        )
+        self.assertEqual(
+            [result['status'] for result in response.json()],
+            ['updated', 'updated', 'not_found']
+        )
+        task = Task.objects.get(pk=first['id'])
+        self.assertEqual((task.subtask_total, task.subtask_selected), (2, 2))
+
+    def test_bulk_create_rejects_foreign_column(self):
+        other = Board.objects.create(name='Other', owner=self.user)
+        column = Column.objects.create(name='Todo', board=other, owner=self.user)
+        url = reverse('task_bulk_create', args=(self.board.pk, ))
+        payload = [
+            {'title': 'ok', 'description': 'd', 'status': self.column.pk, 'subtasks': []},
+            {'title': 'bad', 'description': 'd', 'status': column.pk, 'subtasks': []},
+        ]
+        response = self.client.post(url, payload, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()[0], {})
+        self.assertIn('status', response.json()[1])
+        self.assertFalse(Task.objects.exists())
+
+
+class SubtaskCounterTest(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user('owner', password='password')
+        self.board = Board.objects.create(name='Board', owner=self.user)
+        self.column = Column.objects.create(name='Todo', board=self.board, owner=self.user)
+        self.client.force_login(self.user)
+
+    def counters(self, pk):
+        return Task.objects.values_list('subtask_total', 'subtask_selected').get(pk=pk)
+
+    def test_counters_follow_subtask_writes(self):
+        response = self.client.post(
+            reverse('task_create', args=(self.board.pk, )),
+            {
+                'title': 'Task', 'description': 'd', 'status': self.column.pk,
+                'subtasks': [{'title': 'a', 'is_selected': True}, {'title': 'b', 'is_selected': False}]
+            },
+            content_type='application/json'
+        )
+        pk = response.json()['id']
+        self.assertEqual(self.counters(pk), (2, 1))
+
+        response = self.client.post(
+            reverse('subtask_create', args=(pk, )), {'title': 'c', 'is_selected': True},
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.counters(pk), (3, 2))
+
+        subtask = Subtask.objects.get(task=pk, title='b')
+        self.client.put(
+            reverse('subtask_update', args=(subtask.pk, )), {'title': 'b', 'is_selected': True},
+            content_type='application/json'
+        )
+        self.assertEqual(self.counters(pk), (3, 3))
+
+        subtask = Subtask.objects.get(task=pk, title='a')
+        self.assertEqual(self.client.delete(reverse('subtask_delete', args=(subtask.pk, ))).status_code, 204)
+        self.assertEqual(self.counters(pk), (2, 2))
+
+    def test_toggle_racing_another_toggle_keeps_counters(self):
+        task = Task.objects.create(title='Task', description='d', status=self.column, owner=self.user)
+        subtask = Subtask.objects.create(title='a', task=task, owner=self.user, is_selected=False)
+        Task.objects.filter(pk=task.pk).recount_subtasks()
+        fetch = BoardObjectMixin.get_board_object
+        raced = []
+
+        def fetch_then_concurrent_toggle(view, queryset, pk):
+            obj = fetch(view, queryset, pk)
+            if raced:
+                return obj
+            raced.append(True)
+            self.client.put(
+                reverse('subtask_update', args=(subtask.pk, )), {'title': 'a', 'is_selected': True},
+                content_type='application/json'
+            )
+            return obj
+
+        with mock.patch.object(BoardObjectMixin, 'get_board_object', fetch_then_concurrent_toggle):
+            self.client.put(
+                reverse('subtask_update', args=(subtask.pk, )), {'title': 'a', 'is_selected': True},
+                content_type='application/json'
+            )
+        self.assertEqual(self.counters(task.pk), (1, 1))
+
+    def test_recount_command_repairs_drift(self):
+        task = Task.objects.create(title='Task', description='d', status=self.column, owner=self.user)
+        Subtask.objects.create(title='a', task=task, owner=self.user)
+        Subtask.objects.create(title='b', task=task, owner=self.user, is_selected=False)
+        clean = Task.objects.create(title='Clean', description='d', status=self.column, owner=self.user)
+        Task.objects.filter(pk=task.pk).update(subtask_total=7, subtask_selected=5)
+
+        out = StringIO()
+        call_command('recount_subtasks', batch_size=1, stdout=out)
+        self.assertIn('Repaired 1 task(s).', out.getvalue())
+        self.assertEqual(self.counters(task.pk), (2, 1))
+        self.assertEqual(self.counters(clean.pk), (0, 0))
+
+
+class TaskListViewTest(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user('owner', password='password')
+        self.board = Board.objects.create(name='Board', owner=self.user)
+        self.column = Column.objects.create(name='Todo', board=self.board, owner=self.user)
+        Task.objects.bulk_create([
+            Task(
+                title=f'Task {i}', description='', status=self.column,
+                board=self.board, owner=self.user
+            )
+            for i in range(25)
+        ])
+        self.client.force_login(self.user)
+
+    def test_cursor_walks_every_task_once_despite_ties(self):
+        first = Task.objects.order_by('pk').first()
+        Task.objects.update(updated_at=first.updated_at)
+
+        seen = []
+        params = {'board': self.board.pk, 'limit': 10, 'fields': 'id,title'}
+        while True:
+            response = self.client.get(reverse('task_list'), params)
+            self.assertEqual(response.status_code, 200)
+            page = response.json()
+            seen.extend(item['id'] for item in page['results'])
+            self.assertEqual(set(page['results'][0]), {'id', 'title'})
+            if not page['next']:
+                break
+            params['cursor'] = page['next']
+
+        self.assertEqual(seen, sorted(Task.objects.values_list('pk', flat=True), reverse=True))
+
+    def test_title_prefix_filter(self):
+        response = self.client.get(
+            reverse('task_list'), {'status': self.column.pk, 'title': 'Task 2'}
+        )
+        self.assertEqual(len(response.json()['results']), 6)
+
+
+class TaskMoveViewTest(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user('owner', password='password')
+        self.board = Board.objects.create(name='Board', owner=self.user)
+        self.todo = Column.objects.create(name='Todo', board=self.board, owner=self.user)
+        self.done = Column.objects.create(name='Done', board=self.board, owner=self.user)
+        self.client.force_login(self.user)
+        url = reverse('task_create', args=(self.board.pk, ))
+        self.tasks = [
+            self.client.post(
+                url,
+                {'title': title, 'description': 'd', 'status': self.todo.pk, 'subtasks': []},
+                content_type='application/json'
+            ).json()['id']
+            for title in ('a', 'b', 'c')
+        ]
+
+    def titles(self):
+        response = self.client.get(reverse('board_detail', args=(self.board.pk, )))
+        return [[task['title'] for task in column['tasks']] for column in response.json()['columns']]
+
+    def move(self, pk, **data):
+        return self.client.post(
+            reverse('task_move', args=(pk, )), data, content_type='application/json'
+        )
+
+    def test_move_within_and_across_columns(self):
+        a, b, c = self.tasks
+        self.assertEqual(self.move(c, before=a).status_code, 200)
+        self.assertEqual(self.titles(), [['c', 'a', 'b'], []])
+
+        self.move(a, status=self.done.pk)
+        self.move(b, after=a)
+        self.assertEqual(self.titles(), [['c'], ['a', 'b']])
+
+    def test_sibling_must_be_in_target_column(self):
+        a, b, c = self.tasks
+        response = self.move(a, status=self.done.pk, before=b)
+        self.assertEqual(response.status_code, 400)
+
+
+class BoardEventStreamTest(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.broker = InMemoryBroker()
+        patcher = mock.patch('taskmanagement.events._broker', self.broker)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.user = User.objects.create_user('owner', password='password')
+        self.board = Board.objects.create(name='Board', owner=self.user)
+        self.column = Column.objects.create(name='Todo', board=self.board, owner=self.user)
+
+    async def read(self, request, count):
+        response = await board_events(request, self.board.pk)
+        chunks = response.streaming_content.__aiter__()
+        try:
+            return [await chunks.__anext__() for _ in range(count)]
+        finally:
+            await chunks.aclose()
+
+    def test_reconnect_resumes_after_last_event_id(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            task = Task.objects.create(
+                title='Task', description='d', status=self.column, owner=self.user
+            )
+        with self.captureOnCommitCallbacks(execute=True):
+            subtask = Subtask.objects.create(title='a', task=task, owner=self.user)
+        subtask = Subtask.objects.get(pk=subtask.pk)
+        subtask.is_selected = False
+        with self.captureOnCommitCallbacks(execute=True):
+            subtask.save()
+
+        request = RequestFactory().get('/', HTTP_LAST_EVENT_ID='1')
+        request.user = self.user
+        retry, created, toggled = async_to_sync(self.read)(request, 3)
+
+        self.assertEqual(retry, b'retry: 3000\n\n')
+        self.assertTrue(created.startswith(b'id: 2\nevent: subtask.created\n'))
+        self.assertTrue(toggled.startswith(b'id: 3\nevent: subtask.toggled\n'))
+
+    def test_live_events_reach_subscribers(self):
+        async def receive():
+            events = self.broker.subscribe(self.board.pk)
+            pending = asyncio.ensure_future(events.__anext__())
+            await asyncio.sleep(0)
+            self.broker.publish(self.board.pk, 'column.added', {'id': 1})
+            try:
+                return await pending
+            finally:
+                await events.aclose()
+
+        event = async_to_sync(receive)()
+        self.assertEqual(event['type'], 'column.added')
+
+
+class InstrumentationTest(TestCase):
+    def setUp(self):
+        super().setUp()
+        registry.reset()
+        self.user = User.objects.create_user('owner', password='password')
+        self.board = Board.objects.create(name='Board', owner=self.user)
+        self.client.force_login(self.user)
+
+    def test_server_timing_and_staff_only_report(self):
+        response = self.client.get(reverse('board_list'))
+        self.assertIn('db;dur=', response['Server-Timing'])
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 403)
+
+        self.user.is_staff = True
+        self.user.save()
+        routes = self.client.get(reverse('metrics')).json()['routes']
+        self.assertEqual(routes['board_list']['count'], 1)
+        self.assertGreater(routes['board_list']['avg_queries'], 0)
+
+    def test_serialize_time_covers_serializer_output(self):
+        column = Column.objects.create(name='Todo', board=self.board, owner=self.user)
+        task = Task.objects.create(title='Task', description='d', status=column, owner=self.user)
+        Subtask.objects.create(title='a', task=task, owner=self.user)
+        task = Task.objects.prefetch_related('subtasks').get(pk=task.pk)
+
+        class PlainSerializer(serializers.Serializer):
+            title = serializers.CharField()
+
+        metrics = RequestMetrics()
+        token = current_metrics.set(metrics)
+        try:
+            # Only the task is timed, not its nested subtasks, and
+            # serializers from outside the app are not timed at all.
+            with mock.patch('taskmanagement.instrumentation.perf_counter', side_effect=[10.0, 10.5]):
+                data = TaskDetailSerializer(task).data
+                plain = PlainSerializer(task).data
+        finally:
+            current_metrics.reset(token)
+        self.assertEqual(data['subtasks'][0]['title'], 'a')
+        self.assertEqual(plain, {'title': 'Task'})
+        self.assertEqual(metrics.serialize_time, 0.5)
+
+
+class BoardDeletionTest(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user('owner', password='password')
+        self.board = Board.objects.create(name='Board', owner=self.user)
+        self.column = Column.objects.create(name='Todo', board=self.board, owner=self.user)
+        for i in range(5):
+            task = Task.objects.create(
+                title=f'Task {i}', description='', status=self.column, owner=self.user
+            )
+            Subtask.objects.create(title='a', task=task, owner=self.user)
+        self.client.force_login(self.user)
+
+    @override_settings(TASKMANAGEMENT_DELETE_CHUNK_SIZE=2)
+    def test_delete_removes_tree_without_loading_it(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.delete(reverse('board_delete', args=(self.board.pk, )))
+        self.assertEqual(response.status_code, 204)
+        # Subtasks are deleted by id and never loaded as model instances.
+        statements = [query['sql'] for query in context.captured_queries]
+        self.assertFalse(any('"taskmanagement_subtask"."title"' in sql for sql in statements))
+        self.assertFalse(Board.all_objects.exists())
+        self.assertFalse(Task.objects.exists())
+        self.assertFalse(Subtask.objects.exists())
+
+    @override_settings(TASKMANAGEMENT_SOFT_DELETE_TASKS=5)
+    def test_large_board_is_hidden_then_purged(self):
+        response = self.client.delete(reverse('board_delete', args=(self.board.pk, )))
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(
+            self.client.get(reverse('board_detail', args=(self.board.pk, ))).status_code, 404
+        )
+        self.assertTrue(Task.objects.exists())
+
+        call_command('purge_boards', batch_size=1, stdout=StringIO())
+        self.assertFalse(Board.all_objects.exists())
+        self.assertFalse(Task.objects.exists())
+
+
+class BoardTransferTest(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user('owner', password='password')
+        self.board = Board.objects.create(name='Board', owner=self.user)
+        for name in ('Todo', 'Done'):
+            column = Column.objects.create(name=name, board=self.board, owner=self.user)
+            for i in range(3):
+                task = Task.objects.create(
+                    title=f'{name} {i}', description='d', status=column,
+                    owner=self.user, rank='b' + 'abc'[i]
+                )
+                Subtask.objects.create(title='a', task=task, owner=self.user)
+                Subtask.objects.create(title='b', task=task, owner=self.user, is_selected=False)
+        self.client.force_login(self.user)
+
+    def tree(self, board):
+        return [
+            (column.name, [
+                (task.title, task.rank, sorted(
+                    (subtask.title, subtask.is_selected) for subtask in task.subtasks.all()
+                ))
+                for task in column.tasks.order_by('rank')
+            ])
+            for column in board.columns.order_by('id')
+        ]
+
+    def test_export_then_import_round_trip(self):
+        response = self.client.get(reverse('board_export', args=(self.board.pk, )))
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        body = b''.join(response.streaming_content)
+        self.assertEqual(len(body.splitlines()), 1 + 2 + 6 + 12)
+
+        # A chunk size of 2 makes the importer flush tasks several times.
+        copy = import_board(body.splitlines(keepends=True), self.user, name='Copy', chunk_size=2)
+        self.assertEqual(copy.name, 'Copy')
+        self.assertEqual(self.tree(copy), self.tree(self.board))
+        counters = Task.objects.filter(status__board=copy).values_list('subtask_total', 'subtask_selected')
+        self.assertEqual(set(counters), {(2, 1)})
+        # Every chunk is stamped with a new board version.
+        copy.refresh_from_db()
+        sequences = set(Task.objects.filter(board=copy).values_list('sequence', flat=True))
+        self.assertEqual(len(sequences), 3)
+        self.assertEqual(max(sequences), copy.version)
+        self.assertTrue(Column.objects.filter(board=copy, sequence=1).exists())
+
+    def test_export_skips_subtasks_of_vanished_tasks(self):
+        # A subtask read before its task was deleted, ahead of every live task.
+        rows = [(0, 0, 'ghost', True)] + list(
+            Subtask.objects.order_by('task_id', 'id').values_list('id', 'task_id', 'title', 'is_selected')
+        )
+        subtasks = mock.MagicMock()
+        subtasks.objects.filter.return_value.order_by.return_value.values_list.return_value \
+            .iterator.return_value = iter(rows)
+        with mock.patch('taskmanagement.transfer.Subtask', subtasks):
+            body = ''.join(export_board(self.board))
+        titles = [record['title'] for record in map(json.loads, body.splitlines()) if record['type'] == 'subtask']
+        self.assertEqual(titles, ['a', 'b'] * 6)
+
+    def test_clone_board(self):
+        viewer = User.objects.create_user('viewer', password='password')
+        BoardMembership.objects.create(board=self.board, user=viewer, role=BoardMembership.VIEWER)
+        self.client.force_login(viewer)
+        url = reverse('board_clone', args=(self.board.pk, ))
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post(
+                url, {'name': 'Template', 'is_template': True}, content_type='application/json'
+            )
+        self.assertEqual(response.status_code, 201)
+        self.assertLess(len(context), 25)
+        template = Board.objects.get(pk=response.json()['id'])
+        self.assertEqual((template.owner, template.is_template), (viewer, True))
+        self.assertEqual(self.tree(template), self.tree(self.board))
+
+        response = self.client.post(reverse('board_clone', args=(template.pk, )))
+        self.assertEqual(response.json()['name'], 'Template')
+        self.assertFalse(response.json()['is_template'])
+        self.assertEqual(search_tasks(Task.objects.filter(board=response.json()['id']), 'Done').count(), 3)
+
+    def test_import_rejects_orphan_subtask(self):
+        body = (
+            '{"type":"board","format":1,"id":1,"name":"B"}\n'
+            '{"type":"subtask","id":1,"task":9,"title":"a","is_selected":true}\n'
+        )
+        response = self.client.post(reverse('board_import'), body, content_type='application/x-ndjson')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Line 2', response.json()['error'])
+        self.assertEqual(Board.objects.count(), 1)
+
+    def test_import_rejects_invalid_values(self):
+        head = '{"type":"board","format":1,"id":1,"name":"B"}\n{"type":"column","id":1,"name":"C"}\n'
+        task = {'type': 'task', 'id': 1, 'column': 1, 'title': 't', 'description': 'd', 'rank': 'n'}
+        records = [
+            {**task, 'title': 'x' * 129},
+            {**task, 'description': None},
+            {**task, 'rank': 'N0'},
+            {**task, 'rank': 'aaa'},
+            {key: value for key, value in task.items() if key != 'title'},
+        ]
+        for record in records:
+            with self.subTest(record=record):
+                body = head + json.dumps(record) + '\n'
+                response = self.client.post(
+                    reverse('board_import'), body, content_type='application/x-ndjson'
+                )
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('Line 3', response.json()['error'])
+        self.assertEqual(Board.objects.count(), 1)
+
+
+class TaskSearchViewTest(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user('owner', password='password')
+        board = Board.objects.create(name='Board', owner=self.user)
+        self.column = Column.objects.create(name='Todo', board=board, owner=self.user)
+        self.deploy = Task.objects.create(
+            title='Deployment pipeline', description='Ship it', status=self.column, owner=self.user
+        )
+        self.docs = Task.objects.create(
+            title='Write docs', description='Explain how deployments work',
+            status=self.column, owner=self.user
+        )
+        Task.objects.create(title='Unrelated', description='d', status=self.column, owner=self.user)
+
+        other = User.objects.create_user('other', password='password')
+        other_board = Board.objects.create(name='Other', owner=other)
+        other_column = Column.objects.create(name='Todo', board=other_board, owner=other)
+        Task.objects.create(title='Deploy', description='d', status=other_column, owner=other)
+        self.client.force_login(self.user)
+
+    def search(self, **params):
+        response = self.client.get(reverse('task_search'), params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_prefix_match_ranks_title_above_description(self):
+        data = self.search(q='deploy')
+        self.assertEqual([row['id'] for row in data['results']], [self.deploy.pk, self.docs.pk])
+
+        first = self.search(q='deploy', limit=1)
+        second = self.search(q='deploy', limit=1, cursor=first['next'])
+        self.assertEqual(second['results'][0]['id'], self.docs.pk)
+        self.assertIsNone(second['next'])
+
+    def test_index_follows_writes(self):
+        subtask = Subtask.objects.create(title='Rollback plan', task=self.docs, owner=self.user)
+        self.assertEqual([row['id'] for row in self.search(q='rollb')['results']], [self.docs.pk])
+
+        subtask.delete()
+        self.assertEqual(self.search(q='rollb')['results'], [])
+        self.deploy.delete()
+        self.assertEqual([row['id'] for row in self.search(q='deploy')['results']], [self.docs.pk])
+
+    def test_nested_subtasks_of_a_new_task_are_indexed(self):
+        response = self.client.post(
+            reverse('task_create', args=(self.column.board_id, )),
+            {
+                'title': 'Aquarium', 'description': 'd', 'status': self.column.pk,
+                'subtasks': [{'title': 'Feed the zebrafish'}]
+            },
+            content_type='application/json'
+        )
+        self.assertEqual(
+            [row['id'] for row in self.search(q='zebrafish')['results']], [response.json()['id']]
+        )
+
+
+class BoardSyncTest(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user('owner', password='password')
+        self.board = Board.objects.create(name='Board', owner=self.user)
+        self.column = Column.objects.create(name='Todo', board=self.board, owner=self.user)
+        self.tasks = [
+            Task.objects.create(title=f'Task {i}', description='', status=self.column, owner=self.user)
+            for i in range(3)
+        ]
+        self.subtask = Subtask.objects.create(title='a', task=self.tasks[0], owner=self.user)
+        self.tasks[0].subtask_total = self.tasks[0].subtask_selected = 1
+        self.tasks[0].save()
+        self.client.force_login(self.user)
+        self.url = reverse('board_changes', args=(self.board.pk, ))
+
+    def test_deleting_a_task_leaves_one_tombstone(self):
+        Subtask.objects.bulk_create([
+            Subtask(title=f'{i}', task=self.tasks[0], board=self.board, owner=self.user)
+            for i in range(20)
+        ])
+        version = Board.objects.get(pk=self.board.pk).version
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.delete(reverse('task_delete', args=(self.tasks[0].pk, )))
+        self.assertEqual(response.status_code, 204)
+        self.assertLess(len(context), 20)
+        self.assertEqual(Board.objects.get(pk=self.board.pk).version, version + 1)
+        self.assertEqual(
+            list(Tombstone.objects.filter(board=self.board).values_list('kind', 'object_id')),
+            [(Tombstone.TASK, self.tasks[0].pk)]
+        )
+        self.assertFalse(Subtask.objects.filter(task=self.tasks[0].pk).exists())
+
+    def test_rebalanced_ranks_are_synced(self):
+        version = self.client.get(self.url).json()['version']
+        with transaction.atomic():
+            Task.objects.in_locked_column(self.column.pk).rebalance()
+        delta = self.client.get(self.url, {'since': version}).json()
+        self.assertEqual(
+            {task['id']: task['rank'] for task in delta['tasks']},
+            dict(Task.objects.values_list('pk', 'rank'))
+        )
+
+    def test_rebalance_command_shortens_long_ranks(self):
+        Task.objects.filter(pk=self.tasks[0].pk).update(rank='n' * 40)
+        out = StringIO()
+        call_command('rebalance_ranks', max_length=10, stdout=out)
+        self.assertIn('Rebalanced 1 column(s).', out.getvalue())
+        self.assertTrue(all(len(rank) <= 10 for rank in Task.objects.values_list('rank', flat=True)))
+
+    def test_changes_since_version(self):
+        full = self.client.get(self.url).json()
+        self.assertEqual(len(full['tasks']), 3)
+        self.assertEqual([subtask['id'] for subtask in full['subtasks']], [self.subtask.pk])
+
+        self.client.put(
+            reverse('task_update', args=(self.tasks[1].pk, )),
+            {'title': 'Renamed', 'description': 'd', 'status': self.column.pk, 'subtasks': []},
+            content_type='application/json'
+        )
+        self.client.delete(reverse('subtask_delete', args=(self.subtask.pk, )))
+        self.client.post(
+            reverse('task_bulk_delete'), {'ids': [self.tasks[2].pk]}, content_type='application/json'
+        )
+
+        board_roles(self.user.pk)
+        with self.assertNumQueries(7):
+            delta = self.client.get(self.url, {'since': full['version']}).json()
+        self.assertEqual([task['title'] for task in delta['tasks']], ['Renamed'])
+        self.assertEqual(delta['columns'], [])
+        self.assertEqual(delta['subtasks'], [])
+        self.assertEqual(delta['deleted'], {
+            'columns': [], 'tasks': [self.tasks[2].pk], 'subtasks': [self.subtask.pk]
+        })
+
+        latest = self.client.get(self.url, {'since': delta['version']}).json()
+        self.assertEqual(latest['tasks'], [])
+        self.assertEqual(latest['version'], delta['version'])
+
+    def test_rejects_unknown_version(self):
+        for since in ('abc', -1, self.board.version + 100):
+            response = self.client.get(self.url, {'since': since})
+            self.assertEqual(response.status_code, 400)
+
+
+class SparseFieldsTest(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user('owner', password='password')
+        self.board = Board.objects.create(name='Board', owner=self.user)
+        self.column = Column.objects.create(name='Todo', board=self.board, owner=self.user)
+        self.task = Task.objects.create(
+            title='Task', description='Long text', status=self.column, owner=self.user,
+            subtask_total=1, subtask_selected=1
+        )
+        Subtask.objects.create(title='a', task=self.task, owner=self.user)
+        self.client.force_login(self.user)
+        self.url = reverse('board_detail', args=(self.board.pk, ))
+
+    def test_board_fields_and_expand(self):
+        board_roles(self.user.pk)
+        with self.assertNumQueries(4):
+            response = self.client.get(self.url, {'fields': 'name,columns.name'})
+        self.assertEqual(response.json(), {'name': 'Board', 'columns': [{'name': 'Todo'}]})
+
+        response = self.client.get(self.url, {
+            'fields': 'columns.tasks.title,columns.tasks.subtasks',
+            'expand': 'columns.tasks.subtasks'
+        })
+        self.assertEqual(response.json(), {'columns': [{'tasks': [
+            {'title': 'Task', 'subtasks': [{'id': self.task.subtasks.get().pk, 'title': 'a', 'is_selected': True}]}
+        ]}]})
+        etag = response['ETag']
+        self.assertNotEqual(etag, self.client.get(self.url)['ETag'])
+
+        response = self.client.get(self.url, {'expand': 'columns.tasks.description'})
+        self.assertEqual(response.json()['columns'][0]['tasks'][0]['description'], 'Long text')
+
+        response = self.client.get(self.url, {'fields': 'columns.owner'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_task_page_and_filters(self):
+        for i in range(4):
+            Task.objects.create(
+                title=f'Page {i}', description='d', status=self.column, owner=self.user,
+                subtask_total=2, subtask_selected=i % 2 * 2
+            )
+        board_roles(self.user.pk)
+        with self.assertNumQueries(5):
+            response = self.client.get(self.url, {'limit': 2, 'title': 'Page'})
+        column = response.json()['columns'][0]
+        self.assertEqual([task['title'] for task in column['tasks']], ['Page 0', 'Page 1'])
+        self.assertTrue(column['has_more'])
+
+        response = self.client.get(reverse('task_list'), {
+            'status': self.column.pk, 'order': 'rank', 'title': 'Page',
+            'cursor': column['next'], 'limit': 2
+        })
+        self.assertEqual([task['title'] for task in response.json()['results']], ['Page 2', 'Page 3'])
+
+        response = self.client.get(self.url, {'incomplete': 'true', 'limit': 5})
+        column = response.json()['columns'][0]
+        self.assertEqual([task['title'] for task in column['tasks']], ['Page 0', 'Page 2'])
+        self.assertEqual((column['has_more'], column['next']), (False, None))
+
+        self.assertEqual(self.client.get(self.url, {'limit': 0}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'updated_since': 'soon'}).status_code, 400)
+
+    def test_task_fields(self):
+        url = reverse('task_detail', args=(self.task.pk, ))
+        board_roles(self.user.pk)
+        with self.assertNumQueries(3):
+            response = self.client.get(url, {'fields': 'id,title'})
+        self.assertEqual(response.json(), {'id': self.task.pk, 'title': 'Task'})
+        self.assertEqual(self.client.get(url).json()['description'], 'Long text')
+
+
+class StatsViewTest(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user('owner', password='password')
+        self.board = Board.objects.create(name='Board', owner=self.user)
+        self.todo, self.done = [
+            Column.objects.create(name=name, board=self.board, owner=self.user)
+            for name in ('Todo', 'Done')
+        ]
+        for i, (total, selected) in enumerate(((2, 1), (3, 0), (1, 1))):
+            Task.objects.create(
+                title=f'Task {i}', description='d', status=self.todo if i < 2 else self.done,
+                owner=self.user, subtask_total=total, subtask_selected=selected
+            )
+        self.empty = Board.objects.create(name='Empty', owner=self.user)
+        self.client.force_login(self.user)
+
+    def test_board_stats(self):
+        board_roles(self.user.pk)
+        with self.assertNumQueries(5):
+            data = self.client.get(reverse('board_stats', args=(self.board.pk, ))).json()
+        self.assertEqual(data['tasks'], 3)
+        self.assertEqual(data['subtasks'], {'total': 6, 'selected': 2, 'ratio': 0.3333})
+        self.assertEqual(
+            [(column['name'], column['tasks'], column['subtasks']['selected']) for column in data['columns']],
+            [('Todo', 2, 1), ('Done', 1, 1)]
+        )
+        self.assertEqual(data['recent'][0]['title'], 'Task 2')
+
+    def test_user_stats_from_summary_match_live_query(self):
+        url = reverse('user_stats')
+        live = self.client.get(url).json()
+        self.assertEqual(
+            [(board['name'], board['tasks']) for board in live['boards']],
+            [('Board', 3), ('Empty', 0)]
+        )
+        self.assertIsNone(live['boards'][1]['subtasks']['ratio'])
+
+        with override_settings(TASKMANAGEMENT_BOARD_STATS_SUMMARY=True):
+            self.assertEqual(self.client.get(url).json(), live)
+            self.assertEqual(BoardStats.objects.count(), 2)
+
+            column = Column.objects.create(name='Todo', board=self.empty, owner=self.user)
+            payload = {
+                'title': 'New',
+                'description': 'd',
+                'status': column.pk,
+                'subtasks': [{'title': 'a', 'is_selected': True}]
+            }
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.post(
+                    reverse('task_create', args=(self.empty.pk, )),
+                    payload,
+                    content_type='application/json'
+                )
+            self.assertEqual(BoardStats.objects.get(board=self.empty).tasks, 1)
+            board_roles(self.user.pk)
+            with self.assertNumQueries(4):
+                summary = self.client.get(url).json()
+
+        self.assertEqual(summary, self.client.get(url).json())
+        self.assertEqual(summary['boards'][1]['subtasks'], {'total': 1, 'selected': 1, 'ratio': 1.0})
+
+
+class BoardAccessTest(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.owner = User.objects.create_user('owner', password='password')
+        self.other = User.objects.create_user('other', password='password')
+        board = Board.objects.create(name='Board', owner=self.owner)
+        self.column = Column.objects.create(name='Todo', board=board, owner=self.owner)
+        self.task = Task.objects.create(
+            title='Task', description='d', status=self.column, owner=self.owner
+        )
+        self.factory = APIRequestFactory()
+
+    def get_task(self, user, pk):
+        request = self.factory.get(f'/api/tasks/{pk}/')
+        force_authenticate(request, user=user)
+        return TaskDetailView.as_view()(request, pk=pk)
+
+    def test_authorization_costs_one_query(self):
+        board_roles(self.other.pk)
+        with self.assertNumQueries(1):
+            response = self.get_task(self.other, self.task.pk)
+        self.assertEqual(response.status_code, 403)
+        self.assertIn('error', response.data)
+
+        with self.assertNumQueries(1):
+            response = self.get_task(self.other, self.task.pk + 1)
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.data, {'error': 'Task not found.'})
+
+        self.assertEqual(self.get_task(self.owner, self.task.pk).status_code, 200)
+
+    def test_foreign_objects_cannot_be_changed(self):
+        self.client.force_login(self.other)
+        response = self.client.delete(reverse('task_delete', args=(self.task.pk, )))
+        self.assertEqual(response.status_code, 403)
+        self.assertTrue(Task.objects.filter(pk=self.task.pk).exists())
+
+        own_board = Board.objects.create(name='Mine', owner=self.other)
+        response = self.client.post(
+            reverse('task_create', args=(own_board.pk, )),
+            {'title': 'T', 'description': 'd', 'status': self.column.pk, 'subtasks': []},
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_member_roles(self):
+        member_url = reverse('board_member_list', args=(self.column.board_id, ))
+        self.client.force_login(self.owner)
+        response = self.client.post(
+            member_url, {'user': 'other', 'role': 'viewer'}, content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 201)
+
+        self.client.force_login(self.other)
+        task_url = reverse('task_detail', args=(self.task.pk, ))
+        self.assertEqual(self.client.get(task_url).status_code, 200)
+        self.assertEqual(
+            self.client.delete(reverse('task_delete', args=(self.task.pk, ))).status_code, 403
+        )
+        self.assertEqual(
+            self.client.post(member_url, {'user': 'owner'}, content_type='application/json').status_code,
+            403
+        )
+
+        self.client.force_login(self.owner)
+        detail_url = reverse('board_member_detail', args=(self.column.board_id, self.other.pk))
+        self.client.put(detail_url, {'role': 'editor'}, content_type='application/json')
+        self.client.force_login(self.other)
+        self.assertEqual(
+            self.client.delete(reverse('task_delete', args=(self.task.pk, ))).status_code, 204
+        )
+
+        self.client.force_login(self.owner)
+        self.assertEqual(self.client.delete(detail_url).status_code, 204)
+
+    def add_member(self, role):
+        BoardMembership.objects.create(board_id=self.column.board_id, user=self.other, role=role)
+        return reverse('board_member_detail', args=(self.column.board_id, self.other.pk))
+
+    def test_revoked_member_loses_access(self):
+        detail_url = self.add_member(BoardMembership.EDITOR)
+        task_url = reverse('task_detail', args=(self.task.pk, ))
+        self.client.force_login(self.other)
+        self.assertEqual(self.client.get(task_url).status_code, 200)
+
+        self.client.force_login(self.owner)
+        self.assertEqual(self.client.delete(detail_url).status_code, 204)
+        self.client.force_login(self.other)
+        self.assertEqual(self.client.get(task_url).status_code, 403)
+
+    def test_downgraded_member_loses_write_access(self):
+        detail_url = self.add_member(BoardMembership.EDITOR)
+        self.client.force_login(self.other)
+        self.assertEqual(board_roles(self.other.pk)[self.column.board_id], BoardMembership.EDITOR)
+
+        self.client.force_login(self.owner)
+        self.client.put(detail_url, {'role': 'viewer'}, content_type='application/json')
+        self.client.force_login(self.other)
+        task_url = reverse('task_detail', args=(self.task.pk, ))
+        self.assertEqual(self.client.get(task_url).status_code, 200)
+        self.assertEqual(
+            self.client.delete(reverse('task_delete', args=(self.task.pk, ))).status_code, 403
+        )
+
+    def test_deploy_check_rejects_local_access_cache(self):
+        errors = run_checks(include_deployment_checks=True, tags=[Tags.caches])
+        self.assertIn('taskmanagement.E001', [error.id for error in errors])
+        redis = {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': 'redis://'}
+        with override_settings(CACHES={**settings.CACHES, 'shared': redis}):
+            errors = run_checks(include_deployment_checks=True, tags=[Tags.caches])
+        self.assertNotIn('taskmanagement.E001', [error.id for error in errors])
+        self.client.force_login(self.other)
+        self.assertEqual(self.client.get(reverse('board_list')).json(), [])
+
+
+class ActivityLogTest(TransactionTestCase):
+    # Entries are written after commit, so the requests must really commit.
+    def setUp(self):
+        board_cache.backend.clear()
+        caches[settings.TASKMANAGEMENT_ACCESS_CACHE].clear()
+        self.user = User.objects.create_user('owner', password='password')
+        self.board = Board.objects.create(name='Board', owner=self.user)
+        self.column = Column.objects.create(name='Todo', board=self.board, owner=self.user)
+        self.client.force_login(self.user)
+        Activity.objects.all().delete()
+
+    def test_request_writes_its_entries_with_one_insert(self):
+        url = reverse('task_bulk_create', args=(self.board.pk, ))
+        payload = [
+            {'title': f'Task {i}', 'description': 'd', 'status': self.column.pk, 'subtasks': []}
+            for i in range(3)
+        ]
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post(url, payload, content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        inserts = [
+            query for query in context.captured_queries
+            if query['sql'].startswith(f'INSERT INTO "{Activity._meta.db_table}"')
+        ]
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(
+            sorted(Activity.objects.values_list('verb', 'actor', 'task_id')),
+            sorted(('task.created', self.user.pk, task['id']) for task in response.json())
+        )
+
+    def test_entries_outside_requests_are_written_per_transaction(self):
+        tasks = [
+            Task.objects.create(title=f'Task {i}', description='d', status=self.column, owner=self.user)
+            for i in range(3)
+        ]
+        Activity.objects.all().delete()
+        with CaptureQueriesContext(connection) as context:
+            with transaction.atomic():
+                remove_tasks({task.pk: self.board.pk for task in tasks})
+                with self.assertRaises(RuntimeError), transaction.atomic():
+                    Column.objects.create(name='Lost', board=self.board, owner=self.user)
+                    raise RuntimeError
+        inserts = [
+            query for query in context.captured_queries
+            if query['sql'].startswith(f'INSERT INTO "{Activity._meta.db_table}"')
+        ]
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(list(Activity.objects.values_list('verb', flat=True)), ['task.deleted'] * 3)
+
+    def test_feeds_are_paginated_and_survive_task_deletion(self):
+        task = Task.objects.create(
+            title='Task', description='d', status=self.column, owner=self.user,
+            subtask_total=1, subtask_selected=1
+        )
+        subtask = Subtask.objects.create(title='a', task=task, owner=self.user)
+        response = self.client.put(
+            reverse('subtask_update', args=(subtask.pk, )),
+            {'title': 'a', 'is_selected': False},
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 200)
+
+        url = reverse('task_activity', args=(task.pk, ))
+        page = self.client.get(url, {'limit': 2}).json()
+        self.assertEqual(
+            [entry['verb'] for entry in page['results']],
+            ['subtask.toggled', 'subtask.created']
+        )
+        self.assertEqual(page['results'][0]['actor'], self.user.pk)
+        page = self.client.get(url, {'limit': 2, 'cursor': page['next']}).json()
+        self.assertEqual([entry['verb'] for entry in page['results']], ['task.created'])
+        self.assertIsNone(page['next'])
+
+        self.client.delete(reverse('task_delete', args=(task.pk, )))
+        feed = self.client.get(reverse('board_activity', args=(self.board.pk, ))).json()
+        self.assertEqual(feed['results'][0]['verb'], 'task.deleted')
+        self.assertEqual(feed['results'][0]['task'], task.pk)
+
+        other = User.objects.create_user('other', password='password')
+        self.client.force_login(other)
+        response = self.client.get(reverse('board_activity', args=(self.board.pk, )))
+        self.assertEqual(response.status_code, 403)
+
+    def test_prune_and_board_deletion_remove_entries(self):
+        Task.objects.create(title='Task', description='d', status=self.column, owner=self.user)
+        Activity.objects.update(created_at=timezone.now() - timedelta(days=10))
+        Column.objects.create(name='Done', board=self.board, owner=self.user)
+
+        call_command('prune_activity', days=5, chunk_size=1, stdout=StringIO())
+        self.assertEqual(list(Activity.objects.values_list('verb', flat=True)), ['column.added'])
+
+        delete_board(self.board.pk)
+        self.assertFalse(Activity.objects.exists())
+
+
+class ArchiveTest(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user('owner', password='password')
+        self.board = Board.objects.create(name='Board', owner=self.user)
+        self.todo, self.done = [
+            Column.objects.create(name=name, board=self.board, owner=self.user)
+            for name in ('Todo', 'Done')
+        ]
+        self.tasks = {}
+        for column, title, age in ((self.todo, 'Stale', 400), (self.done, 'Shipped', 40),
+                                   (self.done, 'Recent', 1), (self.todo, 'Active', 40)):
+            task = Task.objects.create(
+                title=title, description='d', status=column, owner=self.user,
+                subtask_total=1, subtask_selected=0
+            )
+            Subtask.objects.create(title=f'{title} step', task=task, owner=self.user, is_selected=False)
+            Task.objects.filter(pk=task.pk).update(updated_at=timezone.now() - timedelta(days=age))
+            self.tasks[title] = task
+        self.client.force_login(self.user)
+
+    def test_archive_browse_and_restore(self):
+        version = Board.objects.get(pk=self.board.pk).version
+        call_command('archive_tasks', chunk_size=1, stdout=StringIO())
+        self.assertEqual(set(Task.objects.values_list('title', flat=True)), {'Recent', 'Active'})
+        changes = self.client.get(reverse('board_changes', args=(self.board.pk, )), {'since': version})
+        self.assertEqual(
+            set(changes.json()['deleted']['tasks']),
+            {self.tasks['Stale'].pk, self.tasks['Shipped'].pk}
+        )
+
+        url = reverse('archived_task_list', args=(self.board.pk, ))
+        page = self.client.get(url, {'limit': 1}).json()
+        self.assertEqual(len(page['results']), 1)
+        page = self.client.get(url, {'limit': 1, 'cursor': page['next']}).json()
+        self.assertEqual(len(page['results']), 1)
+        row, = self.client.get(url, {'title': 'Sta'}).json()['results']
+        self.assertEqual(row['subtask_count'], {'total': 1, 'selected': 0})
+
+        pk = self.tasks['Stale'].pk
+        response = self.client.post(reverse('archived_task_restore', args=(pk, )))
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['subtasks'][0]['title'], 'Stale step')
+        task = Task.objects.get(pk=pk)
+        self.assertEqual(task.status, self.todo)
+        self.assertEqual(task.created_at, self.tasks['Stale'].created_at)
+        self.assertGreater(task.rank, self.tasks['Active'].rank)
+        self.assertEqual(ArchivedTask.objects.get().title, 'Shipped')
+
+        delete_board(self.board.pk)
+        self.assertFalse(ArchivedSubtask.objects.exists())
+
+
+@override_settings(REST_FRAMEWORK={
+    **settings.REST_FRAMEWORK,
+    'DEFAULT_THROTTLE_RATES': {'read': '100/min', 'write': '', 'heavy': '2/min'}
+})
+class ThrottleTest(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user('owner', password='password')
+        self.board = Board.objects.create(name='Board', owner=self.user)
+        self.client.force_login(self.user)
+
+    def test_heavy_views_have_their_own_budget(self):
+        url = reverse('board_detail', args=(self.board.pk, ))
+        self.assertEqual(self.client.get(url).status_code, 200)
+        self.assertEqual(self.client.get(url).status_code, 200)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '30')
+        self.assertIn('throttled', response.json()['error'])
+
+        # The refusal is remembered in the process, without the cache.
+        caches[settings.TASKMANAGEMENT_THROTTLE_CACHE].clear()
+        response = self.client.get(reverse('async_board_detail', args=(self.board.pk, )))
+        self.assertEqual(response.status_code, 429)
+
+        self.assertEqual(self.client.get(reverse('board_list')).status_code, 200)
+        response = self.client.post(
+            reverse('column_create', args=(self.board.pk, )), {'name': 'Todo'},
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_busy_bucket_is_leased_to_the_process(self):
+        with mock.patch('taskmanagement.api.throttling.time', return_value=1000.0):
+            for _ in range(3):
+                self.assertEqual(self.client.get(reverse('board_list')).status_code, 200)
+        full_at = caches[settings.TASKMANAGEMENT_THROTTLE_CACHE].get(f'throttle:read:{self.user.pk}')
+        # The first request takes one token; the second finds it spent and
+        # takes a lease, which the third request draws from locally. A token
+        # of a 100/min bucket is 600ms.
+        self.assertEqual(full_at, 1000 * 1000 + (1 + settings.TASKMANAGEMENT_THROTTLE_LEASE) * 600)
+
+    def test_processes_sharing_a_bucket_never_overdraw_it(self):
+        stores = [TokenBucketStore(), TokenBucketStore()]
+
+        def request(number):
+            return stores[number % 2].consume('throttle:test', 10, 60)
+
+        with mock.patch('taskmanagement.api.throttling.time', return_value=1000.0):
+            with ThreadPoolExecutor(8) as executor:
+                waits = list(executor.map(request, range(100)))
+        self.assertEqual(waits.count(0), 10)
+
+
+# The commands normally create their own throwaway database; here they run
+# on the test database. Dropping indexes needs a schema editor outside a
+# transaction, and the API benchmark counts the queries of real commits,
+# hence TransactionTestCase.
+@mock.patch('taskmanagement.management.commands.benchmark_queries.throwaway_database', nullcontext)
+@mock.patch('taskmanagement.management.commands.benchmark_api.throwaway_database', nullcontext)
+class BenchmarkCommandTest(TransactionTestCase):
+    def test_compare_restores_the_indexes(self):
+        out = StringIO()
+        call_command(
+            'benchmark_queries', compare=True, users=1, boards=1, columns=1,
+            tasks=3, subtasks=1, repeat=1, stdout=out
+        )
+        self.assertIn('== without indexes', out.getvalue())
+        self.assertIn('== with indexes', out.getvalue())
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(cursor, Task._meta.db_table)
+        self.assertIn('task_status_id_idx', constraints)
+
+    def test_api_benchmark_gates_on_query_counts(self):
+        with TemporaryDirectory() as directory:
+            baseline = Path(directory) / 'baseline.json'
+            options = {
+                'boards': 1, 'columns': 1, 'tasks': 3, 'subtasks': 1, 'repeat': 1,
+                'baseline': str(baseline), 'stdout': StringIO()
+            }
+            call_command('benchmark_api', update_baseline=True, **options)
+            recorded = json.loads(baseline.read_text())[connection.vendor]
+            self.assertNotIn('median_ms', json.dumps(recorded))
+
+            call_command('benchmark_api', **options)
+            recorded['queries']['board_list'] -= 1
+            baseline.write_text(json.dumps({connection.vendor: recorded}))
+            with self.assertRaisesMessage(CommandError, 'board_list'):
+                call_command('benchmark_api', **options)
@@ -0,0 +1,239 @@
+"""
+Board export and import as JSON Lines, and copies of boards.
+
+An export is one JSON object per line: the board first, then its columns,
+then every task immediately followed by its subtasks. Both directions work
+in chunks, so the memory used does not depend on the size of the board.
+A copy feeds the export records straight into the importer, skipping JSON.
+"""
+import json
+
+from django.db import transaction
+
+from .models import Board, Column, Task, Subtask
+from .ranking import is_rank
+from .search import index_tasks
+
+
+FORMAT_VERSION = 1
+CHUNK_SIZE = 2000
+
+
+class InvalidImport(Exception):
+    pass
+
+
+def _dumps(record):
+    return json.dumps(record, separators=(',', ':')) + '\n'
+
+
+def _text(value, model, name):
+    """``value`` checked against the field ``name`` of ``model`` it is imported into."""
+    max_length = model._meta.get_field(name).max_length
+    if not isinstance(value, str) or (max_length and len(value) > max_length):
+        raise InvalidImport(f'Invalid {model._meta.model_name} {name}.')
+    return value
+
+
+def export_board(board, chunk_size=CHUNK_SIZE):
+    """Yield the board as JSON Lines, ``chunk_size`` lines per string."""
+    lines = []
+    for record in _records(board, chunk_size):
+        lines.append(_dumps(record))
+        if len(lines) >= chunk_size:
+            yield ''.join(lines)
+            lines = []
+    if lines:
+        yield ''.join(lines)
+
+
+def _records(board, chunk_size):
+    yield {'type': 'board', 'format': FORMAT_VERSION, 'id': board.pk, 'name': board.name}
+
+    columns = (
+        Column.objects.filter(board=board.pk)
+        .order_by('id')
+        .values_list('id', 'name')
+    )
+    for pk, name in columns.iterator(chunk_size=chunk_size):
+        yield {'type': 'column', 'id': pk, 'name': name}
+
+    tasks = (
+        Task.objects.filter(board=board.pk)
+        .order_by('id')
+        .values_list('id', 'status_id', 'title', 'description', 'rank')
+        .iterator(chunk_size=chunk_size)
+    )
+    # Both querysets are ordered by task id, so subtasks are merged in
+    # behind their task without holding either side in memory.
+    subtasks = (
+        Subtask.objects.filter(board=board.pk)
+        .order_by('task_id', 'id')
+        .values_list('id', 'task_id', 'title', 'is_selected')
+        .iterator(chunk_size=chunk_size)
+    )
+    subtask = next(subtasks, None)
+    for pk, column_id, title, description, rank in tasks:
+        # Skip subtasks of tasks deleted or archived between the two queries.
+        while subtask is not None and subtask[1] < pk:
+            subtask = next(subtasks, None)
+        yield {
+            'type': 'task',
+            'id': pk,
+            'column': column_id,
+            'title': title,
+            'description': description,
+            'rank': rank
+        }
+        while subtask is not None and subtask[1] == pk:
+            yield {
+                'type': 'subtask',
+                'id': subtask[0],
+                'task': pk,
+                'title': subtask[2],
+                'is_selected': subtask[3]
+            }
+            subtask = next(subtasks, None)
+
+
+class BoardImporter:
+    """
+    Rebuild an exported board for ``owner`` with chunked ``bulk_create``.
+
+    Exported ids are only used to link rows together; only the ids of the
+    tasks in the current chunk are kept in memory.
+    """
+
+    def __init__(self, owner, name=None, chunk_size=CHUNK_SIZE, is_template=False):
+        self.owner = owner
+        self.name = name
+        self.is_template = is_template
+        self.chunk_size = chunk_size
+        self.board = None
+        self.columns = []
+        self.column_ids = None
+        self.tasks = {}
+        self.subtasks = []
+
+    @transaction.atomic
+    def run(self, lines):
+        for number, line in enumerate(lines, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                self.add(record)
+            except InvalidImport as error:
+                raise InvalidImport(f'Line {number}: {error}')
+            except (ValueError, TypeError, KeyError) as error:
+                raise InvalidImport(f'Line {number}: invalid record ({error!r}).')
+        return self.finish()
+
+    @transaction.atomic
+    def copy(self, records):
+        for record in records:
+            self.add(record)
+        return self.finish()
+
+    def finish(self):
+        if self.board is None:
+            raise InvalidImport('The export is empty.')
+        self.flush_columns()
+        self.flush_tasks()
+        return self.board
+
+    def add(self, record):
+        kind = record['type']
+        if self.board is None:
+            if kind != 'board':
+                raise InvalidImport('The first record must be the board.')
+            if record.get('format') != FORMAT_VERSION:
+                raise InvalidImport(f'Unsupported format {record.get("format")!r}.')
+            self.board = Board.objects.create(
+                name=_text(self.name or record['name'], Board, 'name'),
+                owner=self.owner,
+                is_template=self.is_template
+            )
+        elif kind == 'column':
+            if self.column_ids is not None:
+                raise InvalidImport('Columns must come before tasks.')
+            self.columns.append((record['id'], Column(
+                name=_text(record['name'], Column, 'name'),
+                board=self.board,
+                owner=self.owner
+            )))
+        elif kind == 'task':
+            self.flush_columns()
+            if len(self.tasks) >= self.chunk_size:
+                self.flush_tasks()
+            try:
+                column_id = self.column_ids[record['column']]
+            except KeyError:
+                raise InvalidImport(f'Unknown column {record["column"]!r}.')
+            rank = _text(record['rank'], Task, 'rank')
+            if not is_rank(rank):
+                raise InvalidImport(f'Invalid task rank {rank!r}.')
+            self.tasks[record['id']] = Task(
+                title=_text(record['title'], Task, 'title'),
+                description=_text(record['description'], Task, 'description'),
+                rank=rank,
+                status_id=column_id,
+                board=self.board,
+                owner=self.owner
+            )
+        elif kind == 'subtask':
+            task = self.tasks.get(record['task'])
+            if task is None:
+                raise InvalidImport('Subtasks must directly follow their task.')
+            is_selected = record['is_selected']
+            if not isinstance(is_selected, bool):
+                raise InvalidImport('Invalid subtask is_selected.')
+            task.subtask_total += 1
+            task.subtask_selected += is_selected
+            self.subtasks.append(Subtask(
+                title=_text(record['title'], Subtask, 'title'),
+                is_selected=is_selected,
+                task=task,
+                board=self.board,
+                owner=self.owner
+            ))
+        else:
+            raise InvalidImport(f'Unknown record type {kind!r}.')
+
+    def flush_columns(self):
+        if self.column_ids is not None:
+            return
+        # Imported rows are stamped with a board version like any other
+        # write, so sync clients see them as changed.
+        sequence = Board.all_objects.next_version(self.board.pk)
+        for _, column in self.columns:
+            column.sequence = sequence
+        Column.objects.bulk_create([column for _, column in self.columns])
+        self.column_ids = {old_id: column.pk for old_id, column in self.columns}
+        self.columns = []
+
+    def flush_tasks(self):
+        if not self.tasks:
+            return
+        sequence = Board.all_objects.next_version(self.board.pk)
+        for record in (*self.tasks.values(), *self.subtasks):
+            record.sequence = sequence
+        tasks = Task.objects.bulk_create(self.tasks.values())
+        Subtask.objects.bulk_create(self.subtasks)
+        index_tasks([task.pk for task in tasks])
+        self.tasks = {}
+        self.subtasks = []
+
+
+def import_board(lines, owner, name=None, chunk_size=CHUNK_SIZE):
+    """Import JSON Lines (str or bytes) produced by ``export_board``; returns the board."""
+    return BoardImporter(owner, name, chunk_size).run(lines)
+
+
+def clone_board(board, owner, name=None, is_template=False, chunk_size=CHUNK_SIZE):
+    """
+    Copy ``board`` with its columns, tasks and subtasks for ``owner``: a
+    few ``bulk_create`` queries per ``chunk_size`` tasks, whatever the size.
+    """
+    importer = BoardImporter(owner, name, chunk_size, is_template)
+    return importer.copy(_records(board, chunk_size))